@@ -1,12 +1,26 @@
 import streamlit as st
-import pandas as pd
-from io import BytesIO
 from datetime import datetime
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib import colors
-from reportlab.lib.units import mm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from itertools import groupby
+
+from almacen import Almacen
+from borradores import Borradores
+from evidencias import ALMACEN_FOTOS, LADO_VISTA, TIPOS_IMAGEN, FotoInvalida
+# pandas y reportlab (módulo informe) se importan recién al generar el primer PDF
+from catalogo import TIPOS_PRODUCTO, Item, catalogo_vigente, error_reglas, resumen_estados
+from trabajos import ColaInformes, ColaLlena
+from tabla17 import dimensionar_catalogo, lado_minimo_sello
+from nutrientes import ITEM_LIMITES, SELLOS, evaluar_producto, prellenar_checklist
+from rotulos import COLUMNA_TEXTO, escribir_prellenado, nota_evidencia, revisar_rotulo
+from metricas import METRICAS, Medicion, Perfilador, es_rerun_de_fragmento, tamano_sesion, widgets_del_rerun
+
+# -----------------------------------------------------------
+# INSTRUMENTACIÓN (ver metricas.py): tiempo del rerun y, si se pidió
+# en el panel de diagnóstico, perfil cProfile de esta sesión
+# -----------------------------------------------------------
+medicion = Medicion()
+perfilador = st.session_state.setdefault("perfilador", Perfilador()) if st.session_state.get("perfilar") else None
+if perfilador:
+    perfilador.iniciar()
 
 # -----------------------------------------------------------
 # CONFIGURACIÓN INICIAL
@@ -18,483 +32,423 @@ st.title("Verificador de Etiquetado Nutricional — Resoluciones 5109, 810 y 249
 # DATOS GENERALES
 # -----------------------------------------------------------
 st.sidebar.header("Datos de la verificación")
-producto = st.sidebar.text_input("Nombre del producto")
-proveedor = st.sidebar.text_input("Proveedor / Fabricante")
-responsable = st.sidebar.text_input("Responsable de la verificación")
-nombre_pdf = st.sidebar.text_input("Nombre del archivo PDF (sin .pdf)", f"informe_{datetime.now().strftime('%Y%m%d')}")
+if "nombre_pdf" not in st.session_state:
+    st.session_state.nombre_pdf = f"informe_{datetime.now().strftime('%Y%m%d')}"
+if "area_cm2" not in st.session_state:
+    st.session_state.area_cm2 = None
+producto = st.sidebar.text_input("Nombre del producto", key="producto")
+proveedor = st.sidebar.text_input("Proveedor / Fabricante", key="proveedor")
+responsable = st.sidebar.text_input("Responsable de la verificación", key="responsable")
+nombre_pdf = st.sidebar.text_input("Nombre del archivo PDF (sin .pdf)", key="nombre_pdf")
 filter_no = st.sidebar.checkbox("Mostrar solo 'No cumple'", value=False)
+# Solo se muestran y se califican los ítems que aplican al tipo de producto
+tipo_producto = st.sidebar.selectbox("Tipo de producto", options=[None, *TIPOS_PRODUCTO],
+                                     format_func=lambda t: t or "Todos los ítems", key="tipo_producto")
+busqueda = st.sidebar.text_input("Buscar en el checklist", key="busqueda",
+                                 placeholder="p. ej. sodio, vencimiento, 5109")
 
-# -----------------------------------------------------------
-# ESTRUCTURA DE ÍTEMS AGRUPADOS POR CATEGORÍA
-# (Se mantiene tu estructura, solo se enriquecen los textos)
-# -----------------------------------------------------------
-CATEGORIAS = {
-    "1. Identificación general del producto": [
-        ("Nombre del alimento",
-         "Verificar que el nombre refleje la verdadera naturaleza del producto (no genérico). En producto terminado debe describir el alimento final (p. ej., “Bebida de café con leche”); en materia prima, el insumo (p. ej., “Jarabe de glucosa”). (Art. 5.1 Res. 5109/2005)",
-         "Debe indicar la verdadera naturaleza del producto.",
-         "Art. 5.1 Resol. 5109/2005"),
-
-        ("Marca comercial",
-         "Comprobar que la marca no sustituya la denominación del alimento. La marca puede acompañar, nunca reemplazar el nombre del alimento. (Art. 5.1.2 Res. 5109/2005)",
-         "Debe coexistir con la denominación del alimento.",
-         "Art. 5.1.2 Resol. 5109/2005"),
-
-        ("Lista de ingredientes",
-         "Revisar que todos los ingredientes estén listados en orden decreciente de peso al momento de fabricación; incluir aditivos con su categoría funcional y nombre específico (p. ej., “Conservante (Sorbato de potasio)”). En materias primas simples puede no aplicar. (Art. 5.2 Res. 5109/2005)",
-         "Agregar lista completa y verificar el orden correcto.",
-         "Art. 5.2 Resol. 5109/2005"),
-
-        ("Aditivos alimentarios",
-         "Verificar que los aditivos se declaren por su nombre común o categoría funcional; no usar códigos o abreviaturas. (Art. 5.2.1 Res. 5109/2005)",
-         "Declarar correctamente los aditivos alimentarios.",
-         "Art. 5.2.1 Resol. 5109/2005"),
-
-        ("Contenido neto",
-         "Verificar que el contenido neto se exprese en unidades SI (g, kg, mL o L) sin incluir el envase, con legibilidad adecuada. Aplica principalmente para producto terminado envasado. (Anexo Res. 5109/2005)",
-         "Declarar contenido neto con unidad del Sistema Internacional.",
-         "Art. 3 y Anexo Resol. 5109/2005"),
-
-        ("Lote",
-         "Comprobar que el número/código de lote sea visible, indeleble y legible para trazabilidad, tanto en producto terminado como en materia prima. (Art. 5.4 Res. 5109/2005)",
-         "Debe existir lote visible y legible.",
-         "Art. 5.4 Resol. 5109/2005"),
-
-        ("Fecha de vencimiento o duración mínima",
-         "Verificar legibilidad, ubicación y formato (día/mes/año). En materias primas corresponde al insumo; en producto terminado, al alimento para consumo. (Art. 5.5 Res. 5109/2005)",
-         "Usar formato legible y visible (día/mes/año).",
-         "Art. 5.5 Resol. 5109/2005"),
-
-        ("País de origen",
-         "Comprobar que se declare “Hecho en…” o “Producto de…”. Para materias primas de uso interno industrial puede no exigirse al consumidor final, pero debe obrar documentalmente. (Art. 5.9 Res. 5109/2005)",
-         "Incluir país de origen claramente.",
-         "Art. 5.9 Resol. 5109/2005"),
-
-        ("Nombre y dirección del fabricante/importador",
-         "Revisar que incluya razón social y dirección completa del fabricante, importador o reenvasador, según aplique. (Art. 5.8 Res. 5109/2005)",
-         "Incluir nombre y dirección completos.",
-         "Art. 5.8 Resol. 5109/2005"),
-    ],
-
-    "2. Cumplimiento de requisitos gráficos y sanitarios": [
-        ("Legibilidad",
-         "Asegurar que la información sea visible, indeleble y contrastante con el fondo; tamaño de fuente suficiente y tipografía clara (Arial/Helvética sugeridas por Res. 810 para la tabla). (Art. 4 y 6 Res. 5109/2005; Art. 27 Res. 810/2021)",
-         "Mejorar contraste o tamaño del texto.",
-         "Art. 4 y 6 Resol. 5109/2005"),
-
-        ("Idioma",
-         "Verificar que toda la información obligatoria esté en español; si la etiqueta original está en otro idioma, usar rótulo complementario adherido. (Art. 5 Res. 5109/2005; Art. 27.1.3 Res. 810/2021)",
-         "Agregar traducción completa en español si aplica.",
-         "Art. 5 Resol. 5109/2005"),
-
-        ("Ubicación del rótulo",
-         "Revisar que la información esté en la cara principal visible al consumidor, sin ocultamientos ni pliegues que dificulten la lectura. (Art. 3 y 5 Res. 5109/2005)",
-         "Reubicar etiqueta si no es visible para el consumidor.",
-         "Art. 3 y 5 Resol. 5109/2005"),
-
-        ("Prohibición de inducir a error",
-         "Verificar que no existan afirmaciones falsas, engañosas o que atribuyan propiedades medicinales; evitar imágenes o frases que puedan confundir. (Art. 4 Res. 5109/2005)",
-         "Corregir mensajes que puedan inducir a error.",
-         "Art. 4 Resol. 5109/2005"),
-    ],
-
-    "3. Etiquetado nutricional (Información nutricional obligatoria)": [
-        ("Tabla nutricional presente",
-         "Confirmar presencia de la tabla nutricional cuando el producto se destine al consumidor final. Las materias primas industriales están exceptuadas. (Art. 2 y Art. 8–10 Res. 810/2021; mod. 2492/2022)",
-         "Incluir tabla con los nutrientes requeridos cuando aplique.",
-         "Art. 8, 9 y 10 Resol. 810/2021"),
-
-        ("Unidad de medida",
-         "Verificar que los nutrientes se declaren por 100 g o 100 mL y por porción; coherencia con estado físico (sólido/líquido). (Art. 12 Res. 810/2021)",
-         "Corregir las unidades según corresponda.",
-         "Art. 12 Resol. 810/2021"),
-
-        ("Porciones por envase",
-         "Revisar que indique el número de porciones por envase, salvo productos de peso variable. (Art. 12 y Par. 2 Art. 2 Res. 810 mod. 2492/2022)",
-         "Agregar número de porciones si aplica.",
-         "Art. 12 y Par. 2 Art. 2 Resol. 810 modif. 2492/2022"),
-
-        ("Nutrientes adicionales",
-         "Cuando se declaren vitaminas/minerales, verificar que cumplan los requisitos de inclusión mínima/máxima y la presentación separada por una línea de los demás nutrientes. (Art. 15 y 28.3 Res. 810/2021)",
-         "Ajustar la declaración de micronutrientes según límites.",
-         "Art. 15 Resol. 810/2021"),
-
-        ("Tolerancias analíticas",
-         "Comparar valores declarados vs. análisis de laboratorio: la diferencia no debe superar ±20 %. (Art. 14 Res. 810/2021)",
-         "Ajustar declaraciones según análisis.",
-         "Art. 14 Resol. 810/2021"),
-
-        ("Fuente de nutrientes",
-         "Para usar términos como “fuente de…/alto en…”, verificar mínimos establecidos por la norma y que el producto no presente sellos de advertencia que los invaliden. (Art. 16 Res. 810 mod. 2492/2022)",
-         "Corregir o retirar declaraciones si no cumple.",
-         "Art. 16 Resol. 810 modif. 2492/2022"),
-    ],
-
-    "4. Declaraciones nutricionales y de salud (voluntarias)": [
-        ("Declaraciones nutricionales",
-         "Permitir solo si el producto cumple con el perfil de nutrientes y no exhibe sellos de advertencia. Evitar términos ambiguos; sustentar cuantitativamente (p. ej., “fuente de…” con %VD). (Art. 25.4 Res. 810 mod. 2492/2022)",
-         "Retirar declaraciones que no cumplan con los criterios.",
-         "Art. 25.4 Resol. 810 modif. 2492/2022"),
-
-        ("Declaraciones de salud",
-         "Verificar que estén autorizadas por el MSPS, sean veraces y sustentadas científicamente; no atribuir propiedades medicinales. (Art. 25 Res. 810/2021)",
-         "Incluir solo declaraciones aprobadas por el Ministerio.",
-         "Art. 25 Resol. 810/2021"),
-
-        ("Prohibición de declaraciones engañosas",
-         "Asegurar que el rótulo no induzca a error sobre composición o beneficios; evitar equivalencias simplistas no sustentadas. (Art. 25.5 Res. 810/2021)",
-         "Eliminar declaraciones confusas o engañosas.",
-         "Art. 25.5 Resol. 810/2021"),
-    ],
-
-    "5. Etiquetado frontal de advertencia (Sellos negros)": [
-        ("Aplicabilidad",
-         "Verificar si aplica en alimentos procesados/ultraprocesados con exceso de azúcares, grasas saturadas, sodio o presencia de edulcorantes. (Art. 32 Res. 810 mod. 2492/2022)",
-         "Evaluar composición para determinar necesidad de sellos.",
-         "Art. 32 Resol. 810 modif. 2492/2022"),
-
-        ("Forma y color",
-         "Comprobar octágono negro, borde blanco y texto “EXCESO EN” en mayúsculas, tipografía adecuada. (Art. 32 Res. 2492/2022)",
-         "Corregir forma o color según especificación oficial.",
-         "Art. 32 Resol. 2492/2022"),
-
-        ("Ubicación",
-         "Verificar ubicación en tercio superior de la cara principal de exhibición, visible y sin obstrucciones. (Art. 32 Res. 2492/2022)",
-         "Reubicar sello si no cumple posición.",
-         "Art. 32 Resol. 2492/2022"),
-
-        ("Tamaño del sello",
-         "Verificar dimensión mínima según el área principal del envase conforme a Tabla 17. (Art. 32 Res. 810 mod. 2492/2022)",
-         "Ajustar tamaño del sello según tabla normativa.",
-         "Art. 32 Resol. 810 modif. 2492/2022"),
-
-        ("Tipografía",
-         "Confirmar uso de tipografía blanca de alto contraste sobre fondo negro (Arial Black recomendada), sin otros elementos que distraigan. (Art. 32 Res. 810/2021)",
-         "Corregir tipografía o contraste del sello.",
-         "Art. 32 Resol. 810/2021"),
-
-        ("Límite de nutrientes críticos",
-         "Comparar con límites OPS: azúcares libres ≥10% kcal totales; grasas saturadas ≥10% kcal totales; grasas trans ≥1% kcal totales; sodio ≥1 mg/kcal o ≥300 mg/100 g (sólidos). Para bebidas sin aporte energético: criterio específico de sodio (≥40 mg/100 mL). Exceder obliga a sello. (Tabla 17 Res. 810 mod. 2492/2022)",
-         "Revisar composición frente a límites establecidos.",
-         "Tabla 17 Resol. 810 modif. 2492/2022"),
-
-        ("Sello 'Contiene edulcorante'",
-         "Si contiene edulcorantes (calóricos o no), incluir el sello correspondiente (“Contiene edulcorante, no recomendable en niños”). (Art. 32 Res. 2492/2022)",
-         "Agregar sello correspondiente si aplica.",
-         "Art. 32 Resol. 2492/2022"),
-
-        ("Excepciones al sello",
-         "Verificar si el producto se encuentra exento (no procesados o mínimamente procesados, típicos o artesanales, fórmulas infantiles, APMES, etc.). (Art. 2 Res. 810 mod. 2492/2022)",
-         "Aplicar excepción cuando corresponda.",
-         "Art. 2 Resol. 810 modif. 2492/2022"),
-    ],
-
-    "6. Requisitos especiales": [
-        ("Carne cruda con condimentos",
-         "Verificar el contenido de sodio; si excede 300 mg/100 g o 1 mg/kcal requiere sello frontal de sodio. (Par. 1 Art. 2 Res. 810 mod. 2492/2022)",
-         "Incluir sello frontal si aplica.",
-         "Par. 1 Art. 2 Resol. 810 modif. 2492/2022"),
-
-        ("Productos a granel",
-         "Confirmar exención de tabla nutricional y sellos cuando no hay envase individual; asegurar trazabilidad documental. (Art. 2 Res. 810 mod. 2492/2022)",
-         "Registrar exención si aplica.",
-         "Art. 2 Resol. 810 modif. 2492/2022"),
-
-        ("Materias primas industriales",
-         "Verificar que no requieran tabla nutricional ni sellos (no destinadas al consumidor final). Deben llevar identificación, lote, país de origen y fabricante. (Art. 2 Res. 810/2021)",
-         "Excluir etiquetado nutricional si no se vende al consumidor final.",
-         "Art. 2 Resol. 810/2021"),
-
-        ("Etiqueta de productos reempacados",
-         "Comprobar que mantenga toda la información original y agregue el responsable del reenvasado. (Art. 3 y 4 Res. 5109/2005)",
-         "Incluir responsable del reenvasado.",
-         "Art. 3 y 4 Resol. 5109/2005"),
-
-        ("Productos importados",
-         "Confirmar cumplimiento de normas nacionales y traducción al español mediante rótulo complementario cuando aplique. (Art. 2 Res. 5109/2005; Art. 27.1.3 Res. 810/2021)",
-         "Agregar rótulo complementario si aplica.",
-         "Art. 2 Resol. 5109/2005"),
-    ],
-
-    "7. Control y evidencia documental": [
-        ("Certificado de análisis",
-         "Verificar soporte analítico emitido por laboratorio acreditado para validar los valores nutricionales declarados. (Art. 14 Res. 810/2021)",
-         "Adjuntar o solicitar certificado de análisis.",
-         "Art. 14 Resol. 810/2021"),
-
-        ("Registro sanitario",
-         "Comprobar visibilidad y vigencia del número INVIMA en productos terminados; en materias primas, contar con habilitaciones/soportes regulatorios aplicables. (Decreto 3075/1997; Res. 5109/2005)",
-         "Actualizar o solicitar registro vigente.",
-         "Decreto 3075/1997 y Resol. 5109/2005"),
-    ]
-}
-
-# -----------------------------------------------------------
-# MAPA DE APLICABILIDAD VISIBLE EN PANTALLA (Producto terminado / Materia prima / Ambos)
-# (No altera tu estructura; solo imprime una línea debajo de “Qué verificar”)
-# -----------------------------------------------------------
-APLICA = {
-    # Categoría 1
-    "Nombre del alimento": "Ambos",
-    "Marca comercial": "Ambos",
-    "Lista de ingredientes": "Producto terminado",
-    "Aditivos alimentarios": "Ambos",
-    "Contenido neto": "Producto terminado",
-    "Lote": "Ambos",
-    "Fecha de vencimiento o duración mínima": "Ambos",
-    "País de origen": "Ambos",
-    "Nombre y dirección del fabricante/importador": "Ambos",
-
-    # Categoría 2
-    "Legibilidad": "Ambos",
-    "Idioma": "Ambos",
-    "Ubicación del rótulo": "Ambos",
-    "Prohibición de inducir a error": "Ambos",
-
-    # Categoría 3
-    "Tabla nutricional presente": "Producto terminado",
-    "Unidad de medida": "Producto terminado",
-    "Porciones por envase": "Producto terminado",
-    "Nutrientes adicionales": "Producto terminado",
-    "Tolerancias analíticas": "Producto terminado",
-    "Fuente de nutrientes": "Producto terminado",
-
-    # Categoría 4
-    "Declaraciones nutricionales": "Producto terminado",
-    "Declaraciones de salud": "Producto terminado",
-    "Prohibición de declaraciones engañosas": "Ambos",
-
-    # Categoría 5
-    "Aplicabilidad": "Producto terminado",
-    "Forma y color": "Producto terminado",
-    "Ubicación": "Producto terminado",
-    "Tamaño del sello": "Producto terminado",
-    "Tipografía": "Producto terminado",
-    "Límite de nutrientes críticos": "Producto terminado",
-    "Sello 'Contiene edulcorante'": "Producto terminado",
-    "Excepciones al sello": "Producto terminado",
-
-    # Categoría 6
-    "Carne cruda con condimentos": "Producto terminado",
-    "Productos a granel": "Producto terminado",
-    "Materias primas industriales": "Materia prima",
-    "Etiqueta de productos reempacados": "Producto terminado",
-    "Productos importados": "Ambos",
-
-    # Categoría 7
-    "Certificado de análisis": "Ambos",
-    "Registro sanitario": "Producto terminado",
-    "Evidencia fotográfica": "Producto terminado",
-}
 # -----------------------------------------------------------
 # ESTADO INICIAL (se mantiene tu bloque)
+# El catálogo sale del paquete de reglas vigente; si el archivo cambió
+# desde el último rerun (o se cargó un registro de otra versión), el estado
+# de la sesión se alinea con los ítems de la versión actual.
 # -----------------------------------------------------------
+catalogo = catalogo_vigente()
 if "status" not in st.session_state:
-    st.session_state.status = {i[0]: "none" for c in CATEGORIAS.values() for i in c}
+    st.session_state.status = catalogo.estado_inicial()
 if "note" not in st.session_state:
-    st.session_state.note = {i[0]: "" for c in CATEGORIAS.values() for i in c}
+    st.session_state.note = catalogo.notas_iniciales()
+if "fotos" not in st.session_state:
+    st.session_state.fotos = {}      # ítem → huellas de las fotos (los bytes quedan en disco)
+if st.session_state.get("reglas_huella") != catalogo.huella:
+    st.session_state.status = {t: st.session_state.status.get(t, "none") for t in catalogo.titulos}
+    st.session_state.note = {t: st.session_state.note.get(t, "") for t in catalogo.titulos}
+    st.session_state.reglas_huella = catalogo.huella
+
+st.sidebar.caption(f"Reglas: versión {catalogo.version} ({', '.join(catalogo.normas)})")
+if error_reglas():
+    st.sidebar.warning(f"El archivo de reglas tiene errores; se usa la versión {catalogo.version}. {error_reglas()}")
 
 # -----------------------------------------------------------
-# INTERFAZ DE CHECKLIST (se mantiene tu estructura)
+# HISTORIAL: guardar y recargar verificaciones (SQLite)
 # -----------------------------------------------------------
-st.header("Checklist normativo completo")
-st.markdown("Cada criterio incluye **qué verificar**, su **recomendación** y **referencia normativa**. Responde con ✅ Cumple / ❌ No cumple / ⚪ No aplica.")
-
-for categoria, items in CATEGORIAS.items():
-    st.subheader(categoria)
+@st.cache_resource
+def obtener_almacen() -> Almacen:
+    return Almacen()
+
+@st.cache_resource
+def obtener_borradores() -> Borradores:
+    return Borradores()
+
+def registro_actual() -> dict:
+    return {
+        "producto": st.session_state.producto, "proveedor": st.session_state.proveedor,
+        "responsable": st.session_state.responsable, "nombre_pdf": st.session_state.nombre_pdf,
+        "area_cm2": st.session_state.area_cm2, "tipo_producto": st.session_state.tipo_producto,
+        "status": st.session_state.status, "note": st.session_state.note, "fotos": st.session_state.fotos,
+        "reglas_version": catalogo.version, "reglas_huella": catalogo.huella,
+    }
+
+def aplicar_registro(registro: dict):
+    st.session_state.status = registro["status"]
+    st.session_state.note = registro["note"]
+    for campo in ("producto", "proveedor", "responsable", "nombre_pdf"):
+        st.session_state[campo] = registro[campo]
+    st.session_state.area_cm2 = registro.get("area_cm2")
+    st.session_state.pop("area_cm2_input", None)
+    st.session_state.tipo_producto = registro.get("tipo_producto")
+    st.session_state.fotos = registro.get("fotos") or {}
+    st.session_state.pop("reglas_huella", None)
+    # Las Observaciones se vuelven a crear con el valor cargado
+    for titulo in registro["note"]:
+        st.session_state.pop(f"{titulo}_nota", None)
+
+def cargar_verificacion(verificacion_id: int):
+    aplicar_registro(obtener_almacen().cargar(verificacion_id))
+
+def retomar_borrador(producto: str):
+    borrador = obtener_borradores().retomar(producto)
+    if borrador:
+        aplicar_registro(borrador)
+
+def autoguardar():
+    # Escritura agrupada (como máximo una cada pocos segundos) y solo si algo cambió
+    obtener_borradores().guardar(registro_actual())
+
+almacen = obtener_almacen()
+st.sidebar.header("Historial")
+if st.sidebar.button("💾 Guardar verificación"):
+    registro = registro_actual()
+    vid = almacen.guardar(registro)
+    obtener_borradores().descartar(producto, guardado=registro)
+    st.sidebar.success(f"Verificación #{vid} guardada")
+
+anteriores = almacen.buscar(producto=producto.strip() or None, limite=20)
+if anteriores:
+    elegida = st.sidebar.selectbox(
+        "Verificaciones anteriores",
+        options=[v["id"] for v in anteriores],
+        format_func=lambda vid: next(
+            f"#{v['id']} {v['fecha'][:16]} — {v['producto'] or '-'} ({v['porcentaje']}%)" for v in anteriores if v["id"] == vid
+        ),
+    )
+    st.sidebar.button("Cargar en el checklist", on_click=cargar_verificacion, args=(elegida,))
 
-    for item in items:
-        titulo, que_verificar, recomendacion, referencia = item
-        estado = st.session_state.status.get(titulo, "none")
+con_borrador = obtener_borradores().productos()
+if con_borrador:
+    retomar = st.sidebar.selectbox("Borradores sin terminar", options=con_borrador)
+    st.sidebar.button("Retomar borrador", on_click=retomar_borrador, args=(retomar,))
 
-        if filter_no and estado != "no":
-            continue
+# -----------------------------------------------------------
+# RESUMEN DE CUMPLIMIENTO (sobre ítems contestados Sí/No)
+# Se pinta en un contenedor fijo para que cada ítem pueda refrescarlo
+# sin volver a ejecutar todo el script.
+# -----------------------------------------------------------
+def pintar_resumen(slot) -> dict:
+    resumen = resumen_estados(st.session_state.status, st.session_state.tipo_producto)
+    with slot.container():
+        st.metric("Cumplimiento total (sobre ítems contestados)", f"{resumen['percent']}%")
+        st.write(
+            f"CUMPLE: {resumen['yes']} — NO CUMPLE: {resumen['no']} — "
+            f"NO APLICA: {resumen['na']} — "
+            f"SIN RESPONDER: {resumen['none']}"
+        )
+    return resumen
 
-        st.markdown(f"### {titulo}")
-        st.markdown(f"**Qué verificar:** {que_verificar}")
-        st.markdown(f"**Referencia:** {referencia}")
-        st.markdown(f"**Aplica a:** {APLICA.get(titulo, 'Ambos')}")
-
-        # 🔹 BLOQUE informativo existente — Solo para "Tamaño del sello" (Tabla 17)
-        if titulo == "Tamaño del sello":
-            st.markdown("**Referencia normativa: Tabla 17 — Tamaño mínimo del sello según el área principal del envase**")
-            opciones_tabla17 = {
-                "< 30 cm²": "Se rotula envase secundario y si no cuenta con el se incluye QR o página web para consultar",
-                "≥30 a < 35 cm²": "1,7 cm de lado",
-                "≥35 a < 40 cm²": "1,8 cm de lado",
-                "≥40 a < 50 cm²": "2,0 cm de lado",
-                "≥50 a < 60 cm²": "2,2 cm de lado",
-                "≥60 a < 80 cm²": "2,5 cm de lado",
-                "≥80 a < 100 cm²": "2,8 cm de lado",
-                "≥100 a < 125 cm²": "3,1 cm de lado",
-                "≥125 a < 150 cm²": "3,4 cm de lado",
-                "≥150 a < 200 cm²": "3,9 cm de lado",
-                "≥200 a < 250 cm²": "4,4 cm de lado",
-                "≥250 a < 300 cm²": "4,8 cm de lado",
-                "> 300 cm²": "15% del tamaño de la cara principal"
-            }
-            seleccion_tabla17 = st.selectbox(
-                "Consulta informativa (no se guarda en el reporte):",
-                options=list(opciones_tabla17.keys()),
-                key=f"tabla17_{titulo}"
-            )
-            st.info(f"Tamaño mínimo del sello para envases de {seleccion_tabla17}: **{opciones_tabla17[seleccion_tabla17]}**")
-
-        c1, c2, c3, _ = st.columns([0.12, 0.12, 0.12, 0.64])
-        with c1:
-            if st.button("✅ Cumple", key=f"{titulo}_yes"):
-                st.session_state.status[titulo] = "yes"
-        with c2:
-            if st.button("❌ No cumple", key=f"{titulo}_no"):
-                st.session_state.status[titulo] = "no"
-        with c3:
-            if st.button("⚪ No aplica", key=f"{titulo}_na"):
-                st.session_state.status[titulo] = "na"
-
-        estado = st.session_state.status[titulo]
-        if estado == "yes":
-            st.markdown("<div style='background:#e6ffed;padding:6px;border-radius:5px;'>✅ Cumple</div>", unsafe_allow_html=True)
-        elif estado == "no":
-            st.markdown(f"<div style='background:#ffe6e6;padding:6px;border-radius:5px;'>❌ No cumple — {recomendacion}</div>", unsafe_allow_html=True)
-        elif estado == "na":
-            st.markdown("<div style='background:#f2f2f2;padding:6px;border-radius:5px;'>⚪ No aplica</div>", unsafe_allow_html=True)
+# -----------------------------------------------------------
+# CÁLCULO DE SELLOS (nutrientes críticos, Res. 810 mod. 2492)
+# Se muestra dentro del ítem "Límite de nutrientes críticos" y pre-llena
+# ese ítem y el de "Contiene edulcorante".
+# -----------------------------------------------------------
+def render_calculo_sellos():
+    with st.expander("Calcular sellos a partir de la tabla nutricional (por 100 g o 100 mL)"):
+        n1, n2, n3 = st.columns(3)
+        with n1:
+            energia = st.number_input("Energía (kcal)", min_value=0.0, step=1.0)
+            azucares = st.number_input("Azúcares libres (g)", min_value=0.0, step=0.1)
+        with n2:
+            saturadas = st.number_input("Grasas saturadas (g)", min_value=0.0, step=0.1)
+            trans = st.number_input("Grasas trans (g)", min_value=0.0, step=0.01)
+        with n3:
+            sodio = st.number_input("Sodio (mg)", min_value=0.0, step=1.0)
+            bebida = st.checkbox("Es bebida (por 100 mL)")
+            edulcorante = st.checkbox("Contiene edulcorantes")
+
+        resultado = evaluar_producto(
+            energia_kcal=energia, azucares_libres_g=azucares, grasas_saturadas_g=saturadas,
+            grasas_trans_g=trans, sodio_mg=sodio, es_bebida=bebida, contiene_edulcorante=edulcorante,
+        )
+        if resultado["sellos"]:
+            st.warning(f"Sellos exigidos: **{', '.join(resultado['sellos'])}** — {resultado['motivo']}")
         else:
-            st.markdown("<div style='background:#fff;padding:6px;border-radius:5px;'>Sin responder</div>", unsafe_allow_html=True)
-
-        nota = st.text_area("Observación (opcional)", value=st.session_state.note.get(titulo, ""), key=f"{titulo}_nota")
-        st.session_state.note[titulo] = nota
-        st.markdown("---")
+            st.success("Ningún nutriente crítico supera los límites: no se exigen sellos.")
+
+        presentes = st.multiselect("Sellos presentes en la etiqueta", options=list(SELLOS.values()))
+        if st.button("Aplicar al checklist"):
+            status, note = prellenar_checklist(resultado, presentes)
+            st.session_state.status.update(status)
+            st.session_state.note.update(note)
+            for titulo in note:
+                st.session_state.pop(f"{titulo}_nota", None)
+            # Cambia dos ítems y el resumen: se vuelve a pintar la página completa
+            st.rerun()
 
 # -----------------------------------------------------------
-# CÁLCULO DE CUMPLIMIENTO (sobre ítems contestados Sí/No)
+# TABLA 17 — Tamaño mínimo del sello según el área principal del envase
 # -----------------------------------------------------------
-yes_count = sum(1 for v in st.session_state.status.values() if v == "yes")
-no_count = sum(1 for v in st.session_state.status.values() if v == "no")
-answered_count = yes_count + no_count
-percent = round((yes_count / answered_count * 100), 1) if answered_count > 0 else 0.0
-
-st.metric("Cumplimiento total (sobre ítems contestados)", f"{percent}%")
-st.write(
-    f"CUMPLE: {yes_count} — NO CUMPLE: {no_count} — "
-    f"NO APLICA: {sum(1 for v in st.session_state.status.values() if v == 'na')} — "
-    f"SIN RESPONDER: {sum(1 for v in st.session_state.status.values() if v == 'none')}"
-)
+def copiar_area():
+    st.session_state.area_cm2 = st.session_state.area_cm2_input
+
+def render_tabla17():
+    st.markdown("**Referencia normativa: Tabla 17 — Tamaño mínimo del sello según el área principal del envase**")
+    # El valor vive fuera del widget: Streamlit borra la clave de un widget que deja de
+    # mostrarse (ítem filtrado u oculto por el tipo de producto) y el área se perdería
+    if "area_cm2_input" not in st.session_state:
+        st.session_state.area_cm2_input = st.session_state.area_cm2
+    area = st.number_input("Área de la cara principal del envase (cm²)", min_value=0.0, step=1.0,
+                           key="area_cm2_input", on_change=copiar_area)
+    if area:
+        sello = lado_minimo_sello(area)
+        st.info(f"Tamaño mínimo del sello para envases de {sello['intervalo']}: **{sello['regla']}** (se incluye en el informe)")
+
+    catalogo_envases = st.file_uploader("Calcular para un catálogo de envases (CSV con columna area_cm2)", type="csv")
+    if catalogo_envases is not None:
+        import pandas as pd
+        resultado = dimensionar_catalogo(pd.read_csv(catalogo_envases))
+        st.dataframe(resultado, use_container_width=True)
+        st.download_button("Descargar tamaños de sello (CSV)", data=resultado.to_csv(index=False).encode("utf-8"),
+                           file_name="tamanos_sello.csv", mime="text/csv", key="tabla17_descarga")
 
 # -----------------------------------------------------------
-# ARMAR DataFrame para PDF (sin categorías ni 'Qué verificar')
+# REVISIÓN AUTOMÁTICA DEL TEXTO DEL RÓTULO
+# Pre-contesta los ítems que se pueden comprobar sobre la transcripción
+# (solo los que siguen sin responder) y deja la evidencia en la Observación.
 # -----------------------------------------------------------
-rows = []
-for items in CATEGORIAS.values():
-    for titulo, que_verificar, recomendacion, referencia in items:
-        estado_val = st.session_state.status.get(titulo, "none")
-        estado_humano = (
-            "Cumple" if estado_val == "yes"
-            else "No cumple" if estado_val == "no"
-            else "No aplica" if estado_val == "na"
-            else "Sin responder"
-        )
-        rows.append({
-            "Ítem": titulo,
-            "Estado": estado_humano,
-            "Recomendación": recomendacion,
-            "Referencia": referencia,
-            "Observación": st.session_state.note.get(titulo, "")
-        })
+def render_revision_rotulo():
+    with st.expander("Revisión automática del texto del rótulo"):
+        texto = st.text_area("Texto de la etiqueta (transcripción)", height=150)
+        resultado = revisar_rotulo(texto) if texto.strip() else {}
+        for item, hallazgo in resultado.items():
+            icono = "✅" if hallazgo.estado == "yes" else "❌"
+            st.markdown(f"{icono} **{item}** — {nota_evidencia(hallazgo)}")
+        if texto.strip() and not resultado:
+            st.caption("Ninguna regla encontró evidencia en el texto.")
+
+        if resultado and st.button("Aplicar al checklist", key="rotulo_aplicar"):
+            for item, hallazgo in resultado.items():
+                if st.session_state.status.get(item) != "none":
+                    continue
+                st.session_state.status[item] = hallazgo.estado
+                anterior = st.session_state.note.get(item, "")
+                st.session_state.note[item] = (anterior + "\n" if anterior else "") + nota_evidencia(hallazgo)
+                st.session_state.pop(f"{item}_nota", None)
+            st.rerun()
+
+        rotulos = st.file_uploader(f"Revisar muchos rótulos (CSV con columna {COLUMNA_TEXTO})", type="csv")
+        if rotulos is not None:
+            import csv
+            import io
+            filas = list(csv.DictReader(io.StringIO(rotulos.getvalue().decode("utf-8-sig"))))
+            salida = io.StringIO()
+            escribir_prellenado(filas, salida)
+            st.caption(f"{len(filas)} rótulos revisados. El CSV se puede procesar con lote.py.")
+            st.download_button("Descargar checklist pre-llenado (CSV)", data=salida.getvalue().encode("utf-8"),
+                               file_name="checklist_prellenado.csv", mime="text/csv", key="rotulo_descarga")
 
-df = pd.DataFrame(rows, columns=["Ítem", "Estado", "Recomendación", "Referencia", "Observación"])
+# -----------------------------------------------------------
+# FOTOS DE EVIDENCIA POR ÍTEM
+# Al subirlas se guardan en disco por contenido y el cargador se vacía
+# (cambia su key): en la sesión solo quedan las huellas.
+# -----------------------------------------------------------
+def subir_fotos(titulo: str, clave: str):
+    huellas = st.session_state.fotos.setdefault(titulo, [])
+    for archivo in st.session_state.get(clave) or []:
+        try:
+            huella = ALMACEN_FOTOS.guardar(archivo.getvalue())
+        except FotoInvalida as exc:
+            st.session_state[f"{titulo}_fotos_error"] = f"{archivo.name}: {exc}"
+            continue
+        if huella not in huellas:
+            huellas.append(huella)
+    st.session_state[f"{titulo}_fotos_v"] = st.session_state.get(f"{titulo}_fotos_v", 0) + 1
+
+def quitar_fotos(titulo: str):
+    st.session_state.fotos.pop(titulo, None)
+
+def render_fotos(titulo: str):
+    # El cargador y las miniaturas solo se construyen si se abre la sección. El interruptor
+    # no lleva key (su `help` lo distingue entre ítems): cada key de widget encarece los
+    # text_area de la página, que recorren todo st.session_state en cada rerun.
+    huellas = st.session_state.fotos.get(titulo, [])
+    if not st.toggle("📷 Fotos de evidencia", help=f"Fotos de evidencia de «{titulo}»"):
+        if huellas:
+            st.caption(f"{len(huellas)} foto(s) guardada(s)")
+        return
+    huellas = [h for h in huellas if ALMACEN_FOTOS.existe(h)]
+    if huellas:
+        st.image([str(ALMACEN_FOTOS.miniatura(h)) for h in huellas], width=LADO_VISTA)
+        st.button("Quitar fotos", key=f"{titulo}_fotos_quitar", on_click=quitar_fotos, args=(titulo,))
+    error = st.session_state.pop(f"{titulo}_fotos_error", None)
+    if error:
+        st.warning(error)
+    clave = f"{titulo}_fotos_{st.session_state.get(f'{titulo}_fotos_v', 0)}"
+    st.file_uploader("Agregar fotos", type=list(TIPOS_IMAGEN), accept_multiple_files=True, key=clave,
+                     on_change=subir_fotos, args=(titulo, clave))
 
 # -----------------------------------------------------------
-# UTILIDAD: dividir Observación en renglones reales
+# ÍTEM DEL CHECKLIST
+# Cada ítem es un fragmento: un clic en sus botones o un cambio en su
+# Observación solo vuelve a ejecutar ese ítem (y el resumen), no la página.
 # -----------------------------------------------------------
-def split_observation_text(text: str, chunk: int = 100) -> str:
-    """Divide el texto de Observación en líneas de 'chunk' caracteres (sin sangría)."""
-    if not text:
-        return ""
-    s = str(text)
-    if len(s) <= chunk:
-        return s
-    parts = [s[i:i+chunk] for i in range(0, len(s), chunk)]
-    return "\n".join(parts)
+@st.fragment
+def render_item(item: Item):
+    medicion_fragmento = Medicion("fragmento") if es_rerun_de_fragmento() else None
+    titulo = item.titulo
+    st.markdown(f"### {titulo}")
+    st.markdown(f"**Qué verificar:** {item.que_verificar}")
+    st.markdown(f"**Referencia:** {item.referencia}")
+    st.markdown(f"**Aplica a:** {item.aplica}")
+
+    # 🔹 Tabla 17 — Solo para "Tamaño del sello": cálculo numérico que se guarda con la verificación
+    if titulo == "Tamaño del sello":
+        render_tabla17()
+
+    if titulo == ITEM_LIMITES:
+        render_calculo_sellos()
+
+    anterior = st.session_state.status[titulo]
+    c1, c2, c3, _ = st.columns([0.12, 0.12, 0.12, 0.64])
+    with c1:
+        if st.button("✅ Cumple", key=f"{titulo}_yes"):
+            st.session_state.status[titulo] = "yes"
+    with c2:
+        if st.button("❌ No cumple", key=f"{titulo}_no"):
+            st.session_state.status[titulo] = "no"
+    with c3:
+        if st.button("⚪ No aplica", key=f"{titulo}_na"):
+            st.session_state.status[titulo] = "na"
+
+    estado = st.session_state.status[titulo]
+    if estado == "yes":
+        st.markdown("<div style='background:#e6ffed;padding:6px;border-radius:5px;'>✅ Cumple</div>", unsafe_allow_html=True)
+    elif estado == "no":
+        st.markdown(f"<div style='background:#ffe6e6;padding:6px;border-radius:5px;'>❌ No cumple — {item.recomendacion}</div>", unsafe_allow_html=True)
+    elif estado == "na":
+        st.markdown("<div style='background:#f2f2f2;padding:6px;border-radius:5px;'>⚪ No aplica</div>", unsafe_allow_html=True)
+    else:
+        st.markdown("<div style='background:#fff;padding:6px;border-radius:5px;'>Sin responder</div>", unsafe_allow_html=True)
+
+    # La key se siembra una sola vez desde `note` (y se borra cuando `note` cambia por otra vía)
+    clave_nota = f"{titulo}_nota"
+    if clave_nota not in st.session_state:
+        st.session_state[clave_nota] = st.session_state.note.get(titulo, "")
+    st.session_state.note[titulo] = st.text_area("Observación (opcional)", key=clave_nota)
+    render_fotos(titulo)
+    st.markdown("---")
+
+    # En un rerun del fragmento el resto de la página no se vuelve a pintar:
+    # se actualiza el resumen creado en el último rerun completo.
+    if estado != anterior and "resumen_slot" in globals():
+        pintar_resumen(resumen_slot)
+    if medicion_fragmento:
+        # En un rerun completo se autoguarda una sola vez, al final del script
+        autoguardar()
+        METRICAS.registrar_rerun(medicion_fragmento, widgets_del_rerun(), tamano_sesion(st.session_state))
 
 # -----------------------------------------------------------
-# PDF: A4 horizontal, sin cortes, con wrapping y saltos en Observación
+# INTERFAZ DE CHECKLIST (se mantiene tu estructura)
 # -----------------------------------------------------------
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.units import mm
-from reportlab.lib import colors
-
-def generar_pdf(df: pd.DataFrame, producto: str, proveedor: str, responsable: str, porcentaje: float, nombre_archivo: str) -> BytesIO:
-    buf = BytesIO()
-
-    # Márgenes 8 mm para aprovechar ancho; A4 landscape ≈ 297 x 210 mm
-    doc = SimpleDocTemplate(
-        buf,
-        pagesize=landscape(A4),
-        leftMargin=8*mm, rightMargin=8*mm,
-        topMargin=8*mm, bottomMargin=8*mm
-    )
+st.header("Checklist normativo completo")
+st.markdown("Cada criterio incluye **qué verificar**, su **recomendación** y **referencia normativa**. Responde con ✅ Cumple / ❌ No cumple / ⚪ No aplica.")
+render_revision_rotulo()
+
+# Los filtros se resuelven sobre el catálogo compilado (tipo de producto e índice
+# de búsqueda); solo se construyen los widgets de los ítems visibles.
+encontrados = catalogo.buscar(busqueda)
+visibles = [
+    item for item in catalogo.aplicables(tipo_producto)
+    if (encontrados is None or item.indice in encontrados)
+    and (not filter_no or st.session_state.status.get(item.titulo, "none") == "no")
+]
+if not visibles:
+    st.info("Ningún ítem coincide con los filtros.")
+
+with medicion.tramo("checklist"):
+    for categoria, items in groupby(visibles, key=lambda item: item.categoria):
+        st.subheader(categoria)
+
+        for item in items:
+            render_item(item)
 
-    styles = getSampleStyleSheet()
-    style_header = ParagraphStyle("header", parent=styles["Normal"], fontSize=8, leading=10)
-    style_cell   = ParagraphStyle("cell",   parent=styles["Normal"], fontSize=7.5, leading=9)
-
-    story = []
-    # Encabezado
-    story.append(Paragraph("<b>Informe de verificación de etiquetado nutricional — Juan Valdez</b>", style_header))
-    story.append(Spacer(1, 3*mm))
-    fecha_str = datetime.now().strftime("%Y-%m-%d")
-    meta = (
-        f"<b>Fecha:</b> {fecha_str} &nbsp;&nbsp; "
-        f"<b>Producto:</b> {producto or '-'} &nbsp;&nbsp; "
-        f"<b>Proveedor:</b> {proveedor or '-'} &nbsp;&nbsp; "
-        f"<b>Responsable:</b> {responsable or '-'}"
-    )
-    story.append(Paragraph(meta, style_header))
-    story.append(Spacer(1, 5*mm))
-    story.append(Paragraph(f"<b>Cumplimiento (sobre ítems contestados):</b> {porcentaje}%", style_header))
-    story.append(Spacer(1, 5*mm))
-
-    # Tabla
-    data = [["Ítem", "Estado", "Recomendación", "Referencia", "Observación"]]
-    for _, r in df.iterrows():
-        obs = r["Observación"] or "-"
-        if obs != "-":
-            obs = split_observation_text(obs, chunk=100)
-
-        data.append([
-            Paragraph(str(r["Ítem"]),          style_cell),
-            Paragraph(str(r["Estado"]),        style_cell),
-            Paragraph(str(r["Recomendación"]), style_cell),
-            Paragraph(str(r["Referencia"]),    style_cell),
-            Paragraph(obs,                     style_cell),
-        ])
-
-    # Anchos (total útil ≈ 281 mm). Suma = 70 + 25 + 100 + 45 + 40 = 280 mm
-    col_widths = [70*mm, 25*mm, 100*mm, 45*mm, 40*mm]
-
-    tbl = Table(data, colWidths=col_widths, repeatRows=1)
-    tbl.setStyle(TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#f2f2f2")),
-        ("FONTNAME",   (0,0), (-1,0), "Helvetica-Bold"),
-        ("FONTSIZE",   (0,0), (-1,0), 8),
-        ("GRID",       (0,0), (-1,-1), 0.25, colors.grey),
-        ("VALIGN",     (0,0), (-1,-1), "TOP"),
-        ("LEFTPADDING",(0,0), (-1,-1), 3),
-        ("RIGHTPADDING",(0,0), (-1,-1), 3),
-    ]))
-
-    story.append(tbl)
-    doc.build(story)
-    buf.seek(0)
-    return buf
+# -----------------------------------------------------------
+# CÁLCULO DE CUMPLIMIENTO (sobre ítems contestados Sí/No)
+# -----------------------------------------------------------
+resumen_slot = st.empty()
+with medicion.tramo("resumen"):
+    resumen = pintar_resumen(resumen_slot)
+percent = resumen["percent"]
 
 # -----------------------------------------------------------
 # BOTÓN ÚNICO: Generar y descargar PDF
+# (el DataFrame solo se arma cuando se pide el informe; el PDF se construye
+# en el pool compartido y el botón de descarga aparece al terminar)
 # -----------------------------------------------------------
+@st.cache_resource
+def obtener_cola() -> ColaInformes:
+    return ColaInformes.desde_entorno()
+
+def panel_informe(sondeando: bool):
+    trabajo = obtener_cola().estado(st.session_state.trabajo_pdf)
+    if sondeando and trabajo["estado"] not in ("en cola", "generando"):
+        # Terminó: un rerun completo vuelve a crear el panel sin `run_every`
+        st.rerun()
+    if trabajo["estado"] == "listo":
+        file_name = (st.session_state.nombre_pdf.strip() or f"informe_{datetime.now().strftime('%Y%m%d')}") + ".pdf"
+        st.download_button("Descargar PDF", data=trabajo["datos"], file_name=file_name, mime="application/pdf")
+        stats = obtener_cola().cache.estadisticas()
+        st.caption(f"Caché de informes: {stats['hits']} aciertos, {stats['misses']} fallos, {stats['entradas']} en memoria")
+    elif trabajo["estado"] == "error":
+        st.error(f"No se pudo generar el informe: {trabajo['error']}")
+    elif trabajo["estado"] != "desconocido":
+        st.info(f"⏳ Informe {trabajo['estado']}… {trabajo['segundos']:.0f} s (puedes seguir respondiendo el checklist)")
+
 st.subheader("Generar informe PDF (A4 horizontal)")
 if st.button("Generar PDF"):
-    pdf_buffer = generar_pdf(df, producto, proveedor, responsable, percent, nombre_pdf)
-    file_name = (nombre_pdf.strip() or f"informe_{datetime.now().strftime('%Y%m%d')}") + ".pdf"
-    st.download_button("Descargar PDF", data=pdf_buffer, file_name=file_name, mime="application/pdf")
+    from informe import construir_df
+    with medicion.tramo("df"):
+        df = construir_df(st.session_state.status, st.session_state.note, tipo_producto)
+    try:
+        fotos = {t: st.session_state.fotos[t] for t in df["Ítem"] if st.session_state.fotos.get(t)}
+        st.session_state.trabajo_pdf = obtener_cola().enviar(df, producto, proveedor, responsable, percent, nombre_pdf,
+                                                             area_cm2=st.session_state.area_cm2, fotos=fotos)
+    except ColaLlena as exc:
+        st.warning(str(exc))
+
+if st.session_state.get("trabajo_pdf"):
+    en_curso = obtener_cola().estado(st.session_state.trabajo_pdf)["estado"] in ("en cola", "generando")
+    st.fragment(panel_informe, run_every=1.0 if en_curso else None)(en_curso)
+
+autoguardar()
+if perfilador:
+    perfilador.detener()
+
+# -----------------------------------------------------------
+# DIAGNÓSTICO DE RENDIMIENTO
+# -----------------------------------------------------------
+def panel_diagnostico():
+    with st.sidebar.expander("Diagnóstico de rendimiento"):
+        ultimo = st.session_state.get("ultimo_rerun")
+        if ultimo:
+            tramos = " · ".join(f"{n} {s * 1000:.0f} ms" for n, s in ultimo["tramos"].items())
+            st.caption(f"Último rerun: {ultimo['segundos'] * 1000:.0f} ms ({tramos}) — {ultimo['widgets']} widgets — "
+                       f"sesión {ultimo['bytes_sesion'] / 1024:.0f} KB")
+        st.toggle("Perfilar esta sesión (cProfile)", key="perfilar")
+        guardado = st.session_state.get("perfilador")
+        if guardado and guardado.reruns:
+            st.caption(f"Perfil acumulado de {guardado.reruns} reruns")
+            st.code(guardado.resumen(), language=None)
+            st.download_button("Descargar perfil (.prof)", data=guardado.volcado(), file_name="perfil_sesion.prof",
+                               mime="application/octet-stream", key="perfil_descarga")
+
+panel_diagnostico()
+st.session_state.ultimo_rerun = METRICAS.registrar_rerun(medicion, widgets_del_rerun(), tamano_sesion(st.session_state))
@@ -0,0 +1,357 @@
+"""Almacenamiento persistente de verificaciones en SQLite.
+
+Cada verificación guarda su encabezado (producto, proveedor, responsable,
+fecha, porcentaje, versión del paquete de reglas), un renglón por ítem con su
+estado y observación, y las huellas de sus fotos de evidencia (ver `evidencias.py`).
+La base se abre en modo WAL y cada verificación se escribe en una sola
+transacción. No importa Streamlit.
+
+Para el tablero de proveedores se mantienen, en la misma transacción que cada
+verificación, dos tablas de agregados por proveedor y mes (AAAA-MM):
+`agregado_mes` (verificaciones, suma de porcentajes, con algún "No cumple") y
+`agregado_item` (cuántas veces quedó cada ítem en cada estado). Como en el resumen del
+checklist, con tipo de producto solo cuentan los ítems que le aplican. Las consultas del
+tablero leen solo esas tablas, sin recorrer los resultados de cada verificación.
+"""
+import sqlite3
+import threading
+from datetime import datetime
+from itertools import groupby
+
+from catalogo import catalogo_vigente, resumen_estados, titulos
+
+RUTA_DB = "verificaciones.db"
+
+# Posición de cada estado en las columnas de agregado_item (lo demás cuenta como sin responder)
+_COLUMNA_ESTADO = {"yes": 0, "no": 1, "na": 2}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS verificaciones (
+    id          INTEGER PRIMARY KEY,
+    producto    TEXT NOT NULL,
+    proveedor   TEXT NOT NULL,
+    responsable TEXT NOT NULL,
+    nombre_pdf  TEXT NOT NULL DEFAULT '',
+    fecha       TEXT NOT NULL,
+    porcentaje  REAL NOT NULL,
+    area_cm2    REAL,
+    reglas_version TEXT,
+    reglas_huella  TEXT,
+    tipo_producto  TEXT
+);
+CREATE TABLE IF NOT EXISTS resultados (
+    verificacion_id INTEGER NOT NULL REFERENCES verificaciones(id) ON DELETE CASCADE,
+    item            TEXT NOT NULL,
+    estado          TEXT NOT NULL,
+    observacion     TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (verificacion_id, item)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fotos (
+    verificacion_id INTEGER NOT NULL REFERENCES verificaciones(id) ON DELETE CASCADE,
+    item            TEXT NOT NULL,
+    orden           INTEGER NOT NULL,
+    huella          TEXT NOT NULL,
+    PRIMARY KEY (verificacion_id, item, orden)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS agregado_mes (
+    proveedor      TEXT NOT NULL,
+    mes            TEXT NOT NULL,
+    verificaciones INTEGER NOT NULL,
+    suma_porcentaje REAL NOT NULL,
+    con_no_cumple  INTEGER NOT NULL,
+    PRIMARY KEY (proveedor, mes)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS agregado_item (
+    proveedor TEXT NOT NULL,
+    mes       TEXT NOT NULL,
+    item      TEXT NOT NULL,
+    cumple        INTEGER NOT NULL,
+    no_cumple     INTEGER NOT NULL,
+    no_aplica     INTEGER NOT NULL,
+    sin_responder INTEGER NOT NULL,
+    PRIMARY KEY (proveedor, mes, item)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_agregado_item_mes ON agregado_item(mes, item);
+CREATE INDEX IF NOT EXISTS ix_verif_producto    ON verificaciones(producto, fecha);
+CREATE INDEX IF NOT EXISTS ix_verif_proveedor   ON verificaciones(proveedor, fecha);
+CREATE INDEX IF NOT EXISTS ix_verif_responsable ON verificaciones(responsable, fecha);
+CREATE INDEX IF NOT EXISTS ix_verif_fecha       ON verificaciones(fecha);
+CREATE INDEX IF NOT EXISTS ix_result_item       ON resultados(item, estado, verificacion_id);
+CREATE INDEX IF NOT EXISTS ix_result_estado     ON resultados(estado, verificacion_id);
+"""
+
+
+def _estados_contables(estados: list, tipo_producto: str = None) -> list:
+    """Los (ítem, estado) que cuenta `resumen_estados`: con tipo de producto, solo los que le aplican."""
+    if not tipo_producto:
+        return estados
+    aplicables = {item.titulo for item in catalogo_vigente().aplicables(tipo_producto)}
+    return [(titulo, estado) for titulo, estado in estados if titulo in aplicables]
+
+
+class Almacen:
+    """Acceso a la base de verificaciones.
+
+    Una sola conexión compartida entre hilos (protegida con un lock), pensada
+    para crearse una vez por proceso con `st.cache_resource`.
+    """
+
+    def __init__(self, ruta: str = RUTA_DB):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(ruta, check_same_thread=False)
+        self._con.row_factory = sqlite3.Row
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute("PRAGMA foreign_keys=ON")
+        self._con.executescript(_ESQUEMA)
+        self._migrar()
+
+    def _migrar(self) -> None:
+        # Bases creadas antes de guardar el área de la Tabla 17
+        columnas = {r["name"] for r in self._con.execute("PRAGMA table_info(verificaciones)")}
+        if "area_cm2" not in columnas:
+            self._con.execute("ALTER TABLE verificaciones ADD COLUMN area_cm2 REAL")
+        # ... y antes de registrar la versión del paquete de reglas y el tipo de producto
+        for columna in ("reglas_version", "reglas_huella", "tipo_producto"):
+            if columna not in columnas:
+                self._con.execute(f"ALTER TABLE verificaciones ADD COLUMN {columna} TEXT")
+        # ... y antes de los agregados del tablero: se calculan una vez con lo ya guardado
+        vacios = self._con.execute("SELECT NOT EXISTS (SELECT 1 FROM agregado_mes)").fetchone()[0]
+        if vacios and self._con.execute("SELECT EXISTS (SELECT 1 FROM verificaciones)").fetchone()[0]:
+            with self._con:
+                self._reconstruir_agregados()
+
+    def _reconstruir_agregados(self) -> None:
+        # Se recorre en Python para aplicar la misma regla de ítems aplicables que al guardar
+        self._con.execute("DELETE FROM agregado_mes")
+        self._con.execute("DELETE FROM agregado_item")
+        filas = self._con.execute(
+            "SELECT v.id, v.proveedor, v.fecha, v.porcentaje, v.tipo_producto, r.item, r.estado "
+            "FROM verificaciones v LEFT JOIN resultados r ON r.verificacion_id = v.id ORDER BY v.id"
+        )
+        agregados = {}
+        for _, grupo in groupby(filas, key=lambda f: f["id"]):
+            grupo = list(grupo)
+            v = grupo[0]
+            estados = [(f["item"], f["estado"]) for f in grupo if f["item"] is not None]
+            self._acumular(agregados, v["proveedor"], v["fecha"][:7],
+                           _estados_contables(estados, v["tipo_producto"]), v["porcentaje"])
+        self._volcar_agregados(agregados)
+
+    def reconstruir_agregados(self) -> None:
+        """Recalcula los agregados del tablero desde cero (p. ej. tras editar la base a mano)."""
+        with self._lock, self._con:
+            self._reconstruir_agregados()
+
+    def cerrar(self) -> None:
+        with self._lock:
+            self._con.close()
+
+    # -------------------------------------------------------
+    # ESCRITURA
+    # -------------------------------------------------------
+    def _insertar(self, registro: dict, agregados: dict) -> int:
+        status, note = registro["status"], registro.get("note") or {}
+        fecha = registro.get("fecha") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        catalogo = catalogo_vigente()
+        porcentaje = resumen_estados(status, registro.get("tipo_producto"))["percent"]
+        cur = self._con.execute(
+            "INSERT INTO verificaciones (producto, proveedor, responsable, nombre_pdf, fecha, porcentaje, area_cm2, "
+            "reglas_version, reglas_huella, tipo_producto) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (registro.get("producto") or "", registro.get("proveedor") or "", registro.get("responsable") or "",
+             registro.get("nombre_pdf") or "", fecha, porcentaje,
+             registro.get("area_cm2"), registro.get("reglas_version") or catalogo.version,
+             registro.get("reglas_huella") or catalogo.huella, registro.get("tipo_producto")),
+        )
+        vid = cur.lastrowid
+        estados = [(t, status.get(t, "none")) for t in catalogo.titulos]
+        self._con.executemany(
+            "INSERT INTO resultados (verificacion_id, item, estado, observacion) VALUES (?, ?, ?, ?)",
+            [(vid, t, e, note.get(t, "") or "") for t, e in estados],
+        )
+        self._acumular(agregados, registro.get("proveedor") or "", fecha[:7],
+                       _estados_contables(estados, registro.get("tipo_producto")), porcentaje)
+        fotos = registro.get("fotos") or {}
+        self._con.executemany(
+            "INSERT INTO fotos (verificacion_id, item, orden, huella) VALUES (?, ?, ?, ?)",
+            [(vid, t, n, h) for t, huellas in fotos.items() for n, h in enumerate(huellas)],
+        )
+        return vid
+
+    @staticmethod
+    def _acumular(agregados: dict, proveedor: str, mes: str, estados: list, porcentaje: float) -> None:
+        # agregados: (proveedor, mes) → [verificaciones, suma, con_no, {ítem: [yes, no, na, none]}]
+        grupo = agregados.setdefault((proveedor, mes), [0, 0.0, 0, {}])
+        grupo[0] += 1
+        grupo[1] += porcentaje
+        grupo[2] += any(e == "no" for _, e in estados)
+        for titulo, estado in estados:
+            conteo = grupo[3].setdefault(titulo, [0, 0, 0, 0])
+            conteo[_COLUMNA_ESTADO.get(estado, 3)] += 1
+
+    def _volcar_agregados(self, agregados: dict) -> None:
+        """Suma a las tablas de agregados lo acumulado en la transacción en curso."""
+        self._con.executemany(
+            "INSERT INTO agregado_mes (proveedor, mes, verificaciones, suma_porcentaje, con_no_cumple) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (proveedor, mes) DO UPDATE SET "
+            "verificaciones = verificaciones + excluded.verificaciones, "
+            "suma_porcentaje = suma_porcentaje + excluded.suma_porcentaje, "
+            "con_no_cumple = con_no_cumple + excluded.con_no_cumple",
+            [(p, m, n, suma, con_no) for (p, m), (n, suma, con_no, _) in agregados.items()],
+        )
+        self._con.executemany(
+            "INSERT INTO agregado_item (proveedor, mes, item, cumple, no_cumple, no_aplica, sin_responder) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (proveedor, mes, item) DO UPDATE SET "
+            "cumple = cumple + excluded.cumple, no_cumple = no_cumple + excluded.no_cumple, "
+            "no_aplica = no_aplica + excluded.no_aplica, sin_responder = sin_responder + excluded.sin_responder",
+            [(p, m, t, *conteo) for (p, m), grupo in agregados.items() for t, conteo in grupo[3].items()],
+        )
+
+    def guardar(self, registro: dict) -> int:
+        """Guarda una verificación (mismo formato que `lote.cargar_registros`) y devuelve su id."""
+        return self.guardar_varios([registro])[0]
+
+    def guardar_varios(self, registros: list) -> list:
+        """Guarda muchas verificaciones en una sola transacción."""
+        agregados = {}
+        with self._lock, self._con:
+            ids = [self._insertar(r, agregados) for r in registros]
+            self._volcar_agregados(agregados)
+        return ids
+
+    # -------------------------------------------------------
+    # CONSULTAS
+    # -------------------------------------------------------
+    def buscar(self, producto: str = None, proveedor: str = None, responsable: str = None,
+               item: str = None, estado: str = None, desde: str = None, hasta: str = None,
+               limite: int = 500) -> list:
+        """Lista verificaciones filtradas; `item`/`estado` filtran por el resultado de un ítem.
+
+        `desde` y `hasta` son fechas ISO (hasta es exclusiva), p. ej. desde="2026-01-01".
+        """
+        condiciones, params = [], []
+        for columna, valor in (("v.producto", producto), ("v.proveedor", proveedor), ("v.responsable", responsable)):
+            if valor:
+                condiciones.append(f"{columna} = ?")
+                params.append(valor)
+        if desde:
+            condiciones.append("v.fecha >= ?")
+            params.append(desde)
+        if hasta:
+            condiciones.append("v.fecha < ?")
+            params.append(hasta)
+
+        sql = "SELECT v.*"
+        if item or estado:
+            sql += ", r.item, r.estado, r.observacion FROM resultados r JOIN verificaciones v ON v.id = r.verificacion_id"
+            if item:
+                condiciones.append("r.item = ?")
+                params.append(item)
+            if estado:
+                condiciones.append("r.estado = ?")
+                params.append(estado)
+        else:
+            sql += " FROM verificaciones v"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY v.fecha DESC, v.id DESC LIMIT ?"
+        params.append(limite)
+        with self._lock:
+            return [dict(r) for r in self._con.execute(sql, params)]
+
+    def productos(self, limite: int = 500) -> list:
+        """Productos con verificaciones guardadas, del verificado más recientemente al más antiguo."""
+        with self._lock:
+            return [r[0] for r in self._con.execute(
+                "SELECT producto FROM verificaciones GROUP BY producto ORDER BY max(fecha) DESC LIMIT ?", (limite,)
+            )]
+
+    def cargar(self, verificacion_id: int) -> dict:
+        """Devuelve una verificación guardada con sus diccionarios status/note."""
+        with self._lock:
+            cab = self._con.execute("SELECT * FROM verificaciones WHERE id = ?", (verificacion_id,)).fetchone()
+            if cab is None:
+                raise KeyError(f"No existe la verificación {verificacion_id}")
+            filas = self._con.execute(
+                "SELECT item, estado, observacion FROM resultados WHERE verificacion_id = ?", (verificacion_id,)
+            ).fetchall()
+            fotos = self._con.execute(
+                "SELECT item, huella FROM fotos WHERE verificacion_id = ? ORDER BY item, orden", (verificacion_id,)
+            ).fetchall()
+        registro = dict(cab)
+        registro["status"] = {t: "none" for t in titulos()}
+        registro["note"] = {t: "" for t in titulos()}
+        for f in filas:
+            if f["item"] in registro["status"]:
+                registro["status"][f["item"]] = f["estado"]
+                registro["note"][f["item"]] = f["observacion"]
+        registro["fotos"] = {}
+        for f in fotos:
+            registro["fotos"].setdefault(f["item"], []).append(f["huella"])
+        return registro
+
+    # -------------------------------------------------------
+    # TABLERO (solo tablas de agregados)
+    # -------------------------------------------------------
+    @staticmethod
+    def _filtro_agregados(proveedores: list, desde: str, hasta: str) -> tuple:
+        condiciones, params = [], []
+        if proveedores:
+            condiciones.append(f"proveedor IN ({', '.join('?' * len(proveedores))})")
+            params += list(proveedores)
+        if desde:
+            condiciones.append("mes >= ?")
+            params.append(desde[:7])
+        if hasta:
+            condiciones.append("mes <= ?")
+            params.append(hasta[:7])
+        return (" WHERE " + " AND ".join(condiciones) if condiciones else ""), params
+
+    def proveedores(self) -> list:
+        """Proveedores con alguna verificación guardada, de más a menos verificaciones."""
+        with self._lock:
+            return [r[0] for r in self._con.execute(
+                "SELECT proveedor FROM agregado_mes GROUP BY proveedor ORDER BY sum(verificaciones) DESC, proveedor"
+            )]
+
+    def meses(self) -> list:
+        """Meses ("AAAA-MM") con alguna verificación, en orden."""
+        with self._lock:
+            return [r[0] for r in self._con.execute("SELECT DISTINCT mes FROM agregado_mes ORDER BY mes")]
+
+    def tendencia_proveedores(self, proveedores: list = None, desde: str = None, hasta: str = None) -> list:
+        """Por proveedor y mes: verificaciones, cumplimiento promedio y cuántas tuvieron algún "No cumple".
+
+        `desde` y `hasta` son meses "AAAA-MM" (ambos incluidos).
+        """
+        donde, params = self._filtro_agregados(proveedores, desde, hasta)
+        sql = ("SELECT proveedor, mes, verificaciones, suma_porcentaje, "
+               "round(suma_porcentaje / verificaciones, 1) AS promedio, con_no_cumple FROM agregado_mes" + donde + " ORDER BY mes, proveedor")
+        with self._lock:
+            return [dict(r) for r in self._con.execute(sql, params)]
+
+    def items_incumplidos(self, proveedores: list = None, desde: str = None, hasta: str = None,
+                          limite: int = None) -> list:
+        """Ítems ordenados por veces en "No cumple", con la tasa sobre las veces que se contestaron Sí/No."""
+        donde, params = self._filtro_agregados(proveedores, desde, hasta)
+        sql = ("SELECT item, sum(no_cumple) AS no_cumple, sum(cumple) AS cumple, sum(no_aplica) AS no_aplica, "
+               "sum(sin_responder) AS sin_responder FROM agregado_item" + donde +
+               " GROUP BY item HAVING sum(no_cumple) > 0 ORDER BY no_cumple DESC, item")
+        if limite:
+            sql += " LIMIT ?"
+            params.append(limite)
+        with self._lock:
+            filas = [dict(r) for r in self._con.execute(sql, params)]
+        for f in filas:
+            f["tasa"] = round(f["no_cumple"] / (f["cumple"] + f["no_cumple"]) * 100, 1)
+        return filas
+
+    def incumplimientos_por_categoria(self, proveedores: list = None, desde: str = None, hasta: str = None) -> list:
+        """"No cumple" sumados por categoría del catálogo vigente, de mayor a menor."""
+        categoria_de = {item.titulo: item.categoria for item in catalogo_vigente().items}
+        totales = {}
+        for fila in self.items_incumplidos(proveedores, desde, hasta):
+            categoria = categoria_de.get(fila["item"], "Ítems de versiones anteriores de las reglas")
+            totales[categoria] = totales.get(categoria, 0) + fila["no_cumple"]
+        return [{"categoria": c, "no_cumple": n} for c, n in sorted(totales.items(), key=lambda x: -x[1])]
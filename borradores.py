@@ -0,0 +1,180 @@
+"""Autoguardado de checklists en curso (borradores) en disco local.
+
+Los borradores se agregan como líneas JSON a un único diario (`borradores.jsonl`);
+nunca se reescribe el archivo completo al guardar. Un índice en memoria
+(producto → posición de su última línea) permite retomar un borrador por nombre
+de producto, de modo que el costo de guardar no depende de cuántos borradores haya.
+Las escrituras se agrupan: como máximo una cada `intervalo` segundos por producto,
+y la última pendiente se vacía con un temporizador. No importa Streamlit.
+"""
+import json
+import os
+import threading
+import time
+
+RUTA_BORRADORES = "borradores.jsonl"
+CAMPOS = ("producto", "proveedor", "responsable", "nombre_pdf", "area_cm2", "tipo_producto", "status", "note", "fotos", "reglas_version")
+
+
+def clave_producto(producto: str) -> str:
+    return " ".join((producto or "").split()).lower()
+
+
+class Borradores:
+    def __init__(self, ruta: str = RUTA_BORRADORES, intervalo: float = 2.0):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._indice = {}        # clave → (offset, longitud, producto)
+        self._ultimo = {}        # clave → (instante de la última escritura, contenido escrito)
+        self._pendientes = {}    # clave → línea pendiente de escribir
+        self._timers = {}
+        self._lineas = 0
+        self._indexar()
+        if self._lineas > 4 * max(len(self._indice), 64):
+            self.compactar()
+
+    # -------------------------------------------------------
+    # ÍNDICE
+    # -------------------------------------------------------
+    def _indexar(self) -> None:
+        if not os.path.exists(self.ruta):
+            return
+        offset = 0
+        with open(self.ruta, "rb") as f:
+            for linea in f:
+                if not linea.endswith(b"\n"):
+                    # Última línea a medio escribir por una caída: se corta el archivo
+                    # ahí para que el próximo borrador empiece en una línea nueva
+                    break
+                self._lineas += 1
+                try:
+                    dato = json.loads(linea)
+                except ValueError:
+                    # Línea ilegible en medio del diario: se ignora
+                    offset += len(linea)
+                    continue
+                clave = clave_producto(dato.get("producto"))
+                if dato.get("descartado"):
+                    self._indice.pop(clave, None)
+                else:
+                    self._indice[clave] = (offset, len(linea), dato.get("producto", ""))
+                offset += len(linea)
+        if offset < os.path.getsize(self.ruta):
+            os.truncate(self.ruta, offset)
+
+    def productos(self) -> list:
+        """Nombres de producto con borrador disponible."""
+        with self._lock:
+            return sorted(p for _, _, p in self._indice.values())
+
+    # -------------------------------------------------------
+    # ESCRITURA
+    # -------------------------------------------------------
+    def _escribir(self, clave: str, linea: bytes, producto: str) -> None:
+        with open(self.ruta, "ab") as f:
+            offset = f.tell()
+            f.write(linea)
+            f.flush()
+            os.fsync(f.fileno())
+        self._lineas += 1
+        self._indice[clave] = (offset, len(linea), producto)
+
+    @staticmethod
+    def _contenido(borrador: dict) -> str:
+        return json.dumps({c: borrador.get(c) for c in CAMPOS}, ensure_ascii=False, sort_keys=True)
+
+    def guardar(self, borrador: dict, forzar: bool = False) -> bool:
+        """Registra el estado actual; devuelve True si se escribió en disco ahora."""
+        clave = clave_producto(borrador.get("producto"))
+        if not clave:
+            return False
+        contenido = self._contenido(borrador)
+        ahora = time.monotonic()
+        with self._lock:
+            instante, escrito = self._ultimo.get(clave, (float("-inf"), None))
+            if contenido == escrito:
+                self._pendientes.pop(clave, None)
+                return False
+            linea = (contenido[:-1] + f', "guardado": {time.time():.3f}}}\n').encode("utf-8")
+            if forzar or ahora - instante >= self.intervalo:
+                self._pendientes.pop(clave, None)
+                self._escribir(clave, linea, borrador.get("producto", ""))
+                self._ultimo[clave] = (ahora, contenido)
+                return True
+            self._pendientes[clave] = (linea, contenido, borrador.get("producto", ""))
+            if clave not in self._timers:
+                timer = threading.Timer(self.intervalo - (ahora - instante), self._vaciar, args=(clave,))
+                timer.daemon = True
+                self._timers[clave] = timer
+                timer.start()
+            return False
+
+    def _vaciar(self, clave: str) -> None:
+        with self._lock:
+            self._timers.pop(clave, None)
+            pendiente = self._pendientes.pop(clave, None)
+            if pendiente:
+                linea, contenido, producto = pendiente
+                self._escribir(clave, linea, producto)
+                self._ultimo[clave] = (time.monotonic(), contenido)
+
+    def vaciar_todo(self) -> None:
+        for clave in list(self._pendientes):
+            self._vaciar(clave)
+
+    def descartar(self, producto: str, guardado: dict = None) -> None:
+        """Marca el borrador de un producto como descartado (p. ej., al guardar la verificación).
+
+        Si se pasa el registro `guardado`, volver a llamar a `guardar` con ese mismo
+        contenido no crea un borrador nuevo; cualquier cambio posterior sí.
+        """
+        clave = clave_producto(producto)
+        with self._lock:
+            self._pendientes.pop(clave, None)
+            if guardado is None:
+                self._ultimo.pop(clave, None)
+            else:
+                self._ultimo[clave] = (time.monotonic(), self._contenido(guardado))
+            if clave in self._indice:
+                with open(self.ruta, "ab") as f:
+                    f.write((json.dumps({"producto": producto, "descartado": True}, ensure_ascii=False) + "\n").encode("utf-8"))
+                self._lineas += 1
+                del self._indice[clave]
+
+    # -------------------------------------------------------
+    # LECTURA Y MANTENIMIENTO
+    # -------------------------------------------------------
+    def retomar(self, producto: str):
+        """Devuelve el último borrador guardado del producto, o None."""
+        clave = clave_producto(producto)
+        with self._lock:
+            pendiente = self._pendientes.get(clave)
+            if pendiente:
+                return json.loads(pendiente[1])
+            ubicacion = self._indice.get(clave)
+            if ubicacion is None:
+                return None
+            offset, longitud, _ = ubicacion
+            with open(self.ruta, "rb") as f:
+                f.seek(offset)
+                return json.loads(f.read(longitud))
+
+    def compactar(self) -> None:
+        """Reescribe el diario dejando solo el último borrador de cada producto."""
+        with self._lock:
+            if not os.path.exists(self.ruta):
+                return
+            temporal = self.ruta + ".tmp"
+            nuevo = {}
+            with open(self.ruta, "rb") as origen, open(temporal, "wb") as destino:
+                for clave, (offset, longitud, producto) in self._indice.items():
+                    origen.seek(offset)
+                    linea = origen.read(longitud)
+                    nuevo[clave] = (destino.tell(), longitud, producto)
+                    destino.write(linea)
+                destino.flush()
+                os.fsync(destino.fileno())
+            os.replace(temporal, self.ruta)
+            self._indice = nuevo
+            self._lineas = len(nuevo)
@@ -0,0 +1,292 @@
+"""Catálogo normativo del verificador de etiquetado nutricional.
+
+Los ítems se leen de un paquete de reglas versionado (`reglas/etiquetado.json`,
+o la ruta de la variable REGLAS_ETIQUETADO): categorías con sus ítems, cada uno
+con qué verificar, recomendación, referencia y a qué aplica. El paquete se valida
+y se compila una sola vez en un `Catalogo` inmutable compartido por todas las
+sesiones; `catalogo_vigente()` solo revisa la fecha de modificación del archivo
+y vuelve a compilar si cambió su contenido (sin reiniciar la app).
+
+También contiene las utilidades de conteo que comparten la app de Streamlit y
+los procesos por lotes. Este módulo no importa Streamlit.
+"""
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from types import MappingProxyType
+from typing import FrozenSet, Mapping, NamedTuple, Optional, Tuple
+
+RUTA_REGLAS = os.environ.get(
+    "REGLAS_ETIQUETADO", os.path.join(os.path.dirname(os.path.abspath(__file__)), "reglas", "etiquetado.json")
+)
+APLICA_VALIDOS = ("Ambos", "Producto terminado", "Materia prima")
+TIPOS_PRODUCTO = ("Producto terminado", "Materia prima")
+_CAMPOS_ITEM = ("titulo", "que_verificar", "recomendacion", "referencia")
+
+_log = logging.getLogger(__name__)
+
+
+ESTADOS_HUMANOS = {
+    "yes": "Cumple",
+    "no": "No cumple",
+    "na": "No aplica",
+    "none": "Sin responder",
+}
+
+# Acepta tanto la clave interna como la etiqueta humana (archivos de lote, ERP, etc.)
+_ALIAS_ESTADO = {**{k: k for k in ESTADOS_HUMANOS}, **{v.lower(): k for k, v in ESTADOS_HUMANOS.items()}}
+_ALIAS_ESTADO[""] = "none"
+
+
+def normalizar_estado(valor) -> str:
+    """Convierte 'Cumple', 'no', 'No aplica', vacío… a la clave interna (yes/no/na/none)."""
+    clave = str(valor if valor is not None else "").strip().lower()
+    if clave == "nan":
+        return "none"
+    if clave not in _ALIAS_ESTADO:
+        raise ValueError(f"Estado no reconocido: {valor!r}")
+    return _ALIAS_ESTADO[clave]
+
+
+# -----------------------------------------------------------
+# CATÁLOGO COMPILADO (inmutable, compartido por todas las sesiones)
+# -----------------------------------------------------------
+class PaqueteInvalido(ValueError):
+    """El archivo de reglas no tiene la estructura esperada."""
+
+
+class Item(NamedTuple):
+    indice: int
+    titulo: str
+    que_verificar: str
+    recomendacion: str
+    referencia: str
+    categoria: str
+    aplica: str
+
+
+class Catalogo(NamedTuple):
+    version: str
+    huella: str                        # sha256 (abreviado) del archivo de reglas
+    normas: Tuple[str, ...]
+    items: Tuple[Item, ...]
+    categorias: Tuple[Tuple[str, Tuple[Item, ...]], ...]
+    indice: Mapping[str, int]          # título → posición en `items`
+    titulos: Tuple[str, ...]
+    por_tipo: Mapping[Optional[str], Tuple[Item, ...]]   # tipo de producto (None = todos) → ítems que le aplican
+    indice_texto: Mapping[str, FrozenSet[int]]          # palabra normalizada → posiciones de los ítems
+    vocabulario: Tuple[str, ...]                        # palabras del índice, ordenadas (búsqueda por prefijo)
+
+    def estado_inicial(self) -> dict:
+        return dict.fromkeys(self.titulos, "none")
+
+    def notas_iniciales(self) -> dict:
+        return dict.fromkeys(self.titulos, "")
+
+    def aplicables(self, tipo_producto: str = None) -> Tuple[Item, ...]:
+        """Ítems que aplican al tipo de producto ("Producto terminado", "Materia prima" o None = todos)."""
+        try:
+            return self.por_tipo[tipo_producto or None]
+        except KeyError:
+            raise ValueError(f"Tipo de producto no reconocido: {tipo_producto!r}") from None
+
+    def buscar(self, consulta: str) -> Optional[FrozenSet[int]]:
+        """Posiciones de los ítems cuyo título, "qué verificar" o referencia contienen todas las palabras.
+
+        Cada palabra de la consulta vale como prefijo ("venc" encuentra "vencimiento") y no se
+        distinguen tildes ni mayúsculas. Devuelve None si la consulta está vacía (sin filtro).
+        """
+        resultado = None
+        for palabra in palabras(consulta):
+            desde = bisect.bisect_left(self.vocabulario, palabra)
+            hasta = bisect.bisect_left(self.vocabulario, palabra + "\uffff", desde)
+            coincidencias = frozenset().union(*(self.indice_texto[p] for p in self.vocabulario[desde:hasta]))
+            resultado = coincidencias if resultado is None else resultado & coincidencias
+            if not resultado:
+                break
+        return resultado
+
+
+def palabras(texto: str) -> list:
+    """Palabras en minúsculas y sin tildes, para indexar y buscar."""
+    sin_tildes = unicodedata.normalize("NFKD", (texto or "").lower()).encode("ascii", "ignore").decode("ascii")
+    return re.findall(r"\w+", sin_tildes)
+
+
+def _texto(valor, donde: str) -> str:
+    if not isinstance(valor, str) or not valor.strip():
+        raise PaqueteInvalido(f"{donde}: se esperaba un texto no vacío")
+    return valor
+
+
+def compilar_paquete(paquete: dict, huella: str = "") -> Catalogo:
+    """Valida un paquete de reglas (ya decodificado) y lo compila en un `Catalogo`."""
+    if not isinstance(paquete, dict):
+        raise PaqueteInvalido("El paquete de reglas debe ser un objeto JSON")
+    version = _texto(paquete.get("version"), "version")
+    categorias = paquete.get("categorias")
+    if not isinstance(categorias, list) or not categorias:
+        raise PaqueteInvalido("categorias: se esperaba una lista no vacía")
+
+    items, grupos = [], []
+    for c, categoria in enumerate(categorias, start=1):
+        if not isinstance(categoria, dict):
+            raise PaqueteInvalido(f"categoría {c}: se esperaba un objeto")
+        nombre = _texto(categoria.get("nombre"), f"categoría {c}")
+        filas = categoria.get("items")
+        if not isinstance(filas, list) or not filas:
+            raise PaqueteInvalido(f"{nombre}: la categoría no tiene ítems")
+        grupo = []
+        for fila in filas:
+            if not isinstance(fila, dict):
+                raise PaqueteInvalido(f"{nombre}: cada ítem debe ser un objeto")
+            campos = [_texto(fila.get(campo), f"{nombre} / {fila.get('titulo', '?')} / {campo}") for campo in _CAMPOS_ITEM]
+            aplica = fila.get("aplica", "Ambos")
+            if aplica not in APLICA_VALIDOS:
+                raise PaqueteInvalido(f"{campos[0]}: 'aplica' debe ser uno de {', '.join(APLICA_VALIDOS)}")
+            item = Item(len(items), *campos, nombre, aplica)
+            items.append(item)
+            grupo.append(item)
+        grupos.append((nombre, tuple(grupo)))
+
+    indice = {}
+    for item in items:
+        if item.titulo in indice:
+            raise PaqueteInvalido(f"Ítem repetido: {item.titulo!r}")
+        indice[item.titulo] = item.indice
+
+    por_tipo = {None: tuple(items)}
+    for tipo in TIPOS_PRODUCTO:
+        por_tipo[tipo] = tuple(item for item in items if item.aplica in ("Ambos", tipo))
+
+    indice_texto = {}
+    for item in items:
+        for palabra in palabras(f"{item.titulo} {item.que_verificar} {item.referencia}"):
+            indice_texto.setdefault(palabra, set()).add(item.indice)
+    return Catalogo(
+        version=version,
+        huella=huella,
+        normas=tuple(paquete.get("normas") or ()),
+        items=tuple(items),
+        categorias=tuple(grupos),
+        indice=MappingProxyType(indice),
+        titulos=tuple(item.titulo for item in items),
+        por_tipo=MappingProxyType(por_tipo),
+        indice_texto=MappingProxyType({p: frozenset(i) for p, i in indice_texto.items()}),
+        vocabulario=tuple(sorted(indice_texto)),
+    )
+
+
+def _huella(contenido: bytes) -> str:
+    return hashlib.sha256(contenido).hexdigest()[:12]
+
+
+def _compilar_contenido(contenido: bytes, origen: str) -> Catalogo:
+    try:
+        paquete = json.loads(contenido)
+    except ValueError as exc:
+        raise PaqueteInvalido(f"{origen}: JSON inválido ({exc})") from exc
+    return compilar_paquete(paquete, _huella(contenido))
+
+
+def cargar_paquete(ruta: str = RUTA_REGLAS) -> Catalogo:
+    """Lee, valida y compila un archivo de reglas."""
+    with open(ruta, "rb") as f:
+        return _compilar_contenido(f.read(), ruta)
+
+
+class PaqueteRecargable:
+    """Catálogo que se vuelve a compilar solo si el archivo de reglas cambió.
+
+    Cada consulta cuesta un `os.stat`; si cambió la fecha de modificación o el
+    tamaño se compara el hash del contenido antes de recompilar. Si el archivo
+    nuevo no es válido se sigue usando el último catálogo bueno y el error queda
+    en `error`.
+    """
+
+    def __init__(self, ruta: str = RUTA_REGLAS):
+        self.ruta = ruta
+        self.error = None
+        self._lock = threading.Lock()
+        self._firma = None
+        self._catalogo = None
+
+    def _firma_actual(self) -> tuple:
+        info = os.stat(self.ruta)
+        return info.st_mtime_ns, info.st_size
+
+    def vigente(self) -> Catalogo:
+        try:
+            firma = self._firma_actual()
+        except OSError as exc:
+            if self._catalogo is None:
+                raise
+            self.error = f"No se puede leer {self.ruta}: {exc}"
+            return self._catalogo
+        if firma == self._firma:
+            return self._catalogo
+        with self._lock:
+            if firma != self._firma:
+                self._recargar(firma)
+            return self._catalogo
+
+    def _recargar(self, firma: tuple) -> None:
+        with open(self.ruta, "rb") as f:
+            contenido = f.read()
+        try:
+            # Un `touch` o una copia idéntica cambian la fecha pero no el contenido
+            if self._catalogo is None or _huella(contenido) != self._catalogo.huella:
+                self._catalogo = _compilar_contenido(contenido, self.ruta)
+                _log.info("Reglas %s cargadas (versión %s)", self.ruta, self._catalogo.version)
+            self.error = None
+        except PaqueteInvalido as exc:
+            if self._catalogo is None:
+                raise
+            self.error = str(exc)
+            _log.warning("Se mantiene la versión %s de las reglas: %s", self._catalogo.version, exc)
+        self._firma = firma
+
+
+_REGLAS = PaqueteRecargable()
+
+
+def catalogo_vigente() -> Catalogo:
+    """Catálogo de la versión actual del archivo de reglas (recompilado si cambió)."""
+    return _REGLAS.vigente()
+
+
+def error_reglas():
+    """Último error al recargar el archivo de reglas, o None."""
+    return _REGLAS.error
+
+
+def titulos() -> tuple:
+    """Títulos de todos los ítems en el orden del checklist."""
+    return catalogo_vigente().titulos
+
+
+def resumen_estados(status: dict, tipo_producto: str = None) -> dict:
+    """Conteo por estado y porcentaje de cumplimiento (sobre ítems contestados Sí/No).
+
+    Con `tipo_producto` solo se cuentan los ítems que le aplican a ese tipo.
+    """
+    if tipo_producto:
+        valores = [status.get(item.titulo, "none") for item in catalogo_vigente().aplicables(tipo_producto)]
+    else:
+        valores = list(status.values())
+    yes_count = valores.count("yes")
+    no_count = valores.count("no")
+    answered_count = yes_count + no_count
+    percent = round((yes_count / answered_count * 100), 1) if answered_count > 0 else 0.0
+    return {
+        "yes": yes_count,
+        "no": no_count,
+        "na": valores.count("na"),
+        "none": valores.count("none"),
+        "percent": percent,
+    }
@@ -0,0 +1,61 @@
+"""Comparación de dos verificaciones (típicamente del mismo producto antes y
+después de que el proveedor corrige la etiqueta).
+
+Los ítems se alinean por título en el orden del catálogo vigente; los ítems
+que solo existen en una de las dos (versiones anteriores de las reglas) van al
+final. Estados y observaciones se comparan en una sola pasada vectorizada con
+numpy y solo se devuelven los ítems que cambiaron. No importa Streamlit ni pandas.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from catalogo import catalogo_vigente
+
+class Cambio(NamedTuple):
+    item: str
+    categoria: str
+    estado_antes: str
+    estado_despues: str
+    nota_antes: str
+    nota_despues: str
+    sentido: str    # "mejora" (deja de ser No cumple, o pasa de sin responder a Cumple), "empeora" (pasa a
+                    # No cumple), "cambia" (otro cambio de estado) o "nota" (solo cambió la observación)
+
+
+def _titulos(antes: dict, despues: dict) -> list:
+    orden = list(catalogo_vigente().titulos)
+    conocidos = set(orden)
+    extra = [t for t in dict.fromkeys([*antes["status"], *despues["status"]]) if t not in conocidos]
+    return orden + extra
+
+
+def comparar(antes: dict, despues: dict) -> list:
+    """Ítems cuyo estado u observación difiere entre dos registros (formato de `Almacen.cargar`)."""
+    titulos = _titulos(antes, despues)
+    columnas = []
+    for registro in (antes, despues):
+        status, note = registro["status"], registro.get("note") or {}
+        columnas.append(np.array([status.get(t, "none") for t in titulos], dtype=object))
+        columnas.append(np.array([(note.get(t) or "").strip() for t in titulos], dtype=object))
+    estado_a, nota_a, estado_b, nota_b = columnas
+
+    cambia_estado = estado_a != estado_b
+    empeora = cambia_estado & (estado_b == "no")
+    mejora = cambia_estado & ((estado_a == "no") | ((estado_a == "none") & (estado_b == "yes")))
+    sentido = np.select([mejora, empeora, cambia_estado], ["mejora", "empeora", "cambia"], default="nota")
+    indices = np.flatnonzero(cambia_estado | (nota_a != nota_b))
+
+    categoria_de = {item.titulo: item.categoria for item in catalogo_vigente().items}
+    return [
+        Cambio(titulos[i], categoria_de.get(titulos[i], "Ítems de versiones anteriores de las reglas"),
+               estado_a[i], estado_b[i], nota_a[i], nota_b[i], str(sentido[i]))
+        for i in indices
+    ]
+
+
+def resumen_cambios(cambios: list) -> dict:
+    conteo = {"mejora": 0, "empeora": 0, "cambia": 0, "nota": 0}
+    for cambio in cambios:
+        conteo[cambio.sentido] += 1
+    return {**conteo, "total": len(cambios)}
@@ -0,0 +1,122 @@
+"""Fotos de evidencia por ítem, guardadas en disco por contenido.
+
+Cada foto se guarda una sola vez con el sha256 de sus bytes como nombre
+(`evidencias/originales/ab/abcd…`): subir la misma foto en otro ítem u otra
+verificación no ocupa espacio extra. La sesión y la base solo guardan esas
+huellas. Las miniaturas (JPEG) se generan una vez por tamaño y quedan en
+`evidencias/miniaturas/<lado>/`; el informe PDF usa esas mismas versiones
+reducidas, de modo que nunca se cargan las fotos originales en memoria al
+generarlo. No importa Streamlit; Pillow se importa al crear la primera miniatura.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+RUTA_EVIDENCIAS = "evidencias"
+TIPOS_IMAGEN = ("jpg", "jpeg", "png", "webp")
+LADO_VISTA = 160                      # miniatura en la app
+LADOS_PDF = (1024, 640, 320)          # versiones para el informe, de mayor a menor
+CALIDAD_JPEG = 80
+MAX_PIXELES = 40_000_000              # ≈ 7700 x 5200; más que cualquier foto de celular
+
+
+class FotoInvalida(ValueError):
+    """Los bytes recibidos no son una imagen que se pueda leer."""
+
+
+def _escribir_atomico(ruta: Path, datos: bytes) -> None:
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=ruta.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(datos)
+    os.replace(temporal, ruta)
+
+
+class AlmacenFotos:
+    def __init__(self, carpeta: str = RUTA_EVIDENCIAS, max_pixeles: int = MAX_PIXELES):
+        self.carpeta = Path(carpeta)
+        self.max_pixeles = max_pixeles
+        self._lock = threading.Lock()
+
+    def ruta_original(self, huella: str) -> Path:
+        return self.carpeta / "originales" / huella[:2] / huella
+
+    def guardar(self, datos: bytes) -> str:
+        """Guarda la foto (si no existía ya) y devuelve su huella."""
+        huella = hashlib.sha256(datos).hexdigest()
+        ruta = self.ruta_original(huella)
+        if not ruta.exists():
+            self._validar(datos)
+            _escribir_atomico(ruta, datos)
+        return huella
+
+    def _comprobar_tamano(self, imagen) -> None:
+        ancho, alto = imagen.size
+        if ancho * alto > self.max_pixeles:
+            raise FotoInvalida(f"La imagen es demasiado grande ({ancho} x {alto} px, máximo {self.max_pixeles} píxeles)")
+
+    def _validar(self, datos: bytes) -> None:
+        from io import BytesIO
+        from PIL import Image, UnidentifiedImageError
+
+        try:
+            with Image.open(BytesIO(datos)) as imagen:
+                # Solo lee el encabezado: el tamaño se revisa antes de decodificar nada
+                self._comprobar_tamano(imagen)
+                imagen.verify()
+        except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError) as exc:
+            raise FotoInvalida(f"No es una imagen válida: {exc}") from exc
+
+    def miniatura(self, huella: str, lado: int = LADO_VISTA) -> Path:
+        """Ruta de la versión JPEG de `huella` con el lado mayor ≤ `lado` px (se genera una sola vez)."""
+        ruta = self.carpeta / "miniaturas" / str(lado) / f"{huella}.jpg"
+        if ruta.exists():
+            return ruta
+        with self._lock:
+            if not ruta.exists():
+                self._reducir(self.ruta_original(huella), ruta, lado)
+        return ruta
+
+    @staticmethod
+    def _reducir(origen: Path, destino: Path, lado: int) -> None:
+        from io import BytesIO
+        from PIL import Image, ImageOps
+
+        with Image.open(origen) as imagen:
+            imagen.draft("RGB", (lado, lado))          # JPEG: decodifica ya reducido
+            imagen = ImageOps.exif_transpose(imagen)
+            if imagen.mode != "RGB":
+                imagen = imagen.convert("RGB")
+            imagen.thumbnail((lado, lado))
+            salida = BytesIO()
+            imagen.save(salida, "JPEG", quality=CALIDAD_JPEG, optimize=True)
+        _escribir_atomico(destino, salida.getvalue())
+
+    def existe(self, huella: str) -> bool:
+        return self.ruta_original(huella).exists()
+
+    def versiones_para_pdf(self, huellas: list, presupuesto_bytes: int) -> list:
+        """Elige para cada foto la versión más grande que quepa en el presupuesto del informe.
+
+        Reparte lo que queda del presupuesto entre las fotos que faltan; si ni la
+        versión más chica cabe, la foto se omite (None en su posición). Una foto
+        repetida se incrusta una sola vez en el PDF, así que cuenta una sola vez.
+        """
+        unicas = [h for h in dict.fromkeys(huellas) if self.existe(h)]
+        elegidas, restante = {}, presupuesto_bytes
+        for n, huella in enumerate(unicas):
+            cuota = restante / (len(unicas) - n)
+            for lado in LADOS_PDF:
+                ruta = self.miniatura(huella, lado)
+                tamano = ruta.stat().st_size
+                if tamano <= cuota:
+                    break
+            if tamano <= restante:
+                elegidas[huella] = ruta
+                restante -= tamano
+        return [elegidas.get(h) for h in huellas]
+
+
+ALMACEN_FOTOS = AlmacenFotos()
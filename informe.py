@@ -0,0 +1,533 @@
+"""Construcción del informe PDF de verificación (ReportLab).
+
+Se usa desde la app de Streamlit y desde el modo por lotes (`lote.py`);
+no importa Streamlit.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from io import BytesIO
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+import pandas as pd
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib import colors
+from reportlab.lib.units import mm
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image, Flowable
+from reportlab.platypus.tableofcontents import TableOfContents
+
+from catalogo import ESTADOS_HUMANOS, catalogo_vigente, resumen_estados
+from evidencias import ALMACEN_FOTOS, AlmacenFotos
+from tabla17 import lado_minimo_sello
+
+# Bytes máximos de fotos incrustadas por informe (se eligen versiones más chicas para respetarlo)
+PRESUPUESTO_FOTOS = 4 * 1024 * 1024
+FOTOS_POR_FILA = 4
+
+# Flujos binarios en el PDF: sin la codificación ASCII85 (que agrega un 25 %) las
+# fotos JPEG se incrustan con su tamaño real y el presupuesto se respeta. ReportLab
+# solo lo permite por proceso (rl_config), así que se cambia mientras se arma el informe
+# y se restaura al terminar el último que esté en curso.
+_A85_LOCK = threading.Lock()
+_A85_EN_CURSO = [0, None]     # informes en curso, valor original de rl_config.useA85
+
+
+@contextmanager
+def _sin_ascii85():
+    with _A85_LOCK:
+        if not _A85_EN_CURSO[0]:
+            _A85_EN_CURSO[1] = rl_config.useA85
+            rl_config.useA85 = 0
+        _A85_EN_CURSO[0] += 1
+    try:
+        yield
+    finally:
+        with _A85_LOCK:
+            _A85_EN_CURSO[0] -= 1
+            if not _A85_EN_CURSO[0]:
+                rl_config.useA85 = _A85_EN_CURSO[1]
+
+COLUMNAS = ["Ítem", "Estado", "Recomendación", "Referencia", "Observación"]
+
+# Caracteres de Observación que se muestran en la tabla; el resto va al anexo
+# (que a su vez se acota por nota para que el informe no crezca sin límite)
+LIMITE_OBSERVACION = 300
+LIMITE_ANEXO = 20_000
+BLOQUE_ANEXO = 2_000
+
+# Anchos (total útil ≈ 281 mm). Suma = 70 + 25 + 100 + 45 + 40 = 280 mm
+ANCHOS_TABLA = [70*mm, 25*mm, 100*mm, 45*mm, 40*mm]
+
+# -----------------------------------------------------------
+# ARMAR DataFrame para PDF (sin categorías ni 'Qué verificar')
+# -----------------------------------------------------------
+def construir_df(status: dict, note: dict, tipo_producto: str = None) -> pd.DataFrame:
+    rows = [
+        (item.titulo, ESTADOS_HUMANOS.get(status.get(item.titulo, "none"), "Sin responder"),
+         item.recomendacion, item.referencia, note.get(item.titulo, ""))
+        for item in catalogo_vigente().aplicables(tipo_producto)
+    ]
+    return pd.DataFrame(rows, columns=COLUMNAS)
+
+# -----------------------------------------------------------
+# UTILIDAD: Observación para la celda de la tabla
+# Paragraph ya reparte el texto en renglones por palabras; lo que hace falta es
+# escapar el marcado, conservar los saltos de línea del usuario y acotar el
+# largo: una nota larga se recorta en la tabla y va completa a un anexo.
+# -----------------------------------------------------------
+def texto_parrafo(texto) -> str:
+    """Texto plano → marcado de Paragraph (escapa <, >, & y conserva los saltos de línea)."""
+    return escape(str(texto)).replace("\r\n", "\n").replace("\n", "<br/>")
+
+
+def recortar_observacion(texto: str, limite: int = LIMITE_OBSERVACION) -> tuple:
+    """(texto para la celda, si se recortó); corta en el último espacio antes de `limite`."""
+    texto = str(texto or "").strip()
+    if len(texto) <= limite:
+        return texto, False
+    corte = texto.rfind(" ", 0, limite)
+    return texto[:corte if corte > limite // 2 else limite].rstrip(), True
+
+# -----------------------------------------------------------
+# BLOQUES DEL INFORME (compartidos por el informe individual y el consolidado)
+# -----------------------------------------------------------
+def _datos_generales(fecha_str: str, producto: str, proveedor: str, responsable: str, porcentaje: float,
+                     area_cm2: float, style_header: ParagraphStyle) -> list:
+    meta = (
+        f"<b>Fecha:</b> {fecha_str} &nbsp;&nbsp; "
+        f"<b>Producto:</b> {texto_parrafo(producto or '-')} &nbsp;&nbsp; "
+        f"<b>Proveedor:</b> {texto_parrafo(proveedor or '-')} &nbsp;&nbsp; "
+        f"<b>Responsable:</b> {texto_parrafo(responsable or '-')}"
+    )
+    bloque = [
+        Paragraph(meta, style_header),
+        Spacer(1, 5*mm),
+        Paragraph(f"<b>Cumplimiento (sobre ítems contestados):</b> {porcentaje}%", style_header),
+        Spacer(1, 5*mm),
+    ]
+    if area_cm2:
+        sello = lado_minimo_sello(area_cm2)
+        bloque.append(Paragraph(
+            f"<b>Tamaño mínimo del sello (Tabla 17):</b> área principal {sello['area_cm2']:g} cm² "
+            f"({sello['intervalo']}) — {sello['regla']}", style_header))
+        bloque.append(Spacer(1, 5*mm))
+    return bloque
+
+
+class _ParrafoCelda(Paragraph):
+    """Paragraph que recuerda su último wrap: la tabla mide cada celda varias veces
+    (alto de filas, cortes de página, dibujo) siempre con el mismo ancho."""
+
+    _ultimo_wrap = None
+
+    def wrap(self, availWidth, availHeight):
+        # El corte de líneas no depende del alto disponible; split() puede descartar blPara
+        if self._ultimo_wrap and self._ultimo_wrap[0] == availWidth and "blPara" in self.__dict__:
+            return self._ultimo_wrap[1]
+        medida = super().wrap(availWidth, availHeight)
+        self._ultimo_wrap = (availWidth, medida)
+        return medida
+
+
+@lru_cache(maxsize=1)
+def _estilos() -> dict:
+    """Estilos de párrafo y de tabla compartidos por todos los informes (se crean una vez)."""
+    styles = getSampleStyleSheet()
+    return {
+        "header": ParagraphStyle("header", parent=styles["Normal"], fontSize=8, leading=10),
+        "cell": ParagraphStyle("cell", parent=styles["Normal"], fontSize=7.5, leading=9),
+        "titulo": ParagraphStyle("titulo", parent=styles["Title"], fontSize=16, leading=20),
+        "seccion": ParagraphStyle("seccion", parent=styles["Heading2"], fontSize=11, leading=14),
+        "toc0": ParagraphStyle("toc0", parent=styles["Normal"], fontSize=8, leading=10),
+        "tabla_items": TableStyle([
+            ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#f2f2f2")),
+            ("FONTNAME",   (0,0), (-1,0), "Helvetica-Bold"),
+            ("FONTSIZE",   (0,0), (-1,0), 8),
+            ("GRID",       (0,0), (-1,-1), 0.25, colors.grey),
+            ("VALIGN",     (0,0), (-1,-1), "TOP"),
+            ("LEFTPADDING",(0,0), (-1,-1), 3),
+            ("RIGHTPADDING",(0,0), (-1,-1), 3),
+        ]),
+    }
+
+
+def _tabla_items(df: pd.DataFrame, style_cell: ParagraphStyle, style_header: ParagraphStyle) -> list:
+    """Tabla de ítems y, si alguna Observación no cabe, el anexo con las notas completas.
+
+    Las filas se pueden partir entre páginas (splitInRow), así que ninguna fila
+    más alta que una página hace fallar la maquetación.
+    """
+    data = [COLUMNAS]
+    anexo = []
+    for item, estado, recomendacion, referencia, observacion in df[COLUMNAS].itertuples(index=False, name=None):
+        celda, recortada = recortar_observacion(observacion)
+        if recortada:
+            anexo.append((item, observacion))
+            celda = f"{texto_parrafo(celda)} … <i>(continúa en el anexo, nota {len(anexo)})</i>"
+        else:
+            celda = texto_parrafo(celda) if celda else "-"
+        data.append([
+            _ParrafoCelda(texto_parrafo(item),          style_cell),
+            _ParrafoCelda(texto_parrafo(estado),        style_cell),
+            _ParrafoCelda(texto_parrafo(recomendacion), style_cell),
+            _ParrafoCelda(texto_parrafo(referencia),    style_cell),
+            _ParrafoCelda(celda,                        style_cell),
+        ])
+
+    tbl = Table(data, colWidths=ANCHOS_TABLA, repeatRows=1, splitInRow=1)
+    tbl.setStyle(_estilos()["tabla_items"])
+    return [tbl, *_anexo_observaciones(anexo, style_cell, style_header)]
+
+
+def _anexo_observaciones(notas: list, style_cell: ParagraphStyle, style_header: ParagraphStyle) -> list:
+    if not notas:
+        return []
+    bloque = [Spacer(1, 5*mm), Paragraph("<b>Anexo: observaciones completas</b>", style_header), Spacer(1, 2*mm)]
+    for n, (item, texto) in enumerate(notas, start=1):
+        texto = str(texto).strip()
+        omitidos = len(texto) - LIMITE_ANEXO
+        if omitidos > 0:
+            texto = texto[:LIMITE_ANEXO]
+        bloque.append(Paragraph(f"<b>Nota {n} — {texto_parrafo(item)}</b>", style_cell))
+        # En trozos de ~BLOQUE_ANEXO caracteres: partir un párrafo de varias páginas
+        # obliga a ReportLab a volver a cortar en líneas todo el resto en cada página
+        trozos = []
+        while texto:
+            trozo, _ = recortar_observacion(texto, BLOQUE_ANEXO)
+            trozos.append(texto_parrafo(trozo))
+            texto = texto[len(trozo):].lstrip()
+        if omitidos > 0:
+            trozos[-1] += f" … <i>({omitidos} caracteres más no se incluyen)</i>"
+        bloque.extend(_ParrafoCelda(trozo, style_cell) for trozo in trozos)
+        bloque.append(Spacer(1, 2*mm))
+    return bloque
+
+def _seccion_fotos(fotos: dict, presupuesto_bytes: int, almacen: AlmacenFotos,
+                   style_header: ParagraphStyle, style_cell: ParagraphStyle) -> list:
+    """Fotos de evidencia por ítem, en versiones reducidas que caben en `presupuesto_bytes`."""
+    items = [(titulo, huellas) for titulo, huellas in fotos.items() if huellas]
+    if not items:
+        return []
+    todas = [h for _, huellas in items for h in huellas]
+    rutas = iter(almacen.versiones_para_pdf(todas, presupuesto_bytes))
+    ancho, alto = 66*mm, 50*mm
+
+    bloque = [PageBreak(), Paragraph("<b>Evidencia fotográfica</b>", style_header), Spacer(1, 3*mm)]
+    omitidas = 0
+    for titulo, huellas in items:
+        imagenes = []
+        for ruta in (next(rutas) for _ in huellas):
+            if ruta is None:
+                omitidas += 1
+            else:
+                imagenes.append(Image(str(ruta), width=ancho, height=alto, kind="bound"))
+        if not imagenes:
+            continue
+        filas = [imagenes[i:i + FOTOS_POR_FILA] for i in range(0, len(imagenes), FOTOS_POR_FILA)]
+        filas[-1] += [""] * (FOTOS_POR_FILA - len(filas[-1]))
+        tbl = Table(filas, colWidths=[ancho + 4*mm] * FOTOS_POR_FILA, hAlign="LEFT")
+        tbl.setStyle(TableStyle([("VALIGN", (0,0), (-1,-1), "TOP"), ("LEFTPADDING", (0,0), (-1,-1), 0)]))
+        bloque += [Paragraph(f"<b>{texto_parrafo(titulo)}</b>", style_cell), tbl, Spacer(1, 3*mm)]
+    if omitidas:
+        bloque.append(Paragraph(f"{omitidas} foto(s) no se incluyeron por el límite de tamaño del informe.", style_cell))
+    return bloque
+
+# -----------------------------------------------------------
+# PDF: A4 horizontal, sin cortes, con wrapping y saltos en Observación
+# -----------------------------------------------------------
+def generar_pdf(df: pd.DataFrame, producto: str, proveedor: str, responsable: str, porcentaje: float, nombre_archivo: str,
+                area_cm2: float = None, fotos: dict = None, presupuesto_fotos: int = PRESUPUESTO_FOTOS,
+                almacen_fotos: AlmacenFotos = ALMACEN_FOTOS) -> BytesIO:
+    buf = BytesIO()
+
+    # Márgenes 8 mm para aprovechar ancho; A4 landscape ≈ 297 x 210 mm
+    doc = SimpleDocTemplate(
+        buf,
+        pagesize=landscape(A4),
+        leftMargin=8*mm, rightMargin=8*mm,
+        topMargin=8*mm, bottomMargin=8*mm
+    )
+
+    estilos = _estilos()
+    style_header, style_cell = estilos["header"], estilos["cell"]
+
+    story = []
+    # Encabezado
+    story.append(Paragraph("<b>Informe de verificación de etiquetado nutricional — Juan Valdez</b>", style_header))
+    story.append(Spacer(1, 3*mm))
+    story.extend(_datos_generales(datetime.now().strftime("%Y-%m-%d"), producto, proveedor, responsable,
+                                  porcentaje, area_cm2, style_header))
+
+    # Tabla (y anexo de observaciones largas)
+    story.extend(_tabla_items(df, style_cell, style_header))
+    if fotos:
+        story.extend(_seccion_fotos(fotos, presupuesto_fotos, almacen_fotos, style_header, style_cell))
+    with _sin_ascii85():
+        doc.build(story)
+    buf.seek(0)
+    return buf
+
+# -----------------------------------------------------------
+# CACHÉ DE INFORMES (LRU acotada por entradas y por bytes)
+# -----------------------------------------------------------
+class CachePDF:
+    """Guarda los bytes de informes ya generados, indexados por un hash de su contenido.
+
+    Se expulsa el menos usado recientemente cuando se supera `max_entradas`
+    o `max_bytes`. Es segura entre hilos (Streamlit atiende cada sesión en un hilo).
+    """
+
+    def __init__(self, max_entradas: int = 128, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._datos = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clave(df: pd.DataFrame, producto: str, proveedor: str, responsable: str, porcentaje: float,
+              area_cm2: float = None, fotos: dict = None) -> str:
+        # La fecha forma parte del encabezado del PDF, así que también de la clave.
+        # Las fotos entran por su huella de contenido.
+        contenido = [
+            datetime.now().strftime("%Y-%m-%d"), producto, proveedor, responsable, porcentaje, area_cm2,
+            list(df.columns), df.values.tolist(), sorted((t, list(h)) for t, h in (fotos or {}).items() if h),
+        ]
+        texto = json.dumps(contenido, ensure_ascii=False, default=str)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def obtener(self, clave: str):
+        with self._lock:
+            datos = self._datos.get(clave)
+            if datos is None:
+                self.misses += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.hits += 1
+            return datos
+
+    def guardar(self, clave: str, datos: bytes) -> None:
+        if len(datos) > self.max_bytes:
+            return
+        with self._lock:
+            if clave in self._datos:
+                self._bytes -= len(self._datos.pop(clave))
+            self._datos[clave] = datos
+            self._bytes += len(datos)
+            while len(self._datos) > self.max_entradas or self._bytes > self.max_bytes:
+                _, expulsado = self._datos.popitem(last=False)
+                self._bytes -= len(expulsado)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entradas": len(self._datos),
+                "bytes": self._bytes,
+            }
+
+
+CACHE_PDF = CachePDF()
+
+
+# -----------------------------------------------------------
+# INFORME CONSOLIDADO (muchas verificaciones en un solo PDF en disco)
+# -----------------------------------------------------------
+class _Seccion(Flowable):
+    """Marcador de la sección `n` en la historia; `_DocConsolidado` la arma recién al llegar a ella."""
+
+    def __init__(self, n: int):
+        super().__init__()
+        self.n = n
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        pass
+
+
+class _DocConsolidado(SimpleDocTemplate):
+    """Documento que arma cada sección al procesarla, así en memoria vive una sección a la vez."""
+
+    def __init__(self, ruta: str, armar_seccion, **kwargs):
+        super().__init__(ruta, **kwargs)
+        self.armar_seccion = armar_seccion
+
+    def handle_flowable(self, flowables):
+        if isinstance(flowables[0], _Seccion):
+            flowables[0:1] = self.armar_seccion(flowables[0].n)
+            if not flowables:
+                return
+        super().handle_flowable(flowables)
+
+    def afterFlowable(self, flowable):
+        # Cada título de producto alimenta la tabla de contenido y los marcadores del PDF
+        if isinstance(flowable, Paragraph) and flowable.style.name == "seccion":
+            clave = f"seccion-{self.seq.nextf('seccion')}"
+            texto = flowable.getPlainText()
+            self.canv.bookmarkPage(clave)
+            self.canv.addOutlineEntry(texto, clave, level=0)
+            self.notify("TOCEntry", (0, texto, self.page, clave))
+
+
+def _resumen_consolidado(verificaciones) -> dict:
+    total, suma, con_no = 0, 0.0, 0
+    fallas = {}
+    for registro in verificaciones:
+        resumen = resumen_estados(registro["status"], registro.get("tipo_producto"))
+        total += 1
+        suma += resumen["percent"]
+        con_no += resumen["no"] > 0
+        for titulo, estado in registro["status"].items():
+            if estado == "no":
+                fallas[titulo] = fallas.get(titulo, 0) + 1
+    return {
+        "total": total,
+        "promedio": round(suma / total, 1) if total else 0.0,
+        "con_no_cumple": con_no,
+        "fallas": sorted(fallas.items(), key=lambda x: -x[1])[:10],
+    }
+
+
+def generar_pdf_consolidado(verificaciones, ruta: str, titulo: str = "Informe consolidado de verificaciones") -> int:
+    """Escribe en `ruta` un PDF con portada-resumen, tabla de contenido y una sección por verificación.
+
+    `verificaciones` es una función que devuelve un iterable nuevo de registros
+    (formato de `lote.cargar_registros` / `Almacen.cargar`) cada vez que se llama,
+    o una secuencia reiterable. Se recorre una vez para el resumen y una vez por
+    pasada de maquetación; los flowables se arman de a una sección (ver `_DocConsolidado`).
+    Devuelve el número de verificaciones incluidas.
+    """
+    fabrica = verificaciones if callable(verificaciones) else (lambda: iter(verificaciones))
+    fecha_str = datetime.now().strftime("%Y-%m-%d")
+
+    estilos = _estilos()
+    style_header, style_cell = estilos["header"], estilos["cell"]
+    style_titulo, style_seccion = estilos["titulo"], estilos["seccion"]
+
+    resumen = _resumen_consolidado(fabrica())
+
+    registros = iter(())
+
+    def armar_seccion(n: int) -> list:
+        # Las secciones llegan en orden en cada pasada: la primera vuelve a empezar el recorrido
+        nonlocal registros
+        if n == 1:
+            registros = iter(fabrica())
+        registro = next(registros, None)
+        if registro is None:
+            return []
+        porcentaje = resumen_estados(registro["status"], registro.get("tipo_producto"))["percent"]
+        df = construir_df(registro["status"], registro.get("note") or {}, registro.get("tipo_producto"))
+        return [
+            Paragraph(f"{n}. {texto_parrafo(registro.get('producto') or 'Sin nombre')} — "
+                      f"{texto_parrafo(registro.get('proveedor') or '-')}", style_seccion),
+            *_datos_generales((registro.get("fecha") or fecha_str)[:10], registro.get("producto"),
+                              registro.get("proveedor"), registro.get("responsable"), porcentaje,
+                              registro.get("area_cm2"), style_header),
+            *_tabla_items(df, style_cell, style_header),
+            PageBreak(),
+        ]
+
+    doc = _DocConsolidado(
+        ruta,
+        armar_seccion,
+        pagesize=landscape(A4),
+        leftMargin=8*mm, rightMargin=8*mm,
+        topMargin=8*mm, bottomMargin=8*mm,
+        title=titulo,
+    )
+    toc = TableOfContents()
+    toc.levelStyles = [estilos["toc0"]]
+
+    def portada() -> list:
+        bloque = [
+            Paragraph(f"{titulo} — Juan Valdez", style_titulo),
+            Paragraph(f"<b>Fecha:</b> {fecha_str} &nbsp;&nbsp; <b>Verificaciones:</b> {resumen['total']} &nbsp;&nbsp; "
+                      f"<b>Cumplimiento promedio:</b> {resumen['promedio']}% &nbsp;&nbsp; "
+                      f"<b>Con algún 'No cumple':</b> {resumen['con_no_cumple']}", style_header),
+            Spacer(1, 5*mm),
+        ]
+        if resumen["fallas"]:
+            data = [["Ítem más incumplido", "Verificaciones con 'No cumple'"]]
+            data += [[Paragraph(item, style_cell), str(n)] for item, n in resumen["fallas"]]
+            tbl = Table(data, colWidths=[120*mm, 50*mm], repeatRows=1)
+            tbl.setStyle(TableStyle([
+                ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#f2f2f2")),
+                ("FONTNAME",   (0,0), (-1,0), "Helvetica-Bold"),
+                ("FONTSIZE",   (0,0), (-1,-1), 8),
+                ("GRID",       (0,0), (-1,-1), 0.25, colors.grey),
+                ("VALIGN",     (0,0), (-1,-1), "TOP"),
+            ]))
+            bloque += [tbl, Spacer(1, 5*mm)]
+        bloque += [Paragraph("<b>Contenido</b>", style_header), toc, PageBreak()]
+        return bloque
+
+    doc.multiBuild(portada() + [_Seccion(n) for n in range(1, resumen["total"] + 1)])
+    return resumen["total"]
+
+# -----------------------------------------------------------
+# INFORME DE DIFERENCIAS ENTRE DOS VERIFICACIONES (ver comparacion.py)
+# -----------------------------------------------------------
+_SENTIDOS = {"mejora": "Mejora", "empeora": "Empeora", "cambia": "Cambia", "nota": "Solo observación"}
+
+
+def _encabezado_verificacion(registro: dict) -> str:
+    fecha = (registro.get("fecha") or "")[:16]
+    return f"#{registro['id']} {fecha}" if registro.get("id") else fecha or "-"
+
+
+def generar_pdf_comparacion(antes: dict, despues: dict, cambios: list) -> BytesIO:
+    """PDF con solo los ítems que cambiaron entre dos verificaciones (formato de `Almacen.cargar`)."""
+    from comparacion import resumen_cambios
+
+    buf = BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=landscape(A4), leftMargin=8*mm, rightMargin=8*mm,
+                            topMargin=8*mm, bottomMargin=8*mm)
+    estilos = _estilos()
+    style_header, style_cell = estilos["header"], estilos["cell"]
+    conteo = resumen_cambios(cambios)
+    a, b = _encabezado_verificacion(antes), _encabezado_verificacion(despues)
+
+    story = [
+        Paragraph("<b>Comparación de verificaciones de etiquetado nutricional — Juan Valdez</b>", style_header),
+        Spacer(1, 3*mm),
+        Paragraph(f"<b>Producto:</b> {texto_parrafo(despues.get('producto') or '-')} &nbsp;&nbsp; "
+                  f"<b>Proveedor:</b> {texto_parrafo(despues.get('proveedor') or '-')} &nbsp;&nbsp; "
+                  f"<b>Anterior:</b> {a} ({antes.get('porcentaje', '-')}%) &nbsp;&nbsp; "
+                  f"<b>Nueva:</b> {b} ({despues.get('porcentaje', '-')}%)", style_header),
+        Spacer(1, 3*mm),
+        Paragraph(f"<b>Ítems con cambios:</b> {conteo['total']} — mejoran {conteo['mejora']}, "
+                  f"empeoran {conteo['empeora']}, otros cambios de estado {conteo['cambia']}, "
+                  f"solo observación {conteo['nota']}", style_header),
+        Spacer(1, 5*mm),
+    ]
+    if not cambios:
+        story.append(Paragraph("Las dos verificaciones tienen los mismos estados y observaciones.", style_header))
+    else:
+        data = [["Ítem", "Cambio", "Antes", "Después", "Observación anterior", "Observación nueva"]]
+        for c in cambios:
+            data.append([
+                _ParrafoCelda(texto_parrafo(c.item), style_cell),
+                _ParrafoCelda(_SENTIDOS[c.sentido], style_cell),
+                _ParrafoCelda(ESTADOS_HUMANOS.get(c.estado_antes, c.estado_antes), style_cell),
+                _ParrafoCelda(ESTADOS_HUMANOS.get(c.estado_despues, c.estado_despues), style_cell),
+                *(_ParrafoCelda(texto_parrafo(t) + (" …" if recortada else "") if t else "-", style_cell)
+                  for t, recortada in (recortar_observacion(c.nota_antes), recortar_observacion(c.nota_despues))),
+            ])
+        tbl = Table(data, colWidths=[65*mm, 22*mm, 22*mm, 22*mm, 74*mm, 74*mm], repeatRows=1, splitInRow=1)
+        tbl.setStyle(estilos["tabla_items"])
+        story.append(tbl)
+    doc.build(story)
+    buf.seek(0)
+    return buf
@@ -0,0 +1,211 @@
+"""Modo por lotes: verifica muchos productos desde CSV/JSON y genera sus PDF.
+
+Usa la misma lógica que la app (`catalogo` + `informe.generar_pdf`) sin
+importar Streamlit, repartiendo los productos en un pool de procesos.
+
+Formato de entrada (una fila/objeto por producto):
+    producto, proveedor, responsable, nombre_pdf (opcional), area_cm2 (opcional, Tabla 17)
+    tipo_producto (opcional: "Producto terminado" / "Materia prima"; solo se informan sus ítems)
+    <título del ítem>                 -> estado (Cumple / No cumple / No aplica / yes / no / na)
+    Observación: <título del ítem>    -> observación (opcional)
+En JSON también se aceptan los diccionarios "status" y "note" como en la sesión, y
+"fotos" (ítem → huellas de `evidencias.py`) para incluir la evidencia fotográfica.
+
+También se puede leer desde la base de verificaciones guardadas (`almacen.py`)
+y escribir un único PDF consolidado en lugar de un archivo por producto.
+
+Uso:
+    python lote.py productos.csv -o informes/ -j 8
+    python lote.py verificaciones.db --proveedor "Proveedor X" --desde 2026-09-01 --hasta 2026-10-01 \
+        --consolidado revision_septiembre.pdf
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from catalogo import TIPOS_PRODUCTO, normalizar_estado, resumen_estados, titulos
+
+PREFIJO_OBS = "Observación: "
+
+
+# -----------------------------------------------------------
+# LECTURA DE REGISTROS
+# -----------------------------------------------------------
+def _area(valor):
+    """Área de la cara principal (cm²) o None si viene vacía; rechaza NaN, infinitos y negativos."""
+    if not str(valor if valor is not None else "").strip():
+        return None
+    area = float(valor)
+    if not math.isfinite(area) or area < 0:
+        raise ValueError(f"area_cm2 debe ser un número no negativo: {valor!r}")
+    return area
+
+
+def registro_desde_fila(fila: dict) -> dict:
+    """Normaliza una fila/objeto de entrada al formato de registro (status/note completos)."""
+    status = {t: "none" for t in titulos()}
+    note = {t: "" for t in titulos()}
+    desconocidos = (set(fila.get("status") or {}) | set(fila.get("note") or {})) - set(status)
+    if desconocidos:
+        raise ValueError(f"Ítems desconocidos: {sorted(desconocidos)}")
+    for titulo, valor in (fila.get("status") or {}).items():
+        status[titulo] = normalizar_estado(valor)
+    for titulo, valor in (fila.get("note") or {}).items():
+        note[titulo] = str(valor or "")
+    for titulo in titulos():
+        if titulo in fila:
+            status[titulo] = normalizar_estado(fila[titulo])
+        if PREFIJO_OBS + titulo in fila:
+            note[titulo] = str(fila[PREFIJO_OBS + titulo] or "")
+    fotos = fila.get("fotos") or {}
+    if not isinstance(fotos, dict) or not all(
+            isinstance(h, list) and all(isinstance(x, str) for x in h) for h in fotos.values()):
+        raise ValueError("fotos debe asociar cada ítem a una lista de huellas de foto")
+    tipo = str(fila.get("tipo_producto") or "").strip() or None
+    if tipo is not None and tipo not in TIPOS_PRODUCTO:
+        raise ValueError(f"Tipo de producto no reconocido: {tipo!r}")
+    return {
+        "producto": str(fila.get("producto") or ""),
+        "proveedor": str(fila.get("proveedor") or ""),
+        "responsable": str(fila.get("responsable") or ""),
+        "nombre_pdf": str(fila.get("nombre_pdf") or ""),
+        "area_cm2": _area(fila.get("area_cm2")),
+        "tipo_producto": tipo,
+        "status": status,
+        "note": note,
+        "fotos": {t: list(h) for t, h in fotos.items() if t in status},
+    }
+
+
+def cargar_registros(ruta) -> list:
+    """Lee un archivo .csv o .json y devuelve los registros normalizados."""
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == ".json":
+        with open(ruta, encoding="utf-8") as f:
+            filas = json.load(f)
+        if isinstance(filas, dict):
+            filas = [filas]
+    else:
+        with open(ruta, encoding="utf-8-sig", newline="") as f:
+            filas = list(csv.DictReader(f))
+    return [registro_desde_fila(fila) for fila in filas]
+
+
+def _nombre_archivo(registro: dict, usados: set) -> str:
+    base = registro["nombre_pdf"].strip() or "informe_" + (
+        re.sub(r"[^\w-]+", "_", registro["producto"]).strip("_") or "sin_nombre"
+    )
+    nombre, n = base, 2
+    while nombre in usados:
+        nombre, n = f"{base}_{n}", n + 1
+    usados.add(nombre)
+    return nombre + ".pdf"
+
+
+# -----------------------------------------------------------
+# TRABAJO POR PRODUCTO (se ejecuta en el proceso hijo)
+# -----------------------------------------------------------
+def generar_informe(registro: dict) -> bytes:
+    """PDF de un registro normalizado (lo usan el lote y `servicio.py`)."""
+    from informe import construir_df, generar_pdf
+
+    porcentaje = resumen_estados(registro["status"], registro.get("tipo_producto"))["percent"]
+    df = construir_df(registro["status"], registro["note"], registro.get("tipo_producto"))
+    return generar_pdf(df, registro["producto"], registro["proveedor"], registro["responsable"], porcentaje,
+                       registro["nombre_pdf"], registro.get("area_cm2"), registro.get("fotos")).getvalue()
+
+
+def procesar_registro(registro: dict, ruta_pdf: str) -> dict:
+    t0 = time.perf_counter()
+    resumen = resumen_estados(registro["status"], registro.get("tipo_producto"))
+    datos = generar_informe(registro)
+    with open(ruta_pdf, "wb") as f:
+        f.write(datos)
+    return {
+        "producto": registro["producto"],
+        "archivo": ruta_pdf,
+        "porcentaje": resumen["percent"],
+        "bytes": len(datos),
+        "segundos": time.perf_counter() - t0,
+    }
+
+
+def verificar_lote(registros: list, carpeta_salida, procesos: int = None) -> dict:
+    """Genera un PDF por registro en `carpeta_salida` usando todos los núcleos.
+
+    Devuelve el detalle por archivo y el rendimiento total (informes/segundo).
+    """
+    carpeta = Path(carpeta_salida)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    usados = set()
+    rutas = [str(carpeta / _nombre_archivo(r, usados)) for r in registros]
+
+    t0 = time.perf_counter()
+    if procesos == 1:
+        archivos = [procesar_registro(r, p) for r, p in zip(registros, rutas)]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos or os.cpu_count()) as pool:
+            chunksize = max(1, len(registros) // ((procesos or os.cpu_count() or 1) * 4))
+            archivos = list(pool.map(procesar_registro, registros, rutas, chunksize=chunksize))
+    total = time.perf_counter() - t0
+    return {
+        "archivos": archivos,
+        "total_segundos": total,
+        "informes_por_segundo": len(archivos) / total if total > 0 else 0.0,
+    }
+
+
+# -----------------------------------------------------------
+# CLI
+# -----------------------------------------------------------
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Verificación por lotes de etiquetado nutricional")
+    parser.add_argument("entrada", help="Archivo .csv o .json con un producto por fila, o base .db de verificaciones")
+    parser.add_argument("-o", "--salida", default="informes", help="Carpeta de salida de los PDF")
+    parser.add_argument("-j", "--procesos", type=int, default=None, help="Procesos (por defecto: todos los núcleos)")
+    parser.add_argument("--consolidado", metavar="PDF", help="Escribir un solo PDF consolidado en esta ruta")
+    parser.add_argument("--proveedor", help="(entrada .db) Filtrar por proveedor")
+    parser.add_argument("--desde", help="(entrada .db) Fecha ISO inicial, inclusive")
+    parser.add_argument("--hasta", help="(entrada .db) Fecha ISO final, exclusiva")
+    args = parser.parse_args(argv)
+
+    if Path(args.entrada).suffix.lower() == ".db":
+        from almacen import Almacen
+
+        almacen = Almacen(args.entrada)
+        ids = [v["id"] for v in reversed(almacen.buscar(proveedor=args.proveedor, desde=args.desde,
+                                                          hasta=args.hasta, limite=-1))]
+        fabrica = lambda: (almacen.cargar(vid) for vid in ids)  # noqa: E731
+    else:
+        registros = cargar_registros(args.entrada)
+        fabrica = lambda: iter(registros)  # noqa: E731
+
+    if args.consolidado:
+        from informe import generar_pdf_consolidado
+
+        t0 = time.perf_counter()
+        total = generar_pdf_consolidado(fabrica, args.consolidado)
+        print(f"{args.consolidado}: {total} verificaciones en {time.perf_counter() - t0:.2f} s", file=sys.stderr)
+        return 0
+
+    registros = list(fabrica())
+    resultado = verificar_lote(registros, args.salida, args.procesos)
+    for a in resultado["archivos"]:
+        print(f"{a['archivo']}\t{a['porcentaje']}%\t{a['bytes']} B\t{a['segundos'] * 1000:.1f} ms")
+    print(
+        f"{len(resultado['archivos'])} informes en {resultado['total_segundos']:.2f} s "
+        f"({resultado['informes_por_segundo']:.1f} informes/s)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""Instrumentación de los caminos críticos de la app.
+
+Por cada rerun se registra el tiempo total y su desglose (recorrido del
+checklist, armado del DataFrame del informe, resumen de cumplimiento), la
+cantidad de widgets creados y el tamaño aproximado de la sesión; por cada
+informe, el tiempo de `generar_pdf` y el tamaño del PDF. Todo se acumula en
+un registro compartido por las sesiones y se exporta como:
+
+    - líneas JSON en el logger "verificador.metricas" (un evento por rerun / informe)
+    - texto en formato Prometheus, en un archivo (para el "textfile collector")
+      o en `GET /metricas` del servicio HTTP
+
+Configuración por variables de entorno (ver `Metricas.desde_entorno`):
+    METRICAS_LOG           archivo JSONL donde escribir los eventos   (por defecto: ninguno)
+    METRICAS_PROMETHEUS    archivo .prom a reescribir periódicamente  (por defecto: ninguno)
+    METRICAS_INTERVALO     segundos mínimos entre escrituras del .prom (por defecto 10)
+No importa Streamlit (salvo `widgets_del_rerun`, que lo importa al llamarse).
+"""
+import cProfile
+import json
+import logging
+import marshal
+import os
+import pickle
+import pstats
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+LIMITES_SEGUNDOS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOG = logging.getLogger("verificador.metricas")
+
+
+# -----------------------------------------------------------
+# MEDICIÓN DE UN RERUN
+# -----------------------------------------------------------
+class Medicion:
+    """Cronómetro de un rerun con tramos con nombre (se suman si un tramo se repite)."""
+
+    def __init__(self, tipo: str = "completo"):
+        self.tipo = tipo
+        self.inicio = time.perf_counter()
+        self.tramos = {}
+
+    @contextmanager
+    def tramo(self, nombre: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tramos[nombre] = self.tramos.get(nombre, 0.0) + time.perf_counter() - inicio
+
+    def segundos(self) -> float:
+        return time.perf_counter() - self.inicio
+
+
+def widgets_del_rerun() -> int:
+    """Widgets creados en el rerun en curso (0 fuera de Streamlit)."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return len(ctx.widget_ids_this_run) if ctx is not None else 0
+
+
+def es_rerun_de_fragmento() -> bool:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return bool(ctx is not None and ctx.fragment_ids_this_run)
+
+
+def tamano_sesion(estado) -> int:
+    """Bytes aproximados de la sesión (pickle de cada valor; lo que no se serializa no cuenta)."""
+    total = 0
+    for clave in list(estado.keys()):
+        try:
+            total += len(pickle.dumps(estado[clave], protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            continue
+    return total
+
+
+# -----------------------------------------------------------
+# REGISTRO COMPARTIDO
+# -----------------------------------------------------------
+class _Histograma:
+    def __init__(self, limites: tuple = LIMITES_SEGUNDOS):
+        self.limites = limites
+        self.cubetas = [0] * len(limites)
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, valor: float) -> None:
+        self.suma += valor
+        self.cuenta += 1
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.cubetas[i] += 1
+
+    def lineas(self, nombre: str, etiquetas: str = "") -> list:
+        sep = "," if etiquetas else ""
+        filas = [f'{nombre}_bucket{{{etiquetas}{sep}le="{l:g}"}} {c}' for l, c in zip(self.limites, self.cubetas)]
+        filas.append(f'{nombre}_bucket{{{etiquetas}{sep}le="+Inf"}} {self.cuenta}')
+        sufijo = f"{{{etiquetas}}}" if etiquetas else ""
+        filas.append(f"{nombre}_sum{sufijo} {self.suma:.6f}")
+        filas.append(f"{nombre}_count{sufijo} {self.cuenta}")
+        return filas
+
+
+class Metricas:
+    def __init__(self, ruta_prometheus: str = None, intervalo: float = 10.0):
+        self.ruta_prometheus = ruta_prometheus
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._ultima_exportacion = 0.0
+        self._reruns = {}               # tipo → _Histograma
+        self._tramos = {}               # nombre → segundos acumulados
+        self._widgets = {"ultimo": 0, "maximo": 0}
+        self._sesion = {"ultimo": 0, "maximo": 0}
+        self._pdf = _Histograma()
+        self._pdf_bytes = 0
+        self._pdf_errores = 0
+
+    @classmethod
+    def desde_entorno(cls) -> "Metricas":
+        ruta_log = os.environ.get("METRICAS_LOG")
+        if ruta_log and not any(getattr(h, "baseFilename", None) == os.path.abspath(ruta_log) for h in LOG.handlers):
+            manejador = logging.FileHandler(ruta_log, encoding="utf-8")
+            manejador.setFormatter(logging.Formatter("%(message)s"))
+            LOG.addHandler(manejador)
+            LOG.setLevel(logging.INFO)
+        return cls(
+            ruta_prometheus=os.environ.get("METRICAS_PROMETHEUS") or None,
+            intervalo=float(os.environ.get("METRICAS_INTERVALO", 10)),
+        )
+
+    def registrar_rerun(self, medicion: Medicion, widgets: int, bytes_sesion: int) -> dict:
+        """Cierra la medición, la acumula y emite su evento; devuelve el evento."""
+        evento = {
+            "evento": "rerun", "ts": round(time.time(), 3), "tipo": medicion.tipo,
+            "segundos": round(medicion.segundos(), 6),
+            "tramos": {k: round(v, 6) for k, v in medicion.tramos.items()},
+            "widgets": widgets, "bytes_sesion": bytes_sesion,
+        }
+        with self._lock:
+            self._reruns.setdefault(medicion.tipo, _Histograma()).observar(evento["segundos"])
+            for nombre, segundos in medicion.tramos.items():
+                self._tramos[nombre] = self._tramos.get(nombre, 0.0) + segundos
+            for actual, valor in ((self._widgets, widgets), (self._sesion, bytes_sesion)):
+                actual["ultimo"], actual["maximo"] = valor, max(actual["maximo"], valor)
+        self._emitir(evento)
+        return evento
+
+    def registrar_pdf(self, segundos: float, bytes_pdf: int = 0, error: str = None, origen: str = "app") -> None:
+        evento = {"evento": "pdf", "ts": round(time.time(), 3), "origen": origen,
+                  "segundos": round(segundos, 6), "bytes": bytes_pdf}
+        if error:
+            evento["error"] = error
+        with self._lock:
+            if error:
+                self._pdf_errores += 1
+            else:
+                self._pdf.observar(segundos)
+                self._pdf_bytes += bytes_pdf
+        self._emitir(evento)
+
+    @contextmanager
+    def medir_pdf(self, origen: str = "app"):
+        """Mide el bloque; el bloque debe poner los bytes del PDF en `resultado["datos"]`."""
+        resultado = {"datos": b""}
+        inicio = time.perf_counter()
+        try:
+            yield resultado
+        except Exception as exc:
+            self.registrar_pdf(time.perf_counter() - inicio, error=str(exc), origen=origen)
+            raise
+        self.registrar_pdf(time.perf_counter() - inicio, len(resultado["datos"]), origen=origen)
+
+    def _emitir(self, evento: dict) -> None:
+        if LOG.isEnabledFor(logging.INFO):
+            LOG.info(json.dumps(evento, ensure_ascii=False))
+        if self.ruta_prometheus and time.monotonic() - self._ultima_exportacion >= self.intervalo:
+            self.exportar()
+
+    def texto_prometheus(self) -> str:
+        with self._lock:
+            lineas = [
+                "# HELP verificador_rerun_segundos Duración de cada rerun de App.py",
+                "# TYPE verificador_rerun_segundos histogram",
+            ]
+            for tipo, histograma in sorted(self._reruns.items()):
+                lineas += histograma.lineas("verificador_rerun_segundos", f'tipo="{tipo}"')
+            lineas += ["# HELP verificador_tramo_segundos_total Tiempo acumulado por tramo del rerun",
+                       "# TYPE verificador_tramo_segundos_total counter"]
+            lineas += [f'verificador_tramo_segundos_total{{tramo="{n}"}} {s:.6f}' for n, s in sorted(self._tramos.items())]
+            for nombre, datos, ayuda in (("widgets", self._widgets, "Widgets creados en el rerun"),
+                                         ("sesion_bytes", self._sesion, "Tamaño aproximado de la sesión")):
+                lineas += [f"# HELP verificador_{nombre} {ayuda}", f"# TYPE verificador_{nombre} gauge",
+                           f'verificador_{nombre}{{medida="ultimo"}} {datos["ultimo"]}',
+                           f'verificador_{nombre}{{medida="maximo"}} {datos["maximo"]}']
+            lineas += ["# HELP verificador_pdf_segundos Duración de generar_pdf",
+                       "# TYPE verificador_pdf_segundos histogram"]
+            lineas += self._pdf.lineas("verificador_pdf_segundos")
+            lineas += ["# HELP verificador_pdf_bytes_total Bytes de PDF generados",
+                       "# TYPE verificador_pdf_bytes_total counter", f"verificador_pdf_bytes_total {self._pdf_bytes}",
+                       "# HELP verificador_pdf_errores_total Informes que fallaron",
+                       "# TYPE verificador_pdf_errores_total counter", f"verificador_pdf_errores_total {self._pdf_errores}"]
+        return "\n".join(lineas) + "\n"
+
+    def exportar(self, ruta: str = None) -> None:
+        """Reescribe el archivo Prometheus de forma atómica."""
+        ruta = ruta or self.ruta_prometheus
+        self._ultima_exportacion = time.monotonic()
+        carpeta = os.path.dirname(os.path.abspath(ruta))
+        fd, temporal = tempfile.mkstemp(dir=carpeta, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.texto_prometheus())
+        os.replace(temporal, ruta)
+
+
+METRICAS = Metricas.desde_entorno()
+
+
+# -----------------------------------------------------------
+# PERFIL (cProfile) DE UNA SESIÓN
+# -----------------------------------------------------------
+class Perfilador:
+    """Acumula el perfil de los reruns de una sesión mientras está activo."""
+
+    def __init__(self):
+        self._perfil = cProfile.Profile()
+        self.reruns = 0
+
+    def iniciar(self) -> None:
+        self._perfil.enable()
+
+    def detener(self) -> None:
+        self._perfil.disable()
+        self.reruns += 1
+
+    def resumen(self, n: int = 15, orden: str = "cumulative") -> str:
+        salida = StringIO()
+        pstats.Stats(self._perfil, stream=salida).strip_dirs().sort_stats(orden).print_stats(n)
+        return salida.getvalue()
+
+    def volcado(self) -> bytes:
+        """Perfil en el formato de `pstats.Stats.dump_stats` (se abre con pstats o snakeviz)."""
+        self._perfil.create_stats()
+        return marshal.dumps(self._perfil.stats)
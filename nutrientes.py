@@ -0,0 +1,202 @@
+"""Motor de nutrientes críticos: decide los sellos frontales de advertencia.
+
+Aplica los límites de la Res. 810/2021 mod. 2492/2022 (ítem "Límite de
+nutrientes críticos") sobre la información nutricional por 100 g o 100 mL:
+
+    azúcares libres  ≥ 10 % de las kcal totales     (4 kcal/g)
+    grasas saturadas ≥ 10 % de las kcal totales     (9 kcal/g)
+    grasas trans     ≥  1 % de las kcal totales     (9 kcal/g)
+    sodio            ≥ 1 mg/kcal, o ≥ 300 mg/100 g en sólidos;
+                     ≥ 40 mg/100 mL en bebidas sin aporte energético
+    edulcorantes     cualquier cantidad → sello "Contiene edulcorante"
+
+`evaluar_sellos` trabaja sobre un DataFrame completo (miles de SKU) con
+operaciones vectorizadas; `evaluar_producto` es el atajo para un solo producto
+y no necesita pandas (solo numpy), para no cargarlo en la app.
+
+Uso por lotes:
+    python nutrientes.py tabla_nutricional.csv -o sellos.csv
+"""
+import argparse
+import sys
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+COLUMNAS_ENTRADA = {
+    "energia_kcal": 0.0,
+    "azucares_libres_g": 0.0,
+    "grasas_saturadas_g": 0.0,
+    "grasas_trans_g": 0.0,
+    "sodio_mg": 0.0,
+    "es_bebida": False,
+    "contiene_edulcorante": False,
+}
+
+SELLOS = {
+    "sello_azucares": "EXCESO EN AZÚCARES",
+    "sello_grasas_saturadas": "EXCESO EN GRASAS SATURADAS",
+    "sello_grasas_trans": "EXCESO EN GRASAS TRANS",
+    "sello_sodio": "EXCESO EN SODIO",
+    "sello_edulcorante": "CONTIENE EDULCORANTE",
+}
+
+_VERDADERO = ("1", "1.0", "true", "si", "sí", "x", "yes")
+
+ITEM_LIMITES = "Límite de nutrientes críticos"
+ITEM_EDULCORANTE = "Sello 'Contiene edulcorante'"
+
+
+def _preparar(df: "pd.DataFrame") -> "pd.DataFrame":
+    import pandas as pd
+    datos = df.copy()
+    for columna, defecto in COLUMNAS_ENTRADA.items():
+        if columna not in datos:
+            datos[columna] = defecto
+    for columna in ("energia_kcal", "azucares_libres_g", "grasas_saturadas_g", "grasas_trans_g", "sodio_mg"):
+        datos[columna] = pd.to_numeric(datos[columna], errors="coerce").fillna(0.0).astype(float)
+    for columna in ("es_bebida", "contiene_edulcorante"):
+        serie = datos[columna]
+        if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+            datos[columna] = serie.fillna(0).astype(bool)
+        else:
+            datos[columna] = serie.astype(str).str.strip().str.lower().isin(_VERDADERO)
+    return datos
+
+
+def _unir(n: int, reglas: list, separador: str) -> np.ndarray:
+    """Concatena, fila por fila, los textos de las reglas disparadas (valores None = texto fijo)."""
+    textos = np.full(n, "", dtype=object)
+    for disparado, valores, plantilla in reglas:
+        idx = np.flatnonzero(disparado)
+        nuevos = [plantilla] * len(idx) if valores is None else [plantilla.format(v) for v in valores[idx]]
+        textos[idx] = [p + separador + t if p else t for p, t in zip(textos[idx], nuevos)]
+    return textos
+
+
+def _evaluar_arreglos(kcal, azucares, saturadas, trans, sodio, bebida, edulcorante, explicar: bool) -> dict:
+    """Núcleo vectorizado sobre arreglos numpy; devuelve las columnas sello_* (y motivo/sellos)."""
+    con_energia = kcal > 0
+    kcal_seguras = np.where(con_energia, kcal, 1.0)
+
+    pct_azucar = np.where(con_energia, azucares * 4 / kcal_seguras * 100, 0.0)
+    pct_saturada = np.where(con_energia, saturadas * 9 / kcal_seguras * 100, 0.0)
+    pct_trans = np.where(con_energia, trans * 9 / kcal_seguras * 100, 0.0)
+    mg_por_kcal = np.where(con_energia, sodio / kcal_seguras, 0.0)
+
+    sodio_por_kcal = con_energia & (mg_por_kcal >= 1)
+    sodio_solido = ~bebida & (sodio >= 300)
+    sodio_bebida_sin_energia = bebida & ~con_energia & (sodio >= 40)
+
+    columnas = {
+        "sello_azucares": pct_azucar >= 10,
+        "sello_grasas_saturadas": pct_saturada >= 10,
+        "sello_grasas_trans": pct_trans >= 1,
+        "sello_sodio": sodio_por_kcal | sodio_solido | sodio_bebida_sin_energia,
+        "sello_edulcorante": edulcorante,
+    }
+    if not explicar:
+        return columnas
+
+    # Explicación por fila: una frase por umbral disparado. Solo se formatean
+    # las filas en que el umbral se cumple.
+    reglas = [
+        (columnas["sello_azucares"], pct_azucar, "azúcares libres {:.1f} % kcal ≥ 10 %"),
+        (columnas["sello_grasas_saturadas"], pct_saturada, "grasas saturadas {:.1f} % kcal ≥ 10 %"),
+        (columnas["sello_grasas_trans"], pct_trans, "grasas trans {:.2f} % kcal ≥ 1 %"),
+        (sodio_por_kcal, mg_por_kcal, "sodio {:.2f} mg/kcal ≥ 1 mg/kcal"),
+        (sodio_solido, sodio, "sodio {:.0f} mg/100 g ≥ 300 mg/100 g"),
+        (sodio_bebida_sin_energia, sodio, "sodio {:.0f} mg/100 mL ≥ 40 mg/100 mL (bebida sin energía)"),
+        (columnas["sello_edulcorante"], None, "contiene edulcorantes"),
+    ]
+    n = len(kcal)
+    columnas["motivo"] = _unir(n, reglas, "; ")
+    columnas["sellos"] = _unir(n, [(columnas[c], None, nombre) for c, nombre in SELLOS.items()], ", ")
+    return columnas
+
+
+def evaluar_sellos(df: "pd.DataFrame", explicar: bool = True) -> "pd.DataFrame":
+    """Agrega a `df` las columnas sello_* (bool) y, si `explicar`, `sellos` y `motivo`.
+
+    Columnas esperadas (por 100 g o 100 mL; las faltantes se asumen 0/False):
+    energia_kcal, azucares_libres_g, grasas_saturadas_g, grasas_trans_g,
+    sodio_mg, es_bebida, contiene_edulcorante.
+    """
+    datos = _preparar(df)
+    columnas = _evaluar_arreglos(*(datos[c].to_numpy() for c in COLUMNAS_ENTRADA), explicar=explicar)
+    for columna, valores in columnas.items():
+        datos[columna] = valores
+    return datos
+
+
+def _a_bool(valor) -> bool:
+    if isinstance(valor, str):
+        return valor.strip().lower() in _VERDADERO
+    return bool(valor)
+
+
+def _a_float(valor) -> float:
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if numero != numero else numero   # NaN → 0
+
+
+def evaluar_producto(**nutrientes) -> dict:
+    """Evalúa un solo producto: evaluar_producto(energia_kcal=120, sodio_mg=350, ...)."""
+    valores = [
+        np.array([_a_bool(nutrientes.get(c, d)) if isinstance(d, bool) else _a_float(nutrientes.get(c, d))])
+        for c, d in COLUMNAS_ENTRADA.items()
+    ]
+    fila = _evaluar_arreglos(*valores, explicar=True)
+    return {
+        **{columna: bool(fila[columna][0]) for columna in SELLOS},
+        "sellos": [nombre for columna, nombre in SELLOS.items() if fila[columna][0]],
+        "motivo": fila["motivo"][0],
+    }
+
+
+def prellenar_checklist(resultado: dict, sellos_en_etiqueta=None) -> tuple:
+    """Traduce el resultado de `evaluar_producto` a (status, note) para los ítems de sellos.
+
+    Si se indican los sellos presentes en la etiqueta, el estado queda
+    'yes'/'no' según coincidan con los exigidos; si no, solo se deja la nota.
+    """
+    requeridos = [s for s in resultado["sellos"] if s != SELLOS["sello_edulcorante"]]
+    nota_limites = (
+        f"Sellos exigidos: {', '.join(requeridos)} ({resultado['motivo']})" if requeridos
+        else "Ningún nutriente crítico supera los límites."
+    )
+    nota_edulcorante = (
+        "El producto contiene edulcorantes: requiere sello." if resultado["sello_edulcorante"]
+        else "Sin edulcorantes declarados: no requiere sello."
+    )
+    status, note = {}, {ITEM_LIMITES: nota_limites, ITEM_EDULCORANTE: nota_edulcorante}
+    if sellos_en_etiqueta is not None:
+        presentes = set(sellos_en_etiqueta)
+        status[ITEM_LIMITES] = "yes" if presentes - {SELLOS["sello_edulcorante"]} == set(requeridos) else "no"
+        if resultado["sello_edulcorante"]:
+            status[ITEM_EDULCORANTE] = "yes" if SELLOS["sello_edulcorante"] in presentes else "no"
+        else:
+            status[ITEM_EDULCORANTE] = "no" if SELLOS["sello_edulcorante"] in presentes else "na"
+    return status, note
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Calcula los sellos frontales exigidos para una tabla de productos")
+    parser.add_argument("entrada", help="CSV con una fila por producto (por 100 g o 100 mL)")
+    parser.add_argument("-o", "--salida", default="-", help="CSV de salida (por defecto: salida estándar)")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    resultado = evaluar_sellos(pd.read_csv(args.entrada))
+    resultado.to_csv(sys.stdout if args.salida == "-" else args.salida, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
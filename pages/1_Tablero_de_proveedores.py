@@ -0,0 +1,91 @@
+"""Tablero de cumplimiento por proveedor a partir de las verificaciones guardadas.
+
+Lee solo las tablas de agregados por proveedor/mes/ítem que `almacen.py`
+mantiene al guardar cada verificación, así que el costo no crece con la
+cantidad de verificaciones sino con proveedores × meses.
+"""
+import pandas as pd
+import streamlit as st
+
+from almacen import Almacen
+
+st.set_page_config(page_title="Tablero de proveedores", layout="wide")
+st.title("Tablero de cumplimiento por proveedor")
+
+
+@st.cache_resource
+def obtener_almacen() -> Almacen:
+    return Almacen()
+
+
+almacen = obtener_almacen()
+todos = almacen.proveedores()
+meses = almacen.meses()
+if not todos:
+    st.info("Todavía no hay verificaciones guardadas. Usa «💾 Guardar verificación» en el checklist.")
+    st.stop()
+
+# -----------------------------------------------------------
+# FILTROS
+# -----------------------------------------------------------
+st.sidebar.header("Filtros del tablero")
+elegidos = st.sidebar.multiselect("Proveedores (vacío = todos)", options=todos, default=todos[:5],
+                                  format_func=lambda p: p or "(sin proveedor)", key="tablero_proveedores")
+if len(meses) > 1:
+    desde, hasta = st.sidebar.select_slider("Periodo", options=meses, value=(meses[0], meses[-1]), key="tablero_periodo")
+else:
+    desde = hasta = meses[0]
+filtro = {"proveedores": elegidos or None, "desde": desde, "hasta": hasta}
+
+# -----------------------------------------------------------
+# RESUMEN Y TENDENCIA
+# -----------------------------------------------------------
+tendencia = pd.DataFrame(almacen.tendencia_proveedores(**filtro))
+if tendencia.empty:
+    st.info("No hay verificaciones para los filtros elegidos.")
+    st.stop()
+
+total = int(tendencia["verificaciones"].sum())
+c1, c2, c3 = st.columns(3)
+c1.metric("Verificaciones", f"{total}")
+c2.metric("Cumplimiento promedio", f"{tendencia['suma_porcentaje'].sum() / total:.1f}%")
+c3.metric("Con algún 'No cumple'", f"{tendencia['con_no_cumple'].sum() / total * 100:.0f}%")
+
+st.subheader("Cumplimiento promedio por mes (%)")
+tendencia["proveedor"] = tendencia["proveedor"].replace("", "(sin proveedor)")
+# Sumas y no `pivot`: un proveedor llamado "(sin proveedor)" no debe chocar con el vacío
+por_mes = tendencia.pivot_table(index="mes", columns="proveedor", values=["suma_porcentaje", "verificaciones"],
+                                aggfunc="sum")
+st.line_chart((por_mes["suma_porcentaje"] / por_mes["verificaciones"]).round(1))
+
+# -----------------------------------------------------------
+# ÍTEMS Y CATEGORÍAS CON MÁS "NO CUMPLE"
+# -----------------------------------------------------------
+col_items, col_categorias = st.columns(2)
+with col_items:
+    st.subheader("Ítems más incumplidos")
+    items = pd.DataFrame(almacen.items_incumplidos(**filtro, limite=10))
+    if items.empty:
+        st.write("Ningún ítem quedó en 'No cumple' en este periodo.")
+    else:
+        st.bar_chart(items.set_index("item")["no_cumple"], horizontal=True)
+        st.dataframe(
+            items[["item", "no_cumple", "tasa"]].rename(
+                columns={"item": "Ítem", "no_cumple": "Veces 'No cumple'", "tasa": "% sobre contestados"}),
+            hide_index=True, use_container_width=True,
+        )
+with col_categorias:
+    st.subheader("Categorías con más 'No cumple'")
+    categorias = pd.DataFrame(almacen.incumplimientos_por_categoria(**filtro))
+    if categorias.empty:
+        st.write("Sin incumplimientos en este periodo.")
+    else:
+        st.bar_chart(categorias.set_index("categoria")["no_cumple"], horizontal=True)
+
+with st.expander("Datos por proveedor y mes"):
+    st.dataframe(
+        tendencia[["mes", "proveedor", "verificaciones", "promedio", "con_no_cumple"]].rename(
+            columns={"mes": "Mes", "proveedor": "Proveedor", "verificaciones": "Verificaciones",
+                     "promedio": "Cumplimiento promedio (%)", "con_no_cumple": "Con 'No cumple'"}),
+        hide_index=True, use_container_width=True,
+    )
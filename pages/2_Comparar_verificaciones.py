@@ -0,0 +1,92 @@
+"""Comparación de dos verificaciones guardadas del mismo producto.
+
+Pensada para la re-auditoría: cuando el proveedor corrige la etiqueta se
+vuelve a verificar y aquí solo se muestran los ítems cuyo estado u
+observación cambió, con un PDF opcional de las diferencias.
+"""
+from datetime import datetime
+
+import streamlit as st
+
+from almacen import Almacen
+from catalogo import ESTADOS_HUMANOS
+from comparacion import comparar, resumen_cambios
+
+st.set_page_config(page_title="Comparar verificaciones", layout="wide")
+st.title("Comparar dos verificaciones")
+
+ICONOS = {"yes": "✅", "no": "❌", "na": "⚪", "none": "…"}
+SENTIDOS = {"mejora": "🟢 Mejora", "empeora": "🔴 Empeora", "cambia": "🟡 Cambia", "nota": "📝 Solo observación"}
+
+
+@st.cache_resource
+def obtener_almacen() -> Almacen:
+    return Almacen()
+
+
+almacen = obtener_almacen()
+productos = almacen.productos()
+if not productos:
+    st.info("Todavía no hay verificaciones guardadas. Usa «💾 Guardar verificación» en el checklist.")
+    st.stop()
+
+# -----------------------------------------------------------
+# ELEGIR LAS DOS VERIFICACIONES (por defecto, las dos más recientes del producto)
+# -----------------------------------------------------------
+producto = st.sidebar.selectbox("Producto", options=productos, format_func=lambda p: p or "(sin nombre)",
+                                key="comparar_producto")
+verificaciones = almacen.buscar(producto=producto or None, limite=100) if producto else [
+    v for v in almacen.buscar(limite=500) if not v["producto"]]
+if len(verificaciones) < 2:
+    st.info("Este producto tiene una sola verificación guardada; hace falta una segunda para comparar.")
+    st.stop()
+
+etiquetas = {v["id"]: f"#{v['id']} {v['fecha'][:16]} — {v['responsable'] or '-'} ({v['porcentaje']}%)"
+             for v in verificaciones}
+ids = list(etiquetas)
+c1, c2 = st.columns(2)
+id_antes = c1.selectbox("Verificación anterior", options=ids, index=1, format_func=etiquetas.get,
+                        key="comparar_antes")
+id_despues = c2.selectbox("Verificación nueva", options=ids, index=0, format_func=etiquetas.get,
+                          key="comparar_despues")
+if id_antes == id_despues:
+    st.warning("Elige dos verificaciones distintas.")
+    st.stop()
+
+antes, despues = almacen.cargar(id_antes), almacen.cargar(id_despues)
+cambios = comparar(antes, despues)
+conteo = resumen_cambios(cambios)
+
+# -----------------------------------------------------------
+# RESUMEN Y SOLO LOS ÍTEMS QUE CAMBIARON
+# -----------------------------------------------------------
+m1, m2, m3, m4 = st.columns(4)
+m1.metric("Cumplimiento", f"{despues['porcentaje']}%", f"{despues['porcentaje'] - antes['porcentaje']:+.1f} pts")
+m2.metric("Ítems que mejoran", conteo["mejora"])
+m3.metric("Ítems que empeoran", conteo["empeora"])
+m4.metric("Otros cambios", conteo["cambia"] + conteo["nota"])
+
+if not cambios:
+    st.success("Las dos verificaciones tienen los mismos estados y observaciones.")
+for cambio in cambios:
+    st.markdown(f"#### {cambio.item}")
+    st.caption(f"{cambio.categoria} · {SENTIDOS[cambio.sentido]}")
+    izquierda, derecha = st.columns(2)
+    for columna, titulo, estado, nota in ((izquierda, f"#{id_antes}", cambio.estado_antes, cambio.nota_antes),
+                                          (derecha, f"#{id_despues}", cambio.estado_despues, cambio.nota_despues)):
+        with columna:
+            st.markdown(f"**{titulo}:** {ICONOS.get(estado, '')} {ESTADOS_HUMANOS.get(estado, estado)}")
+            if nota:
+                st.text(nota)
+    st.markdown("---")
+
+# -----------------------------------------------------------
+# PDF DE DIFERENCIAS (solo se arma si se pide)
+# -----------------------------------------------------------
+if cambios and st.button("Generar PDF de diferencias", key="comparar_pdf"):
+    from informe import generar_pdf_comparacion
+    st.download_button(
+        "Descargar PDF de diferencias", data=generar_pdf_comparacion(antes, despues, cambios).getvalue(),
+        file_name=f"diferencias_{id_antes}_{id_despues}_{datetime.now().strftime('%Y%m%d')}.pdf",
+        mime="application/pdf", key="comparar_descarga",
+    )
@@ -0,0 +1,135 @@
+"""Prueba de carga del servicio HTTP (`servicio.py`).
+
+Abre `--clientes` conexiones persistentes (una por hilo) y envía verificaciones
+durante `--segundos`; informa pedidos por segundo y latencias p50/p99. Con
+`--local` levanta un servicio propio en un puerto libre y con una base
+temporal, así no toca la base real:
+
+    python prueba_carga.py --local -c 8 -s 10
+    python prueba_carga.py --url http://127.0.0.1:8502 --pdf --lote 5
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from catalogo import ESTADOS_HUMANOS, titulos
+
+
+def _verificacion(n: int, rng: random.Random) -> dict:
+    estados = list(ESTADOS_HUMANOS)
+    return {
+        "producto": f"Producto {n % 50}",
+        "proveedor": f"Proveedor {n % 7}",
+        "responsable": "Prueba de carga",
+        "status": {t: rng.choice(estados) for t in titulos()},
+        "note": {},
+    }
+
+
+def _percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def _cliente(host: str, puerto: int, fin: float, ruta: str, lote: int, semilla: int,
+             latencias: list, errores: list) -> None:
+    rng = random.Random(semilla)
+    conexion = http.client.HTTPConnection(host, puerto, timeout=60)
+    n = 0
+    while time.perf_counter() < fin:
+        cuerpo = [_verificacion(semilla * 1_000_000 + n + i, rng) for i in range(lote)]
+        n += lote
+        inicio = time.perf_counter()
+        try:
+            conexion.request("POST", ruta, body=json.dumps(cuerpo).encode("utf-8"),
+                             headers={"Content-Type": "application/json"})
+            respuesta = conexion.getresponse()
+            respuesta.read()
+        except (OSError, http.client.HTTPException) as exc:
+            errores.append(repr(exc))
+            conexion.close()
+            conexion = http.client.HTTPConnection(host, puerto, timeout=60)
+            continue
+        latencias.append(time.perf_counter() - inicio)
+        if respuesta.status != 201:
+            errores.append(f"HTTP {respuesta.status}")
+    conexion.close()
+
+
+def ejecutar_carga(host: str, puerto: int, clientes: int = 8, segundos: float = 10.0,
+                   lote: int = 1, con_pdf: bool = False) -> dict:
+    """Lanza la carga y devuelve pedidos/s, verificaciones/s, p50/p99 (ms) y errores."""
+    ruta = "/verificaciones" + ("?pdf=1" if con_pdf else "")
+    latencias, errores = [], []
+    inicio = time.perf_counter()
+    fin = inicio + segundos
+    hilos = [threading.Thread(target=_cliente, args=(host, puerto, fin, ruta, lote, i, latencias, errores))
+             for i in range(clientes)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    total = time.perf_counter() - inicio
+    return {
+        "pedidos": len(latencias),
+        "pedidos_por_segundo": len(latencias) / total,
+        "verificaciones_por_segundo": len(latencias) * lote / total,
+        "p50_ms": _percentil(latencias, 50) * 1000,
+        "p99_ms": _percentil(latencias, 99) * 1000,
+        "errores": len(errores),
+        "primer_error": errores[0] if errores else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de verificaciones")
+    parser.add_argument("--url", default="http://127.0.0.1:8502")
+    parser.add_argument("--local", action="store_true", help="Levantar un servicio propio con una base temporal")
+    parser.add_argument("-c", "--clientes", type=int, default=8, help="Conexiones simultáneas")
+    parser.add_argument("-s", "--segundos", type=float, default=10.0)
+    parser.add_argument("--lote", type=int, default=1, help="Verificaciones por pedido")
+    parser.add_argument("--pdf", action="store_true", help="Pedir también el PDF de cada verificación")
+    parser.add_argument("-j", "--procesos", type=int, default=None, help="Procesos para PDF del servicio local")
+    args = parser.parse_args(argv)
+
+    servidor = servicio = None
+    with tempfile.TemporaryDirectory() as carpeta:
+        if args.local:
+            from almacen import Almacen
+            from servicio import ServicioVerificaciones, crear_servidor
+
+            servicio = ServicioVerificaciones(Almacen(os.path.join(carpeta, "carga.db")), args.procesos)
+            servidor = crear_servidor(servicio, "127.0.0.1", 0, registrar_pedidos=False)
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            host, puerto = servidor.server_address[:2]
+        else:
+            url = urlsplit(args.url)
+            host, puerto = url.hostname, url.port or 80
+        try:
+            resultado = ejecutar_carga(host, puerto, args.clientes, args.segundos, args.lote, args.pdf)
+        finally:
+            if servidor is not None:
+                servidor.shutdown()
+                servidor.server_close()
+                servicio.cerrar()
+
+    print(f"{resultado['pedidos']} pedidos en {args.segundos:g} s con {args.clientes} clientes")
+    print(f"  {resultado['pedidos_por_segundo']:.1f} pedidos/s "
+          f"({resultado['verificaciones_por_segundo']:.1f} verificaciones/s)")
+    print(f"  p50 {resultado['p50_ms']:.1f} ms · p99 {resultado['p99_ms']:.1f} ms")
+    if resultado["errores"]:
+        print(f"  {resultado['errores']} errores (primero: {resultado['primer_error']})", file=sys.stderr)
+    return 1 if resultado["errores"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Banco de pruebas de rendimiento de los caminos críticos de la app.
+
+Mide, con repeticiones y tomando la mediana:
+
+    rerun/…                   App.py (AppTest): primer pintado, rerun completo al editar un
+                              dato de la barra lateral, y reruns al pulsar un botón de estado
+                              y al escribir una observación
+    pdf/…                     `generar_pdf` con distintos tamaños de informe y largos de observación,
+                              y un informe de cientos de filas con notas largas
+    recortar_observacion/…    recorte de notas muy largas para la celda de la tabla
+    resumen_estados/…         conteo del resumen (checklist completo y filtrado por tipo)
+
+Los resultados se guardan en JSON y se comparan con una línea base; una medición
+más lenta que la base por encima de la tolerancia se marca como regresión y el
+script sale con código 1. Corre en un directorio temporal (la app autoguarda
+borradores y la base en el directorio actual):
+
+    python rendimiento.py --guardar-base rendimiento_base.json
+    python rendimiento.py --base rendimiento_base.json -o rendimiento.json
+    python rendimiento.py --solo pdf --repeticiones 10
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+LARGOS_OBSERVACION = (0, 200, 2000, 20_000)
+FILAS_INFORME_GRANDE = 300
+LARGOS_NOTA = (10_000, 100_000, 1_000_000)
+
+
+def cronometrar(funcion: Callable[[], object], repeticiones: int, calentamiento: int = 1) -> dict:
+    """Mediana, mínimo y máximo (en segundos) de `repeticiones` llamadas a `funcion`.
+
+    Si la función falla, se registra {"error": …} en lugar de cortar el banco completo.
+    """
+    try:
+        for _ in range(calentamiento):
+            funcion()
+    except Exception as exc:
+        return {"error": f"{type(exc).__name__}: {str(exc)[:200]}"}
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {"mediana_s": statistics.median(tiempos), "min_s": min(tiempos), "max_s": max(tiempos),
+            "repeticiones": repeticiones}
+
+
+def _texto(largo: int) -> str:
+    base = "Se observa la leyenda en la cara principal, tamaño de letra conforme. "
+    return (base * (largo // len(base) + 1))[:largo]
+
+
+# -----------------------------------------------------------
+# CASOS
+# -----------------------------------------------------------
+def medir_reruns(repeticiones: int) -> dict:
+    from streamlit.testing.v1 import AppTest
+    from catalogo import catalogo_vigente
+
+    titulo = catalogo_vigente().items[0].titulo
+    app = AppTest.from_file(os.path.join(RAIZ, "App.py"), default_timeout=120)
+    app.run()
+
+    def clic_estado():
+        # Alterna Cumple / No cumple para que cada clic cambie el estado
+        estado = "no" if app.session_state.status[titulo] == "yes" else "yes"
+        app.button(key=f"{titulo}_{estado}").click().run()
+
+    contador = [0]
+
+    def escribir_observacion():
+        contador[0] += 1
+        app.text_area(key=f"{titulo}_nota").input(f"Observación {contador[0]}").run()
+
+    def rerun_completo():
+        # Un widget de la barra lateral no está en ningún fragmento: se vuelve a ejecutar toda la página
+        contador[0] += 1
+        app.text_input(key="producto").input(f"Producto {contador[0]}").run()
+
+    resultados = {
+        "rerun/primer_pintado": cronometrar(lambda: AppTest.from_file(os.path.join(RAIZ, "App.py"),
+                                                                       default_timeout=120).run(),
+                                            max(1, repeticiones // 4)),
+        "rerun/completo": cronometrar(rerun_completo, repeticiones),
+        "rerun/clic_estado": cronometrar(clic_estado, repeticiones),
+        "rerun/escribir_observacion": cronometrar(escribir_observacion, repeticiones),
+    }
+    if app.exception:
+        raise RuntimeError(f"App.py falló durante la medición: {app.exception[0].value}")
+    return resultados
+
+
+def medir_pdf(repeticiones: int) -> dict:
+    from catalogo import TIPOS_PRODUCTO, catalogo_vigente, resumen_estados
+    from informe import construir_df, generar_pdf
+
+    catalogo = catalogo_vigente()
+    status = {t: ("yes", "no", "na")[i % 3] for i, t in enumerate(catalogo.titulos)}
+    resultados = {}
+    for tipo in (None, TIPOS_PRODUCTO[1]):
+        n = len(catalogo.aplicables(tipo))
+        porcentaje = resumen_estados(status, tipo)["percent"]
+        for largo in LARGOS_OBSERVACION:
+            df = construir_df(status, {t: _texto(largo) for t in catalogo.titulos}, tipo)
+            resultados[f"pdf/{n}_items_obs_{largo}"] = cronometrar(
+                lambda: generar_pdf(df, "Producto", "Proveedor", "Responsable", porcentaje, "bench", 25.0),
+                repeticiones,
+            )
+
+    # Informe grande: cientos de filas con notas largas (las filas del checklist repetidas)
+    import pandas as pd
+    df = construir_df(status, {t: _texto(2000) for t in catalogo.titulos})
+    grande = pd.concat([df] * (FILAS_INFORME_GRANDE // len(df) + 1), ignore_index=True).head(FILAS_INFORME_GRANDE)
+    resultados[f"pdf/{FILAS_INFORME_GRANDE}_filas_obs_2000"] = cronometrar(
+        lambda: generar_pdf(grande, "Producto", "Proveedor", "Responsable", 50.0, "bench"), max(1, repeticiones // 2))
+    return resultados
+
+
+def medir_recorte(repeticiones: int) -> dict:
+    from informe import recortar_observacion, texto_parrafo
+
+    resultados = {}
+    for largo in LARGOS_NOTA:
+        texto = _texto(largo)
+        resultados[f"recortar_observacion/{largo}"] = cronometrar(
+            lambda: texto_parrafo(recortar_observacion(texto)[0]), repeticiones)
+    return resultados
+
+
+def medir_resumen(repeticiones: int) -> dict:
+    from catalogo import TIPOS_PRODUCTO, catalogo_vigente, resumen_estados
+
+    status = {t: ("yes", "no", "na", "none")[i % 4] for i, t in enumerate(catalogo_vigente().titulos)}
+    # Cada llamada es de microsegundos: se cronometran 1000 seguidas
+    return {
+        f"resumen_estados/{(tipo or 'todos').lower().replace(' ', '_')}_x1000": cronometrar(
+            lambda: [resumen_estados(status, tipo) for _ in range(1000)], repeticiones)
+        for tipo in (None, TIPOS_PRODUCTO[1])
+    }
+
+
+CASOS = {"rerun": medir_reruns, "pdf": medir_pdf, "recortar_observacion": medir_recorte,
+         "resumen_estados": medir_resumen}
+
+
+# -----------------------------------------------------------
+# LÍNEA BASE
+# -----------------------------------------------------------
+def comparar(actual: dict, base: dict) -> list:
+    """(nombre, base_s, actual_s, cambio) de cada medición presente en ambos; cambio = actual/base - 1."""
+    filas = []
+    for nombre, medicion in actual.items():
+        if "error" not in medicion and "mediana_s" in base.get(nombre, {}):
+            antes, ahora = base[nombre]["mediana_s"], medicion["mediana_s"]
+            filas.append((nombre, antes, ahora, ahora / antes - 1 if antes else 0.0))
+    return filas
+
+
+def ejecutar(casos, repeticiones: int) -> dict:
+    sys.path.insert(0, RAIZ)
+    anterior = os.getcwd()
+    with tempfile.TemporaryDirectory() as carpeta:
+        os.chdir(carpeta)
+        try:
+            mediciones = {}
+            for nombre in casos:
+                mediciones.update(CASOS[nombre](repeticiones))
+        finally:
+            os.chdir(anterior)
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "mediciones": mediciones,
+    }
+
+
+def _guardar(ruta: str, datos: dict) -> None:
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento de la app")
+    parser.add_argument("--solo", action="append", choices=sorted(CASOS), help="Casos a medir (se puede repetir)")
+    parser.add_argument("-r", "--repeticiones", type=int, default=5)
+    parser.add_argument("-o", "--salida", help="Guardar los resultados en este JSON")
+    parser.add_argument("--base", help="JSON de línea base contra el cual comparar")
+    parser.add_argument("--guardar-base", help="Guardar los resultados como nueva línea base")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="Fracción de lentitud aceptada frente a la base (0.25 = 25 %%)")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.solo or list(CASOS), args.repeticiones)
+    for nombre, medicion in resultados["mediciones"].items():
+        if "error" in medicion:
+            print(f"{nombre:45} ERROR {medicion['error'][:80]}")
+            continue
+        print(f"{nombre:45} {medicion['mediana_s'] * 1000:10.2f} ms  (mín {medicion['min_s'] * 1000:.2f})")
+    for ruta in filter(None, (args.salida, args.guardar_base)):
+        _guardar(ruta, resultados)
+
+    if not args.base:
+        return 0
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)["mediciones"]
+    regresiones = 0
+    print(f"\nComparación con {args.base} (tolerancia {args.tolerancia:.0%}):")
+    for nombre, antes, ahora, cambio in comparar(resultados["mediciones"], base):
+        marca = "✗" if cambio > args.tolerancia else "✓"
+        regresiones += cambio > args.tolerancia
+        print(f"{marca} {nombre:43} {antes * 1000:9.2f} → {ahora * 1000:9.2f} ms  ({cambio:+.0%})")
+    for nombre, medicion in resultados["mediciones"].items():
+        if "error" in medicion and "mediana_s" in base.get(nombre, {}):
+            regresiones += 1
+            print(f"✗ {nombre:43} funcionaba en la base y ahora falla")
+    if regresiones:
+        print(f"✗ {regresiones} regresiones", file=sys.stderr)
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Revisión automática del texto del rótulo con reglas de expresiones regulares.
+
+Algunos ítems del checklist se pueden comprobar mecánicamente sobre la
+transcripción de la etiqueta:
+
+    Aditivos alimentarios      códigos E/INS sueltos (no entre paréntesis
+                               tras el nombre ni junto a él dentro de
+                               los paréntesis)                            → No cumple
+    Contenido neto             en unidades SI (g, kg, mL, L) / en oz, lb  → Cumple / No cumple
+    Fecha de vencimiento…      día/mes/año (mes ≤ 12) / mes/día/año       → Cumple / No cumple
+    País de origen             "Hecho en…", "Producto de <país>"          → Cumple
+    Lote                       "Lote" seguido de un código con dígitos    → Cumple
+    Forma y color              "EXCESO EN" en mayúsculas / en minúsculas
+                               o leyendas ajenas ("ALTO EN")              → Cumple / No cumple
+    Registro sanitario         código INVIMA (RSA, NSA, PSA…)             → Cumple
+
+Todas las reglas se compilan en una sola expresión (una alternativa con nombre
+por regla), así que cada rótulo se recorre una sola vez. Cada hallazgo guarda
+el fragmento y su posición como evidencia. Si un ítem tiene evidencia a favor y
+en contra, queda como "No cumple". Los ítems sin evidencia no se contestan.
+
+Uso por lotes (la salida es una entrada válida para `lote.py`):
+    python rotulos.py rotulos.csv -o prellenado.csv      (columnas producto, …, texto)
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
+
+from catalogo import ESTADOS_HUMANOS
+from lote import PREFIJO_OBS
+
+COLUMNA_TEXTO = "texto"
+
+
+class Regla(NamedTuple):
+    item: str
+    estado: str                 # estado que propone una coincidencia ("yes" / "no")
+    patron: str                 # sin grupos con captura; (?i:…) para ignorar mayúsculas
+    motivo: str
+    clasificar: Optional[Callable[[str], Optional[str]]] = None   # estado según el fragmento; None lo descarta
+
+
+class Evidencia(NamedTuple):
+    item: str
+    inicio: int
+    fin: int
+    fragmento: str
+    estado: str
+    motivo: str
+
+
+class Hallazgo(NamedTuple):
+    estado: str
+    evidencias: tuple
+
+
+# -----------------------------------------------------------
+# REGLAS
+# -----------------------------------------------------------
+_FECHA_NUMERICA = re.compile(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{2,4})")
+
+
+def _clasificar_fecha(fragmento: str) -> str:
+    # Con mes en letras el orden es inequívoco; con números, el segundo campo es el mes
+    partes = _FECHA_NUMERICA.search(fragmento)
+    if partes is None:
+        return "yes"
+    dia, mes = int(partes.group(1)), int(partes.group(2))
+    return "yes" if 1 <= dia <= 31 and 1 <= mes <= 12 else "no"
+
+
+def _con_digitos(fragmento: str) -> Optional[str]:
+    return "yes" if any(c.isdigit() for c in fragmento.split(None, 1)[-1]) else None
+
+
+_MAYUS = "A-ZÁÉÍÓÚÑ"
+_PALABRA = "A-Za-zÁÉÍÓÚÑáéíóúñü"
+_MESES = r"(?:ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)[a-z]*\.?"
+_NUTRIENTES = r"(?:AZ[ÚU]CARES|GRASAS\s+SATURADAS|GRASAS\s+TRANS|SODIO|CALOR[ÍI]AS)"
+_ADITIVO = r"\b(?:E-?\d{3}[a-f]?|(?i:INS)\s?-?\d{3,4}[a-f]?)\b"
+# "Producto de" va seguido de cualquier frase ("Producto de Alta calidad"): solo cuenta con un país
+_PAISES = (r"(?:Colombia|Per[úu]|Ecuador|Venezuela|Bolivia|Chile|Argentina|Uruguay|Paraguay|Brasil"
+           r"|M[ée]xico|Guatemala|Honduras|El\s+Salvador|Nicaragua|Costa\s+Rica|Panam[áa]|Cuba"
+           r"|Rep[úu]blica\s+Dominicana|Estados\s+Unidos|EE\.\s?UU\.?|Canad[áa]|Espa[ñn]a|Italia|Francia"
+           r"|Alemania|Portugal|Pa[íi]ses\s+Bajos|Holanda|Suiza|B[ée]lgica|Reino\s+Unido|China|Jap[óo]n"
+           r"|Corea|India|Tailandia|Vietnam|Indonesia|Malasia|Filipinas|Turqu[íi]a|Israel|Australia"
+           r"|Nueva\s+Zelanda|Sud[áa]frica|Marruecos|Egipto)")
+
+REGLAS = (
+    # Va antes que la regla del código suelto: consume "potasio E202" o "cítrico, E330" dentro de
+    # paréntesis ("conservante (sorbato de potasio E202)", "acidulante (ácido cítrico, E330)")
+    # para que ese código no se marque
+    Regla("Aditivos alimentarios", "yes",
+          rf"[{_PALABRA}]{{3,}},?\s+{_ADITIVO}(?=[^()]*\))",
+          "aditivo nombrado con su código", lambda fragmento: None),
+    Regla("Aditivos alimentarios", "no",
+          rf"(?<!\(){_ADITIVO}",
+          "aditivo declarado por código (E/INS) en lugar de su nombre"),
+    Regla("Contenido neto", "yes",
+          r"(?i:\b(?:contenido|cont\.|peso)\s+neto\s*:?\s*\d+(?:[.,]\d+)?\s*(?:kg|g|mg|ml|l|cm3)\b)",
+          "contenido neto en unidades SI"),
+    Regla("Contenido neto", "no",
+          r"(?i:\b(?:contenido|cont\.|peso)\s+neto\s*:?\s*\d+(?:[.,]\d+)?\s*(?:fl\.?\s?oz|oz|onzas?|lbs?|libras?)\b)",
+          "contenido neto en unidades no SI"),
+    Regla("Fecha de vencimiento o duración mínima", "yes",
+          r"(?i:\b(?:fecha\s+de\s+vencimiento|vencimiento|vence|venc\.|f\.\s?v\.|fv"
+          r"|consumir\s+(?:preferiblemente\s+)?antes\s+de(?:l)?)\s*:?\s*"
+          rf"(?:\d{{1,2}}[/.-]\d{{1,2}}[/.-]\d{{2,4}}|\d{{1,2}}\s*(?:de\s+)?{_MESES}\s*(?:de\s+)?\d{{2,4}})\b)",
+          "fecha con día, mes y año", _clasificar_fecha),
+    Regla("País de origen", "yes",
+          rf"(?i:\b(?:hecho|elaborado|fabricado|producido)\s+en|\bpa[ií]s\s+de\s+origen\s*:?)"
+          rf"\s+[{_MAYUS}][{_PALABRA}]+(?:\s+[{_MAYUS}][{_PALABRA}]+)*"
+          rf"|(?i:\bproducto\s+de)\s+{_PAISES}(?![{_PALABRA}])",
+          "declaración del país de origen"),
+    Regla("Lote", "yes",
+          r"(?i:\blote\b\s*(?:n[°o.º]\s*)?[:.]?\s*[A-Z0-9][A-Z0-9/-]{2,})",
+          "código de lote", _con_digitos),
+    Regla("Forma y color", "yes",
+          rf"\bEXCESO\s+EN\s+{_NUTRIENTES}\b",
+          "leyenda «EXCESO EN» en mayúsculas"),
+    Regla("Forma y color", "no",
+          rf"(?i:\bexceso\s+en\s+{_NUTRIENTES}\b)",
+          "leyenda «EXCESO EN» sin mayúsculas sostenidas"),
+    Regla("Forma y color", "no",
+          rf"(?i:\balto\s+en\s+{_NUTRIENTES}\b)",
+          "leyenda «ALTO EN»: el sello colombiano usa «EXCESO EN»"),
+    Regla("Registro sanitario", "yes",
+          r"(?i:\b(?:RSAE?|NSA|PSA|RSiA)\s?-?\s?[A-Z0-9]{4,}(?:-[A-Z0-9]+)*\b)",
+          "número de registro sanitario INVIMA", _con_digitos),
+)
+
+
+# -----------------------------------------------------------
+# MOTOR
+# -----------------------------------------------------------
+class MotorTexto:
+    """Conjunto de reglas compilado en una sola expresión regular."""
+
+    def __init__(self, reglas: Iterable[Regla] = REGLAS):
+        self.reglas = tuple(reglas)
+        self._patron = re.compile("|".join(f"(?P<r{i}>{r.patron})" for i, r in enumerate(self.reglas)))
+
+    def evidencias(self, texto: str) -> Iterator[Evidencia]:
+        for m in self._patron.finditer(texto or ""):
+            regla = self.reglas[int(m.lastgroup[1:])]
+            estado = regla.clasificar(m.group()) if regla.clasificar else regla.estado
+            if estado is not None:
+                yield Evidencia(regla.item, m.start(), m.end(), m.group(), estado, regla.motivo)
+
+    def revisar(self, texto: str) -> dict:
+        """Ítem → Hallazgo(estado, evidencias) para los ítems con alguna evidencia."""
+        por_item = {}
+        for evidencia in self.evidencias(texto):
+            por_item.setdefault(evidencia.item, []).append(evidencia)
+        return {
+            item: Hallazgo("no" if any(e.estado == "no" for e in evidencias) else "yes", tuple(evidencias))
+            for item, evidencias in por_item.items()
+        }
+
+
+MOTOR = MotorTexto()
+
+
+def revisar_rotulo(texto: str, motor: MotorTexto = MOTOR) -> dict:
+    return motor.revisar(texto)
+
+
+def revisar_rotulos(textos: Iterable[str], motor: MotorTexto = MOTOR) -> Iterator[dict]:
+    """Versión por lotes: un resultado por rótulo, en el mismo orden."""
+    return (motor.revisar(t) for t in textos)
+
+
+def nota_evidencia(hallazgo: Hallazgo, limite: int = 3) -> str:
+    partes = [f"«{e.fragmento.strip()}» ({e.motivo})" for e in hallazgo.evidencias[:limite]]
+    resto = len(hallazgo.evidencias) - limite
+    if resto > 0:
+        partes.append(f"y {resto} más")
+    return "Texto del rótulo: " + "; ".join(partes)
+
+
+def prellenar_checklist(resultado: dict) -> tuple:
+    """Traduce el resultado de `revisar_rotulo` a (status, note) para los ítems con evidencia."""
+    status = {item: h.estado for item, h in resultado.items()}
+    note = {item: nota_evidencia(h) for item, h in resultado.items()}
+    return status, note
+
+
+# -----------------------------------------------------------
+# USO POR LOTES
+# -----------------------------------------------------------
+def _leer_filas(ruta: Path) -> list:
+    if ruta.suffix.lower() == ".json":
+        with open(ruta, encoding="utf-8") as f:
+            filas = json.load(f)
+        return [filas] if isinstance(filas, dict) else filas
+    with open(ruta, encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def escribir_prellenado(filas: list, salida, columna: str = COLUMNA_TEXTO, motor: MotorTexto = MOTOR) -> int:
+    """Escribe en `salida` (archivo de texto) el CSV de entrada de `lote.py`; devuelve las filas escritas."""
+    items = list(dict.fromkeys(r.item for r in motor.reglas))
+    otras = list(dict.fromkeys(k for fila in filas for k in fila if k != columna))
+    escritor = csv.DictWriter(salida, fieldnames=otras + items + [PREFIJO_OBS + i for i in items])
+    escritor.writeheader()
+    for fila, resultado in zip(filas, revisar_rotulos((str(f.get(columna) or "") for f in filas), motor)):
+        status, note = prellenar_checklist(resultado)
+        escritor.writerow({
+            **{k: fila.get(k, "") for k in otras},
+            **{i: ESTADOS_HUMANOS[status[i]] if i in status else "" for i in items},
+            **{PREFIJO_OBS + i: note.get(i, "") for i in items},
+        })
+    return len(filas)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-llena el checklist a partir del texto de los rótulos")
+    parser.add_argument("entrada", help="CSV/JSON con una fila por producto y la columna del texto del rótulo")
+    parser.add_argument("-c", "--columna", default=COLUMNA_TEXTO)
+    parser.add_argument("-o", "--salida", default="-", help="CSV de salida (por defecto: salida estándar)")
+    args = parser.parse_args(argv)
+
+    filas = _leer_filas(Path(args.entrada))
+    if args.salida == "-":
+        escribir_prellenado(filas, sys.stdout, args.columna)
+    else:
+        with open(args.salida, "w", encoding="utf-8", newline="") as salida:
+            escribir_prellenado(filas, salida, args.columna)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
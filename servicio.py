@@ -0,0 +1,340 @@
+"""Servicio HTTP local (sin interfaz) para registrar verificaciones desde el ERP.
+
+Usa el mismo catálogo, el mismo cálculo de cumplimiento y el mismo
+`generar_pdf` que la app. Solo biblioteca estándar: `ThreadingHTTPServer` con
+HTTP/1.1 y conexiones persistentes (keep-alive); los PDF se construyen en un
+pool de procesos y las escrituras concurrentes en SQLite se agrupan en una
+sola transacción. No importa Streamlit.
+
+    GET  /salud                         estado y versión de las reglas
+    GET  /catalogo                      ítems del paquete de reglas vigente
+    POST /verificaciones[?pdf=1]        un objeto o una lista (mismo formato JSON que `lote.py`);
+                                        devuelve el resumen de cada una (y el PDF en base64 si pdf=1)
+    GET  /verificaciones?proveedor=…    búsqueda (mismos filtros que `Almacen.buscar`)
+    GET  /verificaciones/<id>           verificación guardada con su resumen
+    GET  /verificaciones/<id>/pdf       informe PDF (application/pdf)
+    GET  /metricas                      métricas en formato Prometheus (ver `metricas.py`)
+
+Uso:
+    python servicio.py --puerto 8502 -j 4
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from almacen import RUTA_DB, Almacen
+from catalogo import catalogo_vigente, resumen_estados
+from lote import generar_informe, registro_desde_fila
+from metricas import METRICAS
+
+MAX_CUERPO = 8 * 1024 * 1024
+MAX_LOTE = 500
+
+
+class SolicitudInvalida(ValueError):
+    """El pedido (cuerpo o parámetros) no es válido; se responde 400."""
+
+
+# -----------------------------------------------------------
+# ESCRITURAS AGRUPADAS
+# -----------------------------------------------------------
+class AgrupadorEscrituras:
+    """Junta los registros que llegan casi a la vez y los guarda en una sola transacción.
+
+    Cada pedido espera su propio resultado (ids) en un Future; un único hilo
+    escritor vacía la cola cada `espera` segundos o al juntar `max_registros`.
+    """
+
+    def __init__(self, almacen: Almacen, max_registros: int = 256, espera: float = 0.002):
+        self.almacen = almacen
+        self.max_registros = max_registros
+        self.espera = espera
+        self.transacciones = 0
+        self._cola = queue.Queue()
+        self._hilo = threading.Thread(target=self._bucle, name="escritor", daemon=True)
+        self._hilo.start()
+
+    def guardar(self, registros: list) -> list:
+        futuro = Future()
+        self._cola.put((registros, futuro))
+        return futuro.result()
+
+    def _bucle(self) -> None:
+        while True:
+            pedido = self._cola.get()
+            if pedido is None:
+                return
+            pedidos, total = [pedido], len(pedido[0])
+            while total < self.max_registros:
+                try:
+                    siguiente = self._cola.get(timeout=self.espera)
+                except queue.Empty:
+                    break
+                if siguiente is None:
+                    self._cola.put(None)
+                    break
+                pedidos.append(siguiente)
+                total += len(siguiente[0])
+            self._escribir(pedidos)
+
+    def _escribir(self, pedidos: list) -> None:
+        try:
+            ids = iter(self.almacen.guardar_varios([r for registros, _ in pedidos for r in registros]))
+            self.transacciones += 1
+        except Exception:
+            # Se reintenta pedido por pedido para que un error no afecte a los demás
+            for registros, futuro in pedidos:
+                try:
+                    futuro.set_result(self.almacen.guardar_varios(registros))
+                except Exception as exc:
+                    futuro.set_exception(exc)
+            return
+        for registros, futuro in pedidos:
+            futuro.set_result([next(ids) for _ in registros])
+
+    def cerrar(self) -> None:
+        self._cola.put(None)
+        self._hilo.join()
+
+
+# -----------------------------------------------------------
+# SERVICIO
+# -----------------------------------------------------------
+def _clave_informe(registro: dict) -> str:
+    campos = ("producto", "proveedor", "responsable", "nombre_pdf", "area_cm2", "tipo_producto", "status", "note", "fotos")
+    contenido = [datetime.now().strftime("%Y-%m-%d"), catalogo_vigente().huella, [registro.get(c) for c in campos]]
+    return hashlib.sha256(json.dumps(contenido, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _informe_medido(registro: dict) -> tuple:
+    # Se ejecuta en el proceso hijo: el tiempo no incluye la espera en la cola del pool
+    inicio = time.perf_counter()
+    datos = generar_informe(registro)
+    return datos, time.perf_counter() - inicio
+
+
+def _resumen(registro: dict, vid: int = None) -> dict:
+    resumen = resumen_estados(registro["status"], registro.get("tipo_producto"))
+    return {
+        "id": vid,
+        "producto": registro.get("producto"),
+        "proveedor": registro.get("proveedor"),
+        "tipo_producto": registro.get("tipo_producto"),
+        "porcentaje": resumen["percent"],
+        "conteo": {k: resumen[k] for k in ("yes", "no", "na", "none")},
+        "no_cumple": [t for t, e in registro["status"].items() if e == "no"],
+        "reglas_version": registro.get("reglas_version") or catalogo_vigente().version,
+    }
+
+
+class ServicioVerificaciones:
+    """Lógica del servicio, independiente de HTTP (se puede usar directamente en pruebas)."""
+
+    def __init__(self, almacen: Almacen, procesos: int = None, cache=None):
+        from informe import CachePDF
+
+        self.almacen = almacen
+        self.escrituras = AgrupadorEscrituras(almacen)
+        self.cache = cache or CachePDF()
+        self._pool = ProcessPoolExecutor(max_workers=procesos or os.cpu_count())
+
+    def _informes(self, registros: list) -> list:
+        claves = [_clave_informe(r) for r in registros]
+        datos = [self.cache.obtener(c) for c in claves]
+        faltan = [i for i, d in enumerate(datos) if d is None]
+        futuros = {i: self._pool.submit(_informe_medido, registros[i]) for i in faltan}
+        for i, futuro in futuros.items():
+            try:
+                datos[i], segundos = futuro.result()
+            except Exception as exc:
+                METRICAS.registrar_pdf(0.0, error=str(exc), origen="servicio")
+                raise
+            METRICAS.registrar_pdf(segundos, len(datos[i]), origen="servicio")
+            self.cache.guardar(claves[i], datos[i])
+        return datos
+
+    def registrar(self, cuerpo, con_pdf: bool = False) -> list:
+        filas = cuerpo if isinstance(cuerpo, list) else [cuerpo]
+        if not filas or len(filas) > MAX_LOTE:
+            raise SolicitudInvalida(f"Se esperan entre 1 y {MAX_LOTE} verificaciones por pedido")
+        try:
+            registros = [registro_desde_fila(f) for f in filas]
+        except (TypeError, ValueError, AttributeError) as exc:
+            raise SolicitudInvalida(str(exc)) from exc
+        ids = self.escrituras.guardar(registros)
+        resumenes = [_resumen(r, vid) for r, vid in zip(registros, ids)]
+        if con_pdf:
+            for resumen, pdf in zip(resumenes, self._informes(registros)):
+                resumen["pdf_base64"] = base64.b64encode(pdf).decode("ascii")
+        return resumenes
+
+    def consultar(self, vid: int) -> dict:
+        registro = self.almacen.cargar(vid)
+        return {**_resumen(registro, vid), "fecha": registro["fecha"], "status": registro["status"],
+                "note": registro["note"]}
+
+    def informe(self, vid: int) -> bytes:
+        return self._informes([self.almacen.cargar(vid)])[0]
+
+    def cerrar(self) -> None:
+        self.escrituras.cerrar()
+        self._pool.shutdown(cancel_futures=True)
+
+
+# -----------------------------------------------------------
+# HTTP
+# -----------------------------------------------------------
+_RUTA_ID = re.compile(r"^/verificaciones/(\d+)(/pdf)?/?$")
+_FILTROS = ("producto", "proveedor", "responsable", "item", "estado", "desde", "hasta")
+
+
+def _limite(params: dict, por_defecto: int = 100) -> int:
+    try:
+        limite = int(params.get("limite", por_defecto))
+    except ValueError:
+        raise SolicitudInvalida(f"limite debe ser un entero: {params['limite']!r}") from None
+    if limite < 1:
+        raise SolicitudInvalida("limite debe ser mayor que cero")
+    return limite
+
+
+class Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"          # conexiones persistentes
+    server_version = "VerificadorEtiquetado/1.0"
+    disable_nagle_algorithm = True         # cabeceras y cuerpo van en escrituras separadas
+
+    @property
+    def servicio(self) -> ServicioVerificaciones:
+        return self.server.servicio
+
+    def log_message(self, formato, *args):
+        if self.server.registrar_pedidos:
+            super().log_message(formato, *args)
+
+    def _enviar(self, estado: int, cuerpo: bytes, tipo: str) -> None:
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _json(self, estado: int, datos) -> None:
+        self._enviar(estado, json.dumps(datos, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    def _error(self, estado: HTTPStatus, mensaje: str) -> None:
+        self._json(estado, {"error": mensaje})
+
+    def _atender(self, metodo) -> None:
+        try:
+            metodo()
+        except SolicitudInvalida as exc:
+            self._error(HTTPStatus.BAD_REQUEST, str(exc))
+        except KeyError as exc:
+            self._error(HTTPStatus.NOT_FOUND, str(exc.args[0]) if exc.args else "No encontrado")
+        except Exception as exc:  # se responde 500 en lugar de cortar la conexión
+            self.log_error("Error atendiendo %s: %r", self.path, exc)
+            self._error(HTTPStatus.INTERNAL_SERVER_ERROR, "Error interno")
+
+    def do_GET(self):
+        self._atender(self._get)
+
+    def do_POST(self):
+        self._atender(self._post)
+
+    def _get(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/salud":
+            catalogo = catalogo_vigente()
+            self._json(HTTPStatus.OK, {"estado": "ok", "reglas_version": catalogo.version, "items": len(catalogo.items)})
+        elif url.path == "/metricas":
+            self._enviar(HTTPStatus.OK, METRICAS.texto_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        elif url.path == "/catalogo":
+            catalogo = catalogo_vigente()
+            self._json(HTTPStatus.OK, {
+                "version": catalogo.version, "normas": list(catalogo.normas),
+                "items": [{"titulo": i.titulo, "categoria": i.categoria, "aplica": i.aplica, "referencia": i.referencia}
+                          for i in catalogo.items],
+            })
+        elif url.path.rstrip("/") == "/verificaciones":
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            filtros = {k: params[k] for k in _FILTROS if k in params}
+            self._json(HTTPStatus.OK, self.servicio.almacen.buscar(**filtros, limite=_limite(params)))
+        elif (m := _RUTA_ID.match(url.path)):
+            vid = int(m.group(1))
+            if m.group(2):
+                self._enviar(HTTPStatus.OK, self.servicio.informe(vid), "application/pdf")
+            else:
+                self._json(HTTPStatus.OK, self.servicio.consultar(vid))
+        else:
+            self._error(HTTPStatus.NOT_FOUND, f"Ruta desconocida: {url.path}")
+
+    def _post(self) -> None:
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/verificaciones":
+            self._error(HTTPStatus.NOT_FOUND, f"Ruta desconocida: {url.path}")
+            return
+        try:
+            largo = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            largo = -1
+        if largo < 0:
+            # Sin un largo válido no se sabe dónde termina el cuerpo: se cierra la conexión
+            self.close_connection = True
+            raise SolicitudInvalida("Content-Length debe ser un entero no negativo")
+        if largo > MAX_CUERPO:
+            self.close_connection = True
+            self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"El cuerpo supera {MAX_CUERPO} bytes")
+            return
+        try:
+            cuerpo = json.loads(self.rfile.read(largo) or b"null")
+        except ValueError as exc:
+            raise SolicitudInvalida(f"JSON inválido: {exc}") from exc
+        con_pdf = parse_qs(url.query).get("pdf", ["0"])[-1] in ("1", "true", "si", "sí")
+        self._json(HTTPStatus.CREATED, self.servicio.registrar(cuerpo, con_pdf))
+
+
+def crear_servidor(servicio: ServicioVerificaciones, host: str = "127.0.0.1", puerto: int = 8502,
+                   registrar_pedidos: bool = True) -> ThreadingHTTPServer:
+    servidor = ThreadingHTTPServer((host, puerto), Manejador)
+    servidor.daemon_threads = True
+    servidor.servicio = servicio
+    servidor.registrar_pedidos = registrar_pedidos
+    return servidor
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de verificaciones de etiquetado")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8502)
+    parser.add_argument("-j", "--procesos", type=int, default=None, help="Procesos para PDF (por defecto: todos los núcleos)")
+    parser.add_argument("--db", default=RUTA_DB, help="Base de verificaciones")
+    parser.add_argument("--silencioso", action="store_true", help="No registrar cada pedido en la salida de error")
+    args = parser.parse_args(argv)
+
+    servicio = ServicioVerificaciones(Almacen(args.db), args.procesos)
+    servidor = crear_servidor(servicio, args.host, args.puerto, not args.silencioso)
+    print(f"Escuchando en http://{args.host}:{args.puerto}", file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servicio.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
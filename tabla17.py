@@ -0,0 +1,100 @@
+"""Tabla 17 (Res. 810 mod. 2492): tamaño mínimo del sello según el área principal del envase.
+
+La tabla se guarda como límites inferiores ordenados; la búsqueda es una
+bisección (`bisect` para un valor, `numpy.searchsorted` para un catálogo).
+
+    < 30 cm²    → se rotula el envase secundario (o QR / página web)
+    ≥ 300 cm²   → el sello ocupa el 15 % de la cara principal:
+                  lado = √(0,15 × área), redondeado hacia arriba a 0,1 cm
+
+Uso por lotes:
+    python tabla17.py envases.csv -o sellos.csv     (columna "area_cm2")
+"""
+import argparse
+import bisect
+import math
+import sys
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+AREA_MINIMA = 30.0
+AREA_PROPORCIONAL = 300.0
+PROPORCION = 0.15
+
+# Límite inferior del intervalo (cm²) → lado mínimo del sello (cm)
+LIMITES = (30.0, 35.0, 40.0, 50.0, 60.0, 80.0, 100.0, 125.0, 150.0, 200.0, 250.0)
+LADOS = (1.7, 1.8, 2.0, 2.2, 2.5, 2.8, 3.1, 3.4, 3.9, 4.4, 4.8)
+_LIMITES_SUPERIORES = LIMITES[1:] + (AREA_PROPORCIONAL,)
+
+REGLA_SECUNDARIO = "Se rotula envase secundario y si no cuenta con el se incluye QR o página web para consultar"
+
+
+def _formato(valor: float) -> str:
+    return f"{valor:g}".replace(".", ",")
+
+
+def _formato_lado(lado: float) -> str:
+    return f"{lado:.1f}".replace(".", ",")
+
+
+def lado_minimo_sello(area_cm2: float) -> dict:
+    """Lado mínimo del sello (cm) para un área principal; `lado_cm` es None si es < 30 cm²."""
+    area = float(area_cm2)
+    if area < AREA_MINIMA:
+        return {"area_cm2": area, "lado_cm": None, "intervalo": "< 30 cm²", "regla": REGLA_SECUNDARIO}
+    if area >= AREA_PROPORCIONAL:
+        lado = math.ceil(math.sqrt(PROPORCION * area) * 10 - 1e-9) / 10
+        return {"area_cm2": area, "lado_cm": lado, "intervalo": "≥ 300 cm²",
+                "regla": f"15% de la cara principal: {_formato_lado(lado)} cm de lado"}
+    i = bisect.bisect_right(LIMITES, area) - 1
+    return {
+        "area_cm2": area,
+        "lado_cm": LADOS[i],
+        "intervalo": f"≥{_formato(LIMITES[i])} a < {_formato(_LIMITES_SUPERIORES[i])} cm²",
+        "regla": f"{_formato_lado(LADOS[i])} cm de lado",
+    }
+
+
+def lados_minimos(areas) -> np.ndarray:
+    """Versión vectorizada: lado mínimo (cm) por área; NaN para áreas < 30 cm² o ausentes."""
+    areas = np.asarray(areas, dtype=float)
+    i = np.searchsorted(LIMITES, areas, side="right") - 1
+    lados = np.asarray(LADOS)[np.clip(i, 0, len(LADOS) - 1)]
+    proporcional = np.ceil(np.sqrt(PROPORCION * np.maximum(areas, 0)) * 10 - 1e-9) / 10
+    lados = np.where(areas >= AREA_PROPORCIONAL, proporcional, lados)
+    return np.where(np.isnan(areas) | (areas < AREA_MINIMA), np.nan, lados)
+
+
+def dimensionar_catalogo(df: "pd.DataFrame", columna: str = "area_cm2") -> "pd.DataFrame":
+    """Agrega `lado_sello_cm` y `envase_secundario` a un catálogo de envases.
+
+    Las áreas vacías o no numéricas quedan sin lado y con `envase_secundario` nulo.
+    """
+    import pandas as pd
+    datos = df.copy()
+    areas = pd.to_numeric(datos[columna], errors="coerce").to_numpy(dtype=float)
+    datos["lado_sello_cm"] = lados_minimos(areas)
+    datos["envase_secundario"] = pd.array(areas < AREA_MINIMA, dtype="boolean")
+    datos.loc[np.isnan(areas), "envase_secundario"] = pd.NA
+    return datos
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tamaño mínimo del sello (Tabla 17) para un catálogo de envases")
+    parser.add_argument("entrada", help="CSV con la columna de área principal en cm²")
+    parser.add_argument("-c", "--columna", default="area_cm2")
+    parser.add_argument("-o", "--salida", default="-", help="CSV de salida (por defecto: salida estándar)")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    resultado = dimensionar_catalogo(pd.read_csv(args.entrada), args.columna)
+    resultado.to_csv(sys.stdout if args.salida == "-" else args.salida, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
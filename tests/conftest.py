@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+
+@pytest.fixture
+def carpeta(tmp_path, monkeypatch):
+    """Directorio de trabajo temporal: la app crea la base, los borradores y las evidencias en el actual."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
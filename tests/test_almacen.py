@@ -0,0 +1,103 @@
+import sqlite3
+
+import pytest
+
+from almacen import Almacen
+from catalogo import catalogo_vigente, titulos
+
+
+def _registro(proveedor="Proveedor A", fecha="2026-09-10 10:00:00", **estados):
+    status = {t: "none" for t in titulos()}
+    status.update(estados)
+    return {"producto": "Galletas", "proveedor": proveedor, "responsable": "Ana", "fecha": fecha,
+            "status": status, "note": {"Lote": "sin lote"}, "fotos": {"Lote": ["ab", "cd"]}}
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    almacen = Almacen(str(tmp_path / "verificaciones.db"))
+    yield almacen
+    almacen.cerrar()
+
+
+def test_guardar_y_cargar(almacen):
+    vid = almacen.guardar(_registro(Lote="no", Idioma="yes"))
+    registro = almacen.cargar(vid)
+    assert registro["status"]["Lote"] == "no" and registro["status"]["Idioma"] == "yes"
+    assert registro["note"]["Lote"] == "sin lote"
+    assert registro["fotos"] == {"Lote": ["ab", "cd"]}
+    assert registro["porcentaje"] == 50.0
+    with pytest.raises(KeyError):
+        almacen.cargar(vid + 1)
+
+
+def test_buscar_por_resultado_de_un_item(almacen):
+    a, b = almacen.guardar_varios([_registro(Lote="no"), _registro("Proveedor B", Lote="yes")])
+    assert [v["id"] for v in almacen.buscar(item="Lote", estado="no")] == [a]
+    assert [v["id"] for v in almacen.buscar(proveedor="Proveedor B")] == [b]
+    assert len(almacen.buscar(limite=1)) == 1
+
+
+def test_agregados_se_suman_entre_transacciones(almacen):
+    almacen.guardar(_registro(Lote="no", Idioma="yes"))                       # 50 %
+    almacen.guardar_varios([_registro(Lote="yes", Idioma="yes"),             # 100 %
+                            _registro(fecha="2026-10-01 09:00:00", Lote="na")])
+    tendencia = {(f["proveedor"], f["mes"]): f for f in almacen.tendencia_proveedores()}
+    septiembre = tendencia[("Proveedor A", "2026-09")]
+    assert (septiembre["verificaciones"], septiembre["promedio"], septiembre["con_no_cumple"]) == (2, 75.0, 1)
+    assert tendencia[("Proveedor A", "2026-10")]["verificaciones"] == 1
+
+    [lote] = almacen.items_incumplidos()
+    assert (lote["item"], lote["no_cumple"], lote["cumple"], lote["no_aplica"], lote["tasa"]) == ("Lote", 1, 1, 1, 50.0)
+    assert almacen.items_incumplidos(desde="2026-10", hasta="2026-10") == []
+    assert almacen.meses() == ["2026-09", "2026-10"]
+
+
+def test_agregados_incrementales_coinciden_con_la_reconstruccion(almacen):
+    almacen.guardar_varios([_registro(Lote="no"), _registro("Proveedor B", Lote="yes", Idioma="no")])
+    almacen.guardar(_registro(Idioma="na"))
+    antes = (almacen.tendencia_proveedores(), almacen.items_incumplidos())
+    almacen.reconstruir_agregados()
+    assert (almacen.tendencia_proveedores(), almacen.items_incumplidos()) == antes
+
+
+def test_migra_bases_anteriores_y_calcula_sus_agregados(tmp_path):
+    ruta = str(tmp_path / "vieja.db")
+    con = sqlite3.connect(ruta)
+    con.executescript("""
+        CREATE TABLE verificaciones (id INTEGER PRIMARY KEY, producto TEXT NOT NULL, proveedor TEXT NOT NULL,
+            responsable TEXT NOT NULL, nombre_pdf TEXT NOT NULL DEFAULT '', fecha TEXT NOT NULL, porcentaje REAL NOT NULL);
+        CREATE TABLE resultados (verificacion_id INTEGER NOT NULL, item TEXT NOT NULL, estado TEXT NOT NULL,
+            observacion TEXT NOT NULL DEFAULT '', PRIMARY KEY (verificacion_id, item)) WITHOUT ROWID;
+        INSERT INTO verificaciones VALUES (1, 'Galletas', 'Proveedor A', 'Ana', '', '2026-08-05 10:00:00', 0.0);
+        INSERT INTO resultados VALUES (1, 'Lote', 'no', '');
+    """)
+    con.commit()
+    con.close()
+
+    almacen = Almacen(ruta)
+    try:
+        registro = almacen.cargar(1)
+        assert registro["area_cm2"] is None and registro["tipo_producto"] is None
+        assert almacen.items_incumplidos()[0]["item"] == "Lote"
+        assert almacen.tendencia_proveedores()[0]["verificaciones"] == 1
+    finally:
+        almacen.cerrar()
+
+
+def test_con_tipo_de_producto_solo_cuentan_los_items_que_le_aplican(almacen):
+    registro = _registro(Lote="yes")
+    registro["tipo_producto"] = "Materia prima"
+    registro["status"]["Tabla nutricional presente"] = "no"         # no aplica a materias primas
+    almacen.guardar(registro)
+    aplicables = {i.titulo for i in catalogo_vigente().aplicables("Materia prima")}
+    assert almacen.items_incumplidos() == []
+    assert almacen.tendencia_proveedores()[0]["con_no_cumple"] == 0
+    with almacen._lock:
+        contados = {r[0] for r in almacen._con.execute("SELECT item FROM agregado_item")}
+    assert contados == aplicables
+    antes = almacen.tendencia_proveedores()
+    almacen.reconstruir_agregados()
+    assert almacen.tendencia_proveedores() == antes
+    with almacen._lock:
+        assert {r[0] for r in almacen._con.execute("SELECT item FROM agregado_item")} == aplicables
@@ -0,0 +1,79 @@
+"""Presupuesto de arranque en frío: tiempo de importación y primer pintado de la app.
+
+Cada medición corre en un proceso nuevo (nada queda en caché de imports) y en un
+directorio temporal, para no tocar la base ni los borradores reales. Además
+verifica que pandas y reportlab NO se carguen hasta que se pide el primer PDF.
+Los presupuestos se pueden ajustar por variables de entorno (máquinas de CI lentas):
+
+    PRESUPUESTO_IMPORTACION=0.5 PRESUPUESTO_PRIMER_PINTADO=3 python -m pytest tests/test_arranque.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import RAIZ
+
+PESADOS = ("pandas", "reportlab")
+PRESUPUESTO_IMPORTACION = float(os.environ.get("PRESUPUESTO_IMPORTACION", 0.5))
+PRESUPUESTO_PRIMER_PINTADO = float(os.environ.get("PRESUPUESTO_PRIMER_PINTADO", 3.0))
+
+# Los mismos módulos que App.py importa al cargarse
+_MEDIR_IMPORTACION = """
+import json, sys, time
+inicio = time.perf_counter()
+import almacen, borradores, catalogo, evidencias, metricas, nutrientes, rotulos, tabla17, trabajos
+print(json.dumps({"segundos": time.perf_counter() - inicio,
+                  "cargados": [m for m in %r if m in sys.modules]}))
+"""
+
+_MEDIR_PRIMER_PINTADO = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(%r, default_timeout=120)
+inicio = time.perf_counter()
+app.run()
+segundos = time.perf_counter() - inicio
+print(json.dumps({"segundos": segundos, "error": [str(e.value) for e in app.exception],
+                  "cargados": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def _medir(codigo: str, carpeta) -> dict:
+    entorno = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [RAIZ, os.environ.get("PYTHONPATH")]))}
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=carpeta, env=entorno,
+                            capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def importacion(tmp_path_factory):
+    return _medir(_MEDIR_IMPORTACION % (PESADOS,), tmp_path_factory.mktemp("importacion"))
+
+
+@pytest.fixture(scope="module")
+def primer_pintado(tmp_path_factory):
+    return _medir(_MEDIR_PRIMER_PINTADO % (os.path.join(RAIZ, "App.py"), PESADOS),
+                  tmp_path_factory.mktemp("primer_pintado"))
+
+
+def test_importacion_dentro_del_presupuesto(importacion):
+    assert importacion["segundos"] <= PRESUPUESTO_IMPORTACION
+
+
+def test_importacion_no_carga_pandas_ni_reportlab(importacion):
+    assert importacion["cargados"] == []
+
+
+def test_primer_pintado_sin_errores(primer_pintado):
+    assert primer_pintado["error"] == []
+
+
+def test_primer_pintado_dentro_del_presupuesto(primer_pintado):
+    assert primer_pintado["segundos"] <= PRESUPUESTO_PRIMER_PINTADO
+
+
+def test_primer_pintado_no_carga_pandas_ni_reportlab(primer_pintado):
+    assert primer_pintado["cargados"] == []
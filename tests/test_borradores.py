@@ -0,0 +1,67 @@
+import json
+
+from borradores import Borradores
+
+
+def _borrador(producto="Galletas", lote="yes"):
+    return {"producto": producto, "status": {"Lote": lote}, "note": {}}
+
+
+def test_retomar_tras_reiniciar(carpeta):
+    borradores = Borradores(intervalo=0)
+    assert borradores.guardar(_borrador())
+    assert borradores.guardar(_borrador(lote="no"))
+    assert borradores.guardar(_borrador("Jugo"))
+    reiniciado = Borradores(intervalo=0)
+    assert reiniciado.productos() == ["Galletas", "Jugo"]
+    assert reiniciado.retomar("  galletas ")["status"] == {"Lote": "no"}
+
+
+def test_sin_cambios_no_se_escribe(carpeta):
+    borradores = Borradores(intervalo=0)
+    assert borradores.guardar(_borrador())
+    assert not borradores.guardar(_borrador())
+
+
+def test_escrituras_agrupadas_dentro_del_intervalo(carpeta):
+    borradores = Borradores(intervalo=60)
+    assert borradores.guardar(_borrador())
+    assert not borradores.guardar(_borrador(lote="no"))        # queda pendiente
+    assert borradores.retomar("Galletas")["status"] == {"Lote": "no"}
+    borradores.vaciar_todo()
+    assert Borradores().retomar("Galletas")["status"] == {"Lote": "no"}
+
+
+def test_linea_cortada_por_una_caida_no_se_pierde_el_siguiente(carpeta):
+    borradores = Borradores(intervalo=0)
+    borradores.guardar(_borrador("A"))
+    borradores.guardar(_borrador("B"))
+    with open(borradores.ruta, "ab") as f:
+        f.write(b'{"producto": "C", "stat')                    # caída a mitad de la escritura
+    reiniciado = Borradores(intervalo=0)
+    reiniciado.guardar(_borrador("D"))
+    assert Borradores().productos() == ["A", "B", "D"]
+    with open(borradores.ruta, "rb") as f:
+        assert all(json.loads(linea)["producto"] != "C" for linea in f)
+
+
+def test_descartar_al_guardar_la_verificacion(carpeta):
+    borradores = Borradores(intervalo=0)
+    borradores.guardar(_borrador())
+    borradores.descartar("Galletas", guardado=_borrador())
+    assert borradores.retomar("Galletas") is None
+    assert not borradores.guardar(_borrador())                 # el autoguardado no lo recrea
+    assert borradores.guardar(_borrador(lote="no"))            # un cambio posterior sí
+    assert Borradores().productos() == ["Galletas"]
+
+
+def test_compactar_deja_un_borrador_por_producto(carpeta):
+    borradores = Borradores(intervalo=0)
+    for lote in ("yes", "no", "na"):
+        borradores.guardar(_borrador(lote=lote))
+    borradores.guardar(_borrador("Jugo"))
+    borradores.descartar("Jugo")
+    borradores.compactar()
+    with open(borradores.ruta, "rb") as f:
+        assert len(f.readlines()) == 1
+    assert Borradores().retomar("Galletas")["status"] == {"Lote": "na"}
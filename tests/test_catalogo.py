@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from catalogo import (PaqueteInvalido, PaqueteRecargable, TIPOS_PRODUCTO, catalogo_vigente, compilar_paquete,
+                      normalizar_estado, resumen_estados)
+
+
+def _paquete(*titulos, version="1"):
+    return {"version": version, "categorias": [{"nombre": "General", "items": [
+        {"titulo": t, "que_verificar": "q", "recomendacion": "r", "referencia": "Res. 810", "aplica": "Ambos"}
+        for t in titulos]}]}
+
+
+@pytest.mark.parametrize("valor, clave", [
+    ("Cumple", "yes"), (" no cumple ", "no"), ("No aplica", "na"), ("", "none"), (None, "none"), ("nan", "none"),
+    ("yes", "yes"),
+])
+def test_normalizar_estado(valor, clave):
+    assert normalizar_estado(valor) == clave
+
+
+def test_normalizar_estado_desconocido():
+    with pytest.raises(ValueError):
+        normalizar_estado("quizás")
+
+
+@pytest.mark.parametrize("paquete", [
+    [],
+    {"categorias": []},
+    {"version": "1", "categorias": []},
+    _paquete("A", "A"),
+    {"version": "1", "categorias": [{"nombre": "G", "items": [{"titulo": "A"}]}]},
+])
+def test_paquetes_invalidos(paquete):
+    with pytest.raises(PaqueteInvalido):
+        compilar_paquete(paquete)
+
+
+def test_aplicables_por_tipo():
+    catalogo = catalogo_vigente()
+    terminado = {i.titulo for i in catalogo.aplicables(TIPOS_PRODUCTO[0])}
+    materia_prima = {i.titulo for i in catalogo.aplicables(TIPOS_PRODUCTO[1])}
+    assert "Tabla nutricional presente" in terminado - materia_prima
+    assert "Materias primas industriales" in materia_prima - terminado
+    assert len(catalogo.aplicables(None)) == len(catalogo.items)
+    with pytest.raises(ValueError):
+        catalogo.aplicables("Bebida")
+
+
+def test_buscar_por_prefijo_sin_tildes():
+    catalogo = catalogo_vigente()
+    encontrados = {catalogo.items[i].titulo for i in catalogo.buscar("venc")}
+    assert "Fecha de vencimiento o duración mínima" in encontrados
+    assert catalogo.buscar("pais origen") == catalogo.buscar("PAÍS orig")
+    assert catalogo.buscar("") is None
+    assert not catalogo.buscar("zzzz")
+
+
+def test_resumen_estados_solo_cuenta_los_aplicables():
+    catalogo = catalogo_vigente()
+    status = catalogo.estado_inicial()
+    status.update({"Lote": "yes", "Idioma": "no", "Materias primas industriales": "yes"})
+    assert resumen_estados(status)["percent"] == pytest.approx(66.7)
+    resumen = resumen_estados(status, TIPOS_PRODUCTO[0])
+    assert (resumen["yes"], resumen["no"], resumen["percent"]) == (1, 1, 50.0)
+    assert resumen["none"] == len(catalogo.aplicables(TIPOS_PRODUCTO[0])) - 2
+
+
+def test_recarga_solo_si_cambia_y_conserva_el_ultimo_valido(tmp_path):
+    ruta = tmp_path / "reglas.json"
+    ruta.write_text(json.dumps(_paquete("A")), encoding="utf-8")
+    reglas = PaqueteRecargable(str(ruta))
+    primero = reglas.vigente()
+    assert reglas.vigente() is primero
+
+    ruta.write_text(json.dumps(_paquete("A", "B", version="2")), encoding="utf-8")
+    assert reglas.vigente().titulos == ("A", "B")
+
+    ruta.write_text("{roto", encoding="utf-8")
+    assert reglas.vigente().version == "2"
+    assert "JSON inválido" in reglas.error
@@ -0,0 +1,34 @@
+from catalogo import catalogo_vigente
+from comparacion import comparar, resumen_cambios
+
+
+def _registro(status, note=None):
+    return {"status": {**catalogo_vigente().estado_inicial(), **status}, "note": note or {}}
+
+
+def test_solo_devuelve_los_items_que_cambiaron():
+    antes = _registro({"Lote": "no", "Idioma": "none", "Legibilidad": "yes", "Marca comercial": "yes"},
+                      {"Marca comercial": "ok"})
+    despues = _registro({"Lote": "yes", "Idioma": "yes", "Legibilidad": "no", "Marca comercial": "yes"},
+                        {"Marca comercial": "ok, revisado"})
+    cambios = {c.item: c for c in comparar(antes, despues)}
+    assert set(cambios) == {"Lote", "Idioma", "Legibilidad", "Marca comercial"}
+    assert cambios["Lote"].sentido == "mejora"
+    assert cambios["Idioma"].sentido == "mejora"
+    assert cambios["Legibilidad"].sentido == "empeora"
+    assert cambios["Marca comercial"].sentido == "nota"
+    assert resumen_cambios(list(cambios.values())) == {"mejora": 2, "empeora": 1, "cambia": 0, "nota": 1, "total": 4}
+
+
+def test_orden_del_catalogo_e_items_de_versiones_anteriores_al_final():
+    antes = _registro({"Registro sanitario": "yes", "Nombre del alimento": "yes"})
+    antes["status"]["Ítem retirado"] = "no"
+    despues = _registro({"Registro sanitario": "na", "Nombre del alimento": "no"})
+    cambios = comparar(antes, despues)
+    assert [c.item for c in cambios] == ["Nombre del alimento", "Registro sanitario", "Ítem retirado"]
+    assert cambios[1].sentido == "cambia"
+    assert cambios[-1].categoria == "Ítems de versiones anteriores de las reglas"
+
+
+def test_espacios_en_la_observacion_no_cuentan_como_cambio():
+    assert comparar(_registro({}, {"Lote": "L1 "}), _registro({}, {"Lote": " L1"})) == []
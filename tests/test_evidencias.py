@@ -0,0 +1,64 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from evidencias import LADOS_PDF, AlmacenFotos, FotoInvalida
+
+
+def _png(ancho=1600, alto=1200, color="red") -> bytes:
+    salida = BytesIO()
+    Image.new("RGB", (ancho, alto), color).save(salida, "PNG")
+    return salida.getvalue()
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return AlmacenFotos(str(tmp_path / "evidencias"))
+
+
+def test_guardar_deduplica_por_contenido(almacen):
+    datos = _png()
+    huella = almacen.guardar(datos)
+    assert almacen.guardar(datos) == huella
+    assert almacen.existe(huella)
+    assert almacen.ruta_original(huella).read_bytes() == datos
+
+
+def test_rechaza_bytes_que_no_son_imagen(almacen):
+    with pytest.raises(FotoInvalida):
+        almacen.guardar(b"no soy una foto")
+
+
+def test_miniatura_reducida_y_reutilizada(almacen):
+    huella = almacen.guardar(_png())
+    ruta = almacen.miniatura(huella, 160)
+    with Image.open(ruta) as imagen:
+        assert imagen.format == "JPEG" and max(imagen.size) == 160
+    modificada = ruta.stat().st_mtime_ns
+    assert almacen.miniatura(huella, 160).stat().st_mtime_ns == modificada
+
+
+def test_versiones_para_pdf_respetan_el_presupuesto(almacen):
+    a, b = almacen.guardar(_png(color="red")), almacen.guardar(_png(color="blue"))
+    grande = almacen.miniatura(a, LADOS_PDF[0]).stat().st_size
+    chica = almacen.miniatura(a, LADOS_PDF[-1]).stat().st_size
+    rutas = almacen.versiones_para_pdf([a, b, a, "desconocida"], presupuesto_bytes=10 * grande)
+    assert rutas[0] == rutas[2] and rutas[3] is None
+    assert rutas[0].parent.name == str(LADOS_PDF[0])
+    assert almacen.versiones_para_pdf([a], presupuesto_bytes=chica - 1) == [None]
+
+
+def test_rechaza_imagenes_con_demasiados_pixeles(tmp_path):
+    almacen = AlmacenFotos(str(tmp_path / "evidencias"), max_pixeles=100 * 100)
+    with pytest.raises(FotoInvalida, match="demasiado grande"):
+        almacen.guardar(_png(101, 100))
+    almacen.guardar(_png(100, 100))
+
+
+def test_bomba_de_descompresion_es_foto_invalida(almacen, monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)        # Pillow la rechaza por encima del doble
+    almacen.max_pixeles = 10 ** 9
+    with pytest.raises(FotoInvalida):
+        almacen.guardar(_png(100, 100))
+    assert not list(almacen.carpeta.rglob("*"))
@@ -0,0 +1,83 @@
+import re
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from catalogo import catalogo_vigente
+from evidencias import AlmacenFotos
+from informe import CachePDF, construir_df, generar_pdf, generar_pdf_consolidado, recortar_observacion, texto_parrafo
+
+
+def _df(nota=""):
+    catalogo = catalogo_vigente()
+    return construir_df({t: "yes" for t in catalogo.titulos}, {t: nota for t in catalogo.titulos})
+
+
+def test_texto_parrafo_escapa_el_marcado():
+    assert texto_parrafo("a < b & c\nd") == "a &lt; b &amp; c<br/>d"
+
+
+def test_recortar_observacion_larga():
+    assert recortar_observacion("palabra " * 20, limite=40) == (" ".join(["palabra"] * 5), True)
+    assert recortar_observacion("x" * 100, limite=40) == ("x" * 40, True)
+    assert recortar_observacion("  corta ") == ("corta", False)
+
+
+def test_generar_pdf_con_notas_largas():
+    datos = generar_pdf(_df("Observación. " * 5000), "P", "Prov", "Resp", 100.0, "informe", 45.0).getvalue()
+    assert datos.startswith(b"%PDF")
+
+
+def test_titulos_con_marcado_en_la_evidencia_fotografica(tmp_path):
+    almacen = AlmacenFotos(str(tmp_path / "evidencias"))
+    imagen = BytesIO()
+    Image.new("RGB", (50, 50), "red").save(imagen, "PNG")
+    huella = almacen.guardar(imagen.getvalue())
+    datos = generar_pdf(_df(), "P", "", "", 100.0, "n", fotos={"Ítem <b & c>": [huella]}, almacen_fotos=almacen)
+    assert datos.getvalue().startswith(b"%PDF")
+
+
+def test_cache_lru_acotada():
+    cache = CachePDF(max_entradas=2)
+    df = _df()
+    claves = [cache.clave(df, p, "", "", 0.0) for p in "ABC"]
+    assert len(set(claves)) == 3 and cache.clave(df, "A", "", "", 0.0) == claves[0]
+    for clave in claves:
+        cache.guardar(clave, clave.encode())
+    assert cache.obtener(claves[0]) is None
+    assert cache.obtener(claves[2]) == claves[2].encode()
+    assert cache.estadisticas()["entradas"] == 2
+
+
+def test_pdf_consolidado_con_tabla_de_contenido(tmp_path):
+    catalogo = catalogo_vigente()
+    registros = [
+        {"producto": "Galletas", "proveedor": "Proveedor A", "responsable": "Ana",
+         "status": {**catalogo.estado_inicial(), "Lote": "no"}, "note": {}},
+        {"producto": "Jugo <natural>", "proveedor": "Proveedor B", "responsable": "Luis",
+         "status": {**catalogo.estado_inicial(), "Lote": "yes"}, "note": {}},
+    ]
+    llamadas = []
+
+    def fabrica():
+        llamadas.append(1)
+        return iter(registros)
+
+    ruta = tmp_path / "consolidado.pdf"
+    assert generar_pdf_consolidado(fabrica, str(ruta)) == 2
+    assert len(llamadas) >= 3                      # resumen + al menos dos pasadas de maquetación
+    datos = ruta.read_bytes()
+    assert datos.startswith(b"%PDF")
+    # Un marcador por sección (el título del marcador queda como texto plano en el PDF)
+    assert re.findall(rb"/Title \((\d\. [^\\]+)", datos) == [b"1. Galletas ", b"2. Jugo <natural> "]
+    assert b"/Count 2" in datos
+
+
+def test_generar_pdf_no_cambia_la_configuracion_global_de_reportlab():
+    from reportlab import rl_config
+
+    antes = rl_config.useA85
+    datos = generar_pdf(_df(), "P", "", "", 100.0, "n").getvalue()
+    assert rl_config.useA85 == antes
+    assert b"/ASCII85Decode" not in datos
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from catalogo import titulos
+from lote import PREFIJO_OBS, cargar_registros, registro_desde_fila
+
+
+def test_registro_completa_todos_los_items():
+    registro = registro_desde_fila({"producto": "Galletas"})
+    assert registro["producto"] == "Galletas"
+    assert set(registro["status"]) == set(titulos())
+    assert set(registro["status"].values()) == {"none"}
+    assert registro["area_cm2"] is None and registro["tipo_producto"] is None
+
+
+def test_registro_acepta_estados_humanos_y_observaciones():
+    registro = registro_desde_fila({
+        "Lote": "Cumple", "Contenido neto": "no cumple", "Idioma": "No aplica",
+        PREFIJO_OBS + "Contenido neto": "En onzas",
+    })
+    assert (registro["status"]["Lote"], registro["status"]["Contenido neto"], registro["status"]["Idioma"]) == \
+        ("yes", "no", "na")
+    assert registro["note"]["Contenido neto"] == "En onzas"
+
+
+def test_registro_acepta_diccionarios_de_sesion():
+    registro = registro_desde_fila({"status": {"Lote": "yes"}, "note": {"Lote": "L123"}, "area_cm2": "45.5"})
+    assert registro["status"]["Lote"] == "yes" and registro["note"]["Lote"] == "L123"
+    assert registro["area_cm2"] == 45.5
+
+
+@pytest.mark.parametrize("fila", [
+    {"status": {"Ítem inventado": "yes"}},
+    {"Lote": "tal vez"},
+    {"tipo_producto": "Bebida"},
+    {"fotos": {"Lote": "abc"}},
+    {"fotos": ["abc"]},
+    {"fotos": {"Lote": [1, 2]}},
+    {"area_cm2": "nan"},
+    {"area_cm2": "inf"},
+    {"area_cm2": -5},
+    {"area_cm2": "abc"},
+])
+def test_registro_rechaza_entradas_invalidas(fila):
+    with pytest.raises(ValueError):
+        registro_desde_fila(fila)
+
+
+@pytest.mark.parametrize("valor, area", [(None, None), ("", None), ("  ", None), (0, 0.0), ("120.5", 120.5)])
+def test_area_opcional(valor, area):
+    assert registro_desde_fila({"area_cm2": valor})["area_cm2"] == area
+
+
+def test_registro_descarta_fotos_de_items_desconocidos():
+    registro = registro_desde_fila({"fotos": {"Lote": ["ab"], "Otro": ["cd"]}})
+    assert registro["fotos"] == {"Lote": ["ab"]}
+
+
+def test_cargar_registros_csv_y_json(tmp_path):
+    csv_ruta = tmp_path / "productos.csv"
+    csv_ruta.write_text(f"producto,Lote,{PREFIJO_OBS}Lote\nA,Cumple,ok\nB,,\n", encoding="utf-8")
+    a, b = cargar_registros(csv_ruta)
+    assert (a["producto"], a["status"]["Lote"], a["note"]["Lote"]) == ("A", "yes", "ok")
+    assert b["status"]["Lote"] == "none"
+
+    json_ruta = tmp_path / "productos.json"
+    json_ruta.write_text(json.dumps({"producto": "C", "status": {"Lote": "no"}}), encoding="utf-8")
+    [c] = cargar_registros(json_ruta)
+    assert c["status"]["Lote"] == "no"
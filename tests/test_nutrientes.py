@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from nutrientes import ITEM_EDULCORANTE, ITEM_LIMITES, SELLOS, evaluar_producto, evaluar_sellos, prellenar_checklist
+
+
+@pytest.mark.parametrize("nutrientes, sello, esperado", [
+    ({"energia_kcal": 100, "azucares_libres_g": 2.5}, "sello_azucares", True),       # 10 % de las kcal
+    ({"energia_kcal": 100, "azucares_libres_g": 2.49}, "sello_azucares", False),
+    ({"energia_kcal": 90, "grasas_saturadas_g": 1}, "sello_grasas_saturadas", True),  # 10 %
+    ({"energia_kcal": 90, "grasas_saturadas_g": 0.99}, "sello_grasas_saturadas", False),
+    ({"energia_kcal": 90, "grasas_trans_g": 0.1}, "sello_grasas_trans", True),        # 1 %
+    ({"energia_kcal": 90, "grasas_trans_g": 0.09}, "sello_grasas_trans", False),
+    ({"energia_kcal": 100, "sodio_mg": 100}, "sello_sodio", True),                    # 1 mg/kcal
+    ({"energia_kcal": 100, "sodio_mg": 99}, "sello_sodio", False),
+    ({"energia_kcal": 0, "sodio_mg": 300}, "sello_sodio", True),                      # sólido 300 mg/100 g
+    ({"energia_kcal": 0, "sodio_mg": 299}, "sello_sodio", False),
+    ({"energia_kcal": 0, "sodio_mg": 40, "es_bebida": True}, "sello_sodio", True),    # bebida sin energía
+    ({"energia_kcal": 0, "sodio_mg": 39, "es_bebida": True}, "sello_sodio", False),
+    ({"contiene_edulcorante": "sí"}, "sello_edulcorante", True),
+    ({"contiene_edulcorante": "no"}, "sello_edulcorante", False),
+])
+def test_umbrales(nutrientes, sello, esperado):
+    assert evaluar_producto(**nutrientes)[sello] is esperado
+
+
+def test_motivo_y_sellos():
+    resultado = evaluar_producto(energia_kcal=100, azucares_libres_g=5, sodio_mg=350, contiene_edulcorante=True)
+    assert resultado["sellos"] == [SELLOS["sello_azucares"], SELLOS["sello_sodio"], SELLOS["sello_edulcorante"]]
+    assert resultado["motivo"] == ("azúcares libres 20.0 % kcal ≥ 10 %; sodio 3.50 mg/kcal ≥ 1 mg/kcal; "
+                                   "sodio 350 mg/100 g ≥ 300 mg/100 g; contiene edulcorantes")
+
+
+def test_valores_no_numericos_cuentan_como_cero():
+    assert evaluar_producto(energia_kcal="abc", sodio_mg=float("nan"))["sellos"] == []
+
+
+def test_version_por_lotes_coincide_con_la_de_un_producto():
+    filas = [
+        {"energia_kcal": 100, "azucares_libres_g": 2.5},
+        {"energia_kcal": 0, "sodio_mg": "45", "es_bebida": "si"},
+        {"energia_kcal": 200},
+    ]
+    df = evaluar_sellos(pd.DataFrame(filas))
+    for i, fila in enumerate(filas):
+        uno = evaluar_producto(**fila)
+        assert df.loc[i, "sellos"] == ", ".join(uno["sellos"])
+        assert df.loc[i, "motivo"] == uno["motivo"]
+
+
+def test_prellenar_compara_con_los_sellos_de_la_etiqueta():
+    resultado = evaluar_producto(energia_kcal=100, azucares_libres_g=5)
+    status, note = prellenar_checklist(resultado, [SELLOS["sello_azucares"]])
+    assert status == {ITEM_LIMITES: "yes", ITEM_EDULCORANTE: "na"}
+    status, _ = prellenar_checklist(resultado, [SELLOS["sello_azucares"], SELLOS["sello_edulcorante"]])
+    assert status == {ITEM_LIMITES: "yes", ITEM_EDULCORANTE: "no"}
+    status, note = prellenar_checklist(resultado)
+    assert status == {} and "EXCESO EN AZÚCARES" in note[ITEM_LIMITES]
@@ -0,0 +1,24 @@
+import os
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from almacen import Almacen
+from catalogo import catalogo_vigente
+from conftest import RAIZ
+
+
+def test_tablero_con_proveedor_vacio_y_uno_llamado_sin_proveedor(carpeta):
+    status = catalogo_vigente().estado_inicial()
+    almacen = Almacen()
+    almacen.guardar_varios([
+        {"producto": "A", "proveedor": "", "fecha": "2026-09-01 10:00:00", "status": {**status, "Lote": "yes"}},
+        {"producto": "B", "proveedor": "(sin proveedor)", "fecha": "2026-09-02 10:00:00",
+         "status": {**status, "Lote": "no"}},
+    ])
+    almacen.cerrar()
+    st.cache_resource.clear()
+    app = AppTest.from_file(os.path.join(RAIZ, "pages", "1_Tablero_de_proveedores.py"), default_timeout=60).run()
+    assert not app.exception
+    assert app.metric[0].value == "2"
+    assert app.metric[1].value == "50.0%"
@@ -0,0 +1,71 @@
+import csv
+import io
+
+import pytest
+
+from lote import PREFIJO_OBS, registro_desde_fila
+from rotulos import escribir_prellenado, prellenar_checklist, revisar_rotulo
+
+
+def _estados(texto: str) -> dict:
+    return {item: hallazgo.estado for item, hallazgo in revisar_rotulo(texto).items()}
+
+
+@pytest.mark.parametrize("texto, item, estado", [
+    ("Ingredientes: agua, azúcar, E211", "Aditivos alimentarios", "no"),
+    ("Ingredientes: agua, INS 330", "Aditivos alimentarios", "no"),
+    ("Ingredientes: agua, ácido cítrico, E330", "Aditivos alimentarios", "no"),
+    ("Contenido neto: 500 g", "Contenido neto", "yes"),
+    ("Peso neto 16 oz", "Contenido neto", "no"),
+    ("Fecha de vencimiento: 25/12/2026", "Fecha de vencimiento o duración mínima", "yes"),
+    ("Vence: 12/25/2026", "Fecha de vencimiento o duración mínima", "no"),
+    ("Consumir preferiblemente antes de 5 de marzo de 2027", "Fecha de vencimiento o duración mínima", "yes"),
+    ("Hecho en Colombia", "País de origen", "yes"),
+    ("Producto de Perú", "País de origen", "yes"),
+    ("Lote: L2309A", "Lote", "yes"),
+    ("EXCESO EN AZÚCARES", "Forma y color", "yes"),
+    ("Exceso en sodio", "Forma y color", "no"),
+    ("ALTO EN SODIO", "Forma y color", "no"),
+    ("Registro sanitario RSA-0012345-2026", "Registro sanitario", "yes"),
+])
+def test_reglas(texto, item, estado):
+    assert _estados(texto).get(item) == estado
+
+
+@pytest.mark.parametrize("texto, item", [
+    ("Ingredientes: agua, sorbato de potasio (E202)", "Aditivos alimentarios"),
+    ("Ingredientes: agua, conservante (sorbato de potasio E202), colorante (caramelo INS 150d)", "Aditivos alimentarios"),
+    ("Ingredientes: agua, acidulante (ácido cítrico E330)", "Aditivos alimentarios"),
+    ("Ingredientes: agua, acidulante (ácido cítrico, E330)", "Aditivos alimentarios"),
+    ("Producto de Alta calidad", "País de origen"),
+    ("Lote: ABCDEF", "Lote"),
+])
+def test_sin_evidencia(texto, item):
+    assert item not in _estados(texto)
+
+
+def test_codigo_suelto_dentro_de_una_lista_entre_parentesis():
+    hallazgo = revisar_rotulo("conservantes (E202, sorbato E211, E330)")["Aditivos alimentarios"]
+    assert [e.fragmento for e in hallazgo.evidencias] == ["E330"]
+
+
+def test_evidencia_a_favor_y_en_contra_queda_no_cumple():
+    hallazgo = revisar_rotulo("EXCESO EN SODIO  ·  exceso en azúcares")["Forma y color"]
+    assert hallazgo.estado == "no" and len(hallazgo.evidencias) == 2
+
+
+def test_prellenado_por_lotes_es_entrada_valida_de_lote():
+    salida = io.StringIO()
+    filas = [{"producto": "A", "texto": "Hecho en Colombia. Lote: L123"}, {"producto": "B", "texto": ""}]
+    assert escribir_prellenado(filas, salida) == 2
+    a, b = (registro_desde_fila(f) for f in csv.DictReader(io.StringIO(salida.getvalue())))
+    assert a["status"]["País de origen"] == "yes" and a["status"]["Lote"] == "yes"
+    assert "Hecho en Colombia" in a["note"]["País de origen"]
+    assert set(b["status"].values()) == {"none"}
+    assert PREFIJO_OBS + "Lote" in salida.getvalue().splitlines()[0]
+
+
+def test_prellenar_checklist():
+    status, note = prellenar_checklist(revisar_rotulo("Peso neto 16 oz"))
+    assert status == {"Contenido neto": "no"}
+    assert note["Contenido neto"].startswith("Texto del rótulo: «Peso neto 16 oz»")
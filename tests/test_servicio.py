@@ -0,0 +1,102 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from almacen import Almacen
+from servicio import MAX_CUERPO, MAX_LOTE, ServicioVerificaciones, SolicitudInvalida, crear_servidor
+
+
+@pytest.fixture
+def servicio(tmp_path):
+    servicio = ServicioVerificaciones(Almacen(str(tmp_path / "verificaciones.db")), procesos=1)
+    yield servicio
+    servicio.cerrar()
+
+
+@pytest.fixture
+def pedir(servicio):
+    servidor = crear_servidor(servicio, "127.0.0.1", 0, registrar_pedidos=False)
+    hilo = threading.Thread(target=servidor.serve_forever, args=(0.05,), daemon=True)
+    hilo.start()
+
+    def pedir(metodo, ruta, cuerpo=None, cabeceras=None):
+        con = http.client.HTTPConnection(*servidor.server_address, timeout=10)
+        datos = cuerpo if isinstance(cuerpo, bytes) or cuerpo is None else json.dumps(cuerpo).encode("utf-8")
+        con.request(metodo, ruta, body=datos, headers=cabeceras or {})
+        respuesta = con.getresponse()
+        contenido = respuesta.read()
+        con.close()
+        tipo = respuesta.getheader("Content-Type", "")
+        return respuesta.status, json.loads(contenido) if tipo.startswith("application/json") else contenido
+
+    yield pedir
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_registrar_y_consultar(pedir):
+    estado, cuerpo = pedir("POST", "/verificaciones", [
+        {"producto": "A", "proveedor": "X", "Lote": "Cumple", "Idioma": "No cumple"},
+        {"producto": "B", "proveedor": "Y"},
+    ])
+    assert estado == 201
+    assert [(r["producto"], r["porcentaje"], r["no_cumple"]) for r in cuerpo] == [("A", 50.0, ["Idioma"]), ("B", 0.0, [])]
+
+    estado, detalle = pedir("GET", f"/verificaciones/{cuerpo[0]['id']}")
+    assert estado == 200 and detalle["status"]["Lote"] == "yes"
+    estado, lista = pedir("GET", "/verificaciones?proveedor=Y&limite=5")
+    assert estado == 200 and [v["producto"] for v in lista] == ["B"]
+
+
+@pytest.mark.parametrize("ruta", ["/verificaciones?limite=abc", "/verificaciones?limite=0"])
+def test_limite_invalido_es_400(pedir, ruta):
+    estado, cuerpo = pedir("GET", ruta)
+    assert estado == 400 and "limite" in cuerpo["error"]
+
+
+@pytest.mark.parametrize("cuerpo", [
+    b"{no es json",
+    [],
+    {"Lote": "quizás"},
+    {"fotos": {"Lote": "abc"}},
+    {"area_cm2": "nan"},
+    {"area_cm2": -1},
+    {"status": {"Ítem inventado": "yes"}},
+])
+def test_cuerpos_invalidos_son_400(pedir, cuerpo):
+    assert pedir("POST", "/verificaciones", cuerpo)[0] == 400
+
+
+def test_rutas_y_verificaciones_desconocidas_son_404(pedir):
+    assert pedir("GET", "/nada")[0] == 404
+    assert pedir("GET", "/verificaciones/999")[0] == 404
+    assert pedir("POST", "/otra", {})[0] == 404
+
+
+def test_salud_y_catalogo(pedir):
+    estado, salud = pedir("GET", "/salud")
+    assert estado == 200 and salud["estado"] == "ok"
+    estado, catalogo = pedir("GET", "/catalogo")
+    assert estado == 200 and "Lote" in [i["titulo"] for i in catalogo["items"]]
+
+
+def test_lote_demasiado_grande(servicio):
+    with pytest.raises(SolicitudInvalida):
+        servicio.registrar([{}] * (MAX_LOTE + 1))
+
+
+def test_escrituras_concurrentes_se_agrupan(servicio):
+    hilos = [threading.Thread(target=servicio.registrar, args=({"producto": f"P{n}"},)) for n in range(20)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert len(servicio.almacen.buscar(limite=100)) == 20
+    assert servicio.escrituras.transacciones <= 20
+
+
+@pytest.mark.parametrize("largo, estado", [("abc", 400), ("-5", 400), (str(MAX_CUERPO + 1), 413)])
+def test_content_length_invalido_o_demasiado_grande(pedir, largo, estado):
+    assert pedir("POST", "/verificaciones", b"{}", {"Content-Length": largo})[0] == estado
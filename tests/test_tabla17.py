@@ -0,0 +1,43 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tabla17 import LADOS, LIMITES, dimensionar_catalogo, lado_minimo_sello, lados_minimos
+
+
+@pytest.mark.parametrize("area, lado", [
+    (30, 1.7), (34.99, 1.7), (35, 1.8), (49.99, 2.0), (50, 2.2),
+    (124.99, 3.1), (125, 3.4), (249.99, 4.4), (250, 4.8), (299.99, 4.8),
+])
+def test_bordes_de_los_intervalos(area, lado):
+    assert lado_minimo_sello(area)["lado_cm"] == lado
+
+
+def test_menos_de_30_cm2_va_en_envase_secundario():
+    sello = lado_minimo_sello(29.99)
+    assert sello["lado_cm"] is None and sello["intervalo"] == "< 30 cm²"
+
+
+def test_desde_300_cm2_es_proporcional_redondeado_hacia_arriba():
+    assert lado_minimo_sello(300)["lado_cm"] == 6.8          # √45 = 6,708…
+    assert lado_minimo_sello(600)["lado_cm"] == 9.5          # √90 = 9,486…
+    assert lado_minimo_sello(1000)["lado_cm"] == math.ceil(math.sqrt(150) * 10) / 10
+
+
+def test_version_vectorizada_coincide_con_la_escalar():
+    areas = [10, *LIMITES, *(l - 0.01 for l in LIMITES[1:]), 299.99, 300, 450.5, 1234]
+    esperados = [lado_minimo_sello(a)["lado_cm"] for a in areas]
+    obtenidos = lados_minimos(areas)
+    for esperado, obtenido in zip(esperados, obtenidos):
+        assert (esperado is None and np.isnan(obtenido)) or esperado == pytest.approx(obtenido)
+    assert len(LIMITES) == len(LADOS)
+
+
+def test_areas_ausentes_no_reciben_sello():
+    assert np.isnan(lados_minimos([np.nan])[0])
+    resultado = dimensionar_catalogo(pd.DataFrame({"area_cm2": [10, "", "abc", 50]}))
+    assert resultado["lado_sello_cm"].isna().tolist() == [True, True, True, False]
+    assert resultado["envase_secundario"].tolist()[0] is True
+    assert resultado["envase_secundario"].isna().tolist() == [False, True, True, False]
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+import trabajos
+from trabajos import ColaInformes, ColaLlena
+
+
+class _Cache:
+    def __init__(self, guardados=None):
+        self.guardados = dict(guardados or {})
+
+    def clave(self, df, producto, *args):
+        return producto
+
+    def obtener(self, clave):
+        return self.guardados.get(clave)
+
+    def guardar(self, clave, datos):
+        self.guardados[clave] = datos
+
+
+def _esperar(cola, trabajo_id, limite=5.0):
+    fin = time.monotonic() + limite
+    while cola.estado(trabajo_id)["estado"] in ("en cola", "generando") and time.monotonic() < fin:
+        time.sleep(0.01)
+    return cola.estado(trabajo_id)
+
+
+def test_informe_en_cache_queda_listo_al_instante(monkeypatch):
+    monkeypatch.setattr(trabajos, "_construir", lambda *a: pytest.fail("no debía generarse"))
+    cola = ColaInformes(cache=_Cache({"A": b"%PDF"}))
+    estado = cola.estado(cola.enviar(None, "A", "", "", 0, "a"))
+    assert (estado["estado"], estado["datos"]) == ("listo", b"%PDF")
+
+
+def test_genera_guarda_en_cache_e_informa_errores(monkeypatch):
+    def construir(df, producto, *args):
+        if producto == "roto":
+            raise RuntimeError("sin datos")
+        return b"x" * 10
+
+    monkeypatch.setattr(trabajos, "_construir", construir)
+    cache = _Cache()
+    cola = ColaInformes(cache=cache)
+    assert _esperar(cola, cola.enviar(None, "A", "", "", 0, "a"))["datos"] == b"x" * 10
+    assert cache.guardados == {"A": b"x" * 10}
+    estado = _esperar(cola, cola.enviar(None, "roto", "", "", 0, "b"))
+    assert (estado["estado"], estado["error"]) == ("error", "sin datos")
+    assert cola.estado("no-existe")["estado"] == "desconocido"
+
+
+def test_cola_acotada(monkeypatch):
+    monkeypatch.setattr(trabajos, "_construir", lambda *a: time.sleep(0.2) or b"")
+    cola = ColaInformes(max_trabajadores=1, max_pendientes=2, cache=_Cache())
+    cola.enviar(None, "A", "", "", 0, "a")
+    cola.enviar(None, "B", "", "", 0, "b")
+    with pytest.raises(ColaLlena):
+        cola.enviar(None, "C", "", "", 0, "c")
+    cola.cerrar()
+
+
+def test_terminados_acotados_por_bytes(monkeypatch):
+    monkeypatch.setattr(trabajos, "_construir", lambda *a: b"x" * 1000)
+    cola = ColaInformes(max_trabajadores=1, max_bytes_terminados=3500, cache=_Cache())
+    ids = []
+    for n in range(6):
+        ids.append(cola.enviar(None, f"P{n}", "", "", 0, "n"))
+        _esperar(cola, ids[-1])
+    assert [cola.estado(i)["estado"] for i in ids] == ["desconocido"] * 3 + ["listo"] * 3
@@ -0,0 +1,131 @@
+"""Generación de informes PDF en segundo plano.
+
+Un pool de trabajadores compartido por todas las sesiones construye los PDF
+fuera del hilo del script de Streamlit. Cada pedido recibe un id de trabajo
+con su estado ("en cola", "generando", "listo", "error"); la cola está acotada
+para que muchos usuarios a la vez no saturen el servidor.
+
+Los trabajadores son hilos: Streamlit reemplaza `sys.modules["__main__"]` por
+el script de la app, así que un pool de procesos con "spawn" volvería a ejecutar
+App.py en cada trabajador. Para lotes grandes fuera de la app está `lote.py`.
+Configuración por variables de entorno (ver `ColaInformes.desde_entorno`):
+    INFORMES_TRABAJADORES   trabajadores simultáneos    (por defecto 2)
+    INFORMES_MAX_COLA       trabajos pendientes máximos (por defecto 16)
+    INFORMES_MAX_MB         MB de PDF terminados que se conservan para descargar (por defecto 64)
+No importa Streamlit; `informe` (pandas/reportlab) se carga con el primer trabajo.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from metricas import METRICAS
+
+
+class ColaLlena(RuntimeError):
+    """Se alcanzó el máximo de informes pendientes; hay que reintentar más tarde."""
+
+
+def _construir(df, producto, proveedor, responsable, porcentaje, nombre_archivo, area_cm2, fotos) -> bytes:
+    from informe import generar_pdf
+    with METRICAS.medir_pdf() as resultado:
+        resultado["datos"] = generar_pdf(df, producto, proveedor, responsable, porcentaje, nombre_archivo,
+                                         area_cm2, fotos).getvalue()
+    return resultado["datos"]
+
+
+class ColaInformes:
+    def __init__(self, max_trabajadores: int = 2, max_pendientes: int = 16, max_terminados: int = 256,
+                 max_bytes_terminados: int = 64 * 1024 * 1024, cache=None):
+        self.max_pendientes = max_pendientes
+        self.max_terminados = max_terminados
+        self.max_bytes_terminados = max_bytes_terminados
+        self._cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=max_trabajadores, thread_name_prefix="informe")
+        self._lock = threading.Lock()
+        self._trabajos = OrderedDict()   # id → dict de estado
+        self._pendientes = 0
+        self._bytes_terminados = 0       # suma de los PDF que guardan los trabajos terminados
+
+    @classmethod
+    def desde_entorno(cls) -> "ColaInformes":
+        return cls(
+            max_trabajadores=int(os.environ.get("INFORMES_TRABAJADORES", 2)),
+            max_pendientes=int(os.environ.get("INFORMES_MAX_COLA", 16)),
+            max_bytes_terminados=int(float(os.environ.get("INFORMES_MAX_MB", 64)) * 1024 * 1024),
+        )
+
+    @property
+    def cache(self):
+        """Caché de PDF (por defecto `informe.CACHE_PDF`, importado al primer uso)."""
+        if self._cache is None:
+            from informe import CACHE_PDF
+            self._cache = CACHE_PDF
+        return self._cache
+
+    def enviar(self, df, producto: str, proveedor: str, responsable: str, porcentaje: float,
+               nombre_archivo: str, area_cm2: float = None, fotos: dict = None) -> str:
+        """Encola un informe y devuelve su id; si ya está en caché queda listo al instante."""
+        clave = self.cache.clave(df, producto, proveedor, responsable, porcentaje, area_cm2, fotos)
+        trabajo_id = uuid.uuid4().hex
+        trabajo = {"id": trabajo_id, "estado": "en cola", "inicio": time.monotonic(), "fin": None,
+                   "datos": None, "error": None}
+
+        datos = self.cache.obtener(clave)
+        with self._lock:
+            if datos is not None:
+                trabajo.update(estado="listo", datos=datos, fin=trabajo["inicio"])
+                self._bytes_terminados += len(datos)
+                self._registrar(trabajo)
+                return trabajo_id
+            if self._pendientes >= self.max_pendientes:
+                raise ColaLlena(f"Hay {self._pendientes} informes en cola; intenta de nuevo en unos segundos")
+            self._pendientes += 1
+            self._registrar(trabajo)
+
+        args = (df, producto, proveedor, responsable, porcentaje, nombre_archivo, area_cm2, fotos)
+        self._pool.submit(self._ejecutar, trabajo, clave, args)
+        return trabajo_id
+
+    def _registrar(self, trabajo: dict) -> None:
+        self._trabajos[trabajo["id"]] = trabajo
+        self._recortar()
+
+    def _recortar(self) -> None:
+        # Se descartan los trabajos terminados más antiguos, por cantidad y por bytes de PDF
+        while len(self._trabajos) > self.max_terminados or self._bytes_terminados > self.max_bytes_terminados:
+            viejo_id = next((i for i, t in self._trabajos.items() if t["fin"] is not None), None)
+            if viejo_id is None:
+                break
+            self._bytes_terminados -= len(self._trabajos.pop(viejo_id)["datos"] or b"")
+
+    def _ejecutar(self, trabajo: dict, clave: str, args: tuple) -> None:
+        trabajo["estado"] = "generando"
+        try:
+            datos = _construir(*args)
+        except Exception as exc:  # se informa al usuario en lugar de romper el pool
+            datos = None
+            trabajo.update(estado="error", error=str(exc))
+        else:
+            self.cache.guardar(clave, datos)
+        with self._lock:
+            if datos is not None:
+                trabajo.update(estado="listo", datos=datos)
+                self._bytes_terminados += len(datos)
+            trabajo["fin"] = time.monotonic()
+            self._pendientes -= 1
+            self._recortar()
+
+    def estado(self, trabajo_id: str) -> dict:
+        """Copia del estado del trabajo: estado, segundos transcurridos, datos (si listo) y error."""
+        with self._lock:
+            trabajo = self._trabajos.get(trabajo_id)
+            if trabajo is None:
+                return {"id": trabajo_id, "estado": "desconocido", "segundos": 0.0, "datos": None, "error": None}
+            fin = trabajo["fin"] if trabajo["fin"] is not None else time.monotonic()
+            return {**trabajo, "segundos": fin - trabajo["inicio"], "pendientes": self._pendientes}
+
+    def cerrar(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)